@@ -1,13 +1,148 @@
 import asyncio
+import uuid
+from typing import Optional
 
 import streamlit as st
 
-from src.app.agent import agno_assist  # import your BugProwler agent
+from src.app.agent import build_agno_assist  # import your BugProwler agent
+from src.app.agent_pool import FairScheduler, SessionAgentPool
+from src.app.analysis_jobs import AnalysisJob, spec_analysis
+from src.app.dashboard import render_cards, render_donut
+from src.app.detectors import default_detectors
+from src.app.findings_store import REPORT_STATUSES, FindingsStore
+from src.app.llm_scheduler import estimate_tokens, get_scheduler
 from src.app.markdown_idor import generate_markdown
-from src.app.reconaissance_agent import recon_agent
+from src.app.profiling import profile
+from src.app.streaming import StreamingMarkdown
+from src.app.reconaissance_agent import build_recon_agent, mcp_connected
+from src.app.retrieval import FindingsRetriever
+from src.app.spec_discovery import SpecDiscovery
+from src.app.spec_model import SpecCache
 from src.app.swagger_analysis import IDORAnalyzer
+from src.app.telemetry import ainstrument_stream, configure_from_env, instrument_stream
+from src.app.traffic_ingestion import TrafficIngester
+from src.app.uploads import DEFAULT_PREVIEW_BYTES, SpooledUpload, UploadTooLarge, session_spool, sweep_spools
+from src.app.warm_pool import DEFAULT_WORKERS, WarmPool
 
 st.set_page_config(page_title="BugProwler Agent", layout="wide")
+configure_from_env()
+
+
+@st.cache_resource
+def get_findings_store() -> FindingsStore:
+    return FindingsStore()
+
+
+@st.cache_resource
+def get_retriever() -> FindingsRetriever:
+    return FindingsRetriever(get_findings_store()).start()
+
+
+@st.cache_resource
+def get_spec_cache() -> SpecCache:
+    return SpecCache()
+
+
+@st.cache_resource
+def get_warm_pool() -> Optional[WarmPool]:
+    """Analysis worker processes; BUGPROWLER_ANALYSIS_WORKERS=0 analyzes in-process."""
+    return WarmPool().start() if DEFAULT_WORKERS > 0 else None
+
+
+@st.cache_resource
+def get_agent_pools():
+    """Per-session agents (chat, recon) plus the scheduler that admits their runs."""
+    retriever = get_retriever()
+    return (
+        SessionAgentPool(
+            lambda sid: build_agno_assist(
+                session_id=sid, knowledge_retriever=retriever.knowledge_retriever
+            )
+        ),
+        SessionAgentPool(lambda sid: build_recon_agent(session_id=sid)),
+        FairScheduler(),
+    )
+
+
+assist_pool, recon_pool, scheduler = get_agent_pools()
+llm_scheduler = get_scheduler()
+
+
+@st.cache_resource
+def sweep_stale_spools() -> int:
+    """Once per server: remove spools of sessions that ended without being collected (crash, kill)."""
+    return sweep_spools()
+
+
+sweep_stale_spools()
+
+
+def spooled(uploaded_file, widget_key: str) -> SpooledUpload:
+    """Spool an upload to disk once per session and uploader; reruns reuse the same file.
+
+    The file goes away with the session: a new upload in the same uploader
+    replaces it, and the spool is deleted when the session state holding it
+    is collected. Each uploader has its own mapping, so one page's upload
+    never deletes a file another page (or its analysis job) is reading.
+    """
+    return session_spool(st.session_state.setdefault(f"uploads:{widget_key}", {}), uploaded_file)
+
+
+def analysis_job(upload: SpooledUpload) -> AnalysisJob:
+    """The session's background analysis of ``upload``; a new upload cancels the previous one."""
+    current = st.session_state.get("analysis_job")
+    if current is not None and current[0] == upload.digest:
+        return current[1]
+    if current is not None:
+        current[1].cancel()
+    target = spec_analysis(
+        upload.path,
+        upload.digest,
+        upload.name,
+        get_spec_cache(),
+        get_findings_store(),
+        IDORAnalyzer(detectors=default_detectors()),
+        pool=get_warm_pool(),
+        profile_enabled=profile_requested,
+    )
+    job = AnalysisJob(target, upload.tag, kind="analysis", profile_enabled=profile_requested).start()
+    st.session_state.analysis_job = (upload.digest, job)
+    return job
+
+
+@st.fragment(run_every=0.5)
+def analysis_progress(job: AnalysisJob) -> None:
+    """Live progress bar with a cancel button; hands back to the full page once the job ends."""
+    if job.done:
+        st.rerun()
+    progress = job.progress
+    if progress.stage in ("queued", "load"):
+        st.progress(0.0, text="Parsing spec...")
+    else:
+        eta = progress.eta
+        text = f"Analyzed {progress.done:,} of {progress.total:,} paths"
+        if progress.stage == "finish":
+            text = "Cross-checking routes..."
+        elif eta is not None:
+            text += f" (about {eta:.0f}s left)"
+        st.progress(progress.fraction, text=text)
+    if job.cancelled:
+        st.caption("Cancelling after the current path...")
+    elif st.button("Cancel analysis", key="cancel_analysis"):
+        job.cancel()
+
+
+def render_preview(upload: SpooledUpload, language: Optional[str] = None) -> None:
+    """Show the head of an upload, growing it on demand instead of dumping the whole file."""
+    limits = st.session_state.setdefault("preview_limits", {})
+    limit = limits.get(upload.digest, DEFAULT_PREVIEW_BYTES)
+    st.code(upload.head(limit), language=language)
+    if limit < upload.size:
+        st.caption(f"Showing the first {min(limit, upload.size):,} of {upload.size:,} bytes")
+        if st.button("Load more", key=f"more_{upload.digest}"):
+            limits[upload.digest] = limit * 4
+            st.rerun()
+
 
 st.title("BugProwler 𖢥")
 
@@ -31,9 +166,20 @@ with st.sidebar:
     if report_btn:
         st.session_state.page = "Reports"
 
+    st.checkbox(
+        "Profile requests",
+        key="profile_requests",
+        help="Sample analyses and agent runs and save flamegraph-ready stacks.",
+    )
+
 page = st.session_state.page
+# Unchecked falls back to the BUGPROWLER_PROFILE environment variable
+profile_requested = True if st.session_state.profile_requests else None
 
 # ---------- session state ----------
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
@@ -48,20 +194,22 @@ if page == "Chat":
 
     # ---------- file uploader ----------
     uploaded_file = st.file_uploader(
-        "Upload a file...", type=["txt", "md", "csv", "json", "png", "jpg", "jpeg"]
+        "Upload a file...", type=["txt", "md", "csv", "json", "png", "jpg", "jpeg"], key="chat_upload"
     )
     if uploaded_file is not None:
-        file_bytes = uploaded_file.read()
-        st.write("File uploaded successfully!")
-        # Optional: display the file contents if it's text
-        if uploaded_file.type.startswith("text") or uploaded_file.type in [
-            "application/json"
-        ]:
-            try:
-                content_str = file_bytes.decode("utf-8")
-                st.code(content_str)
-            except Exception as e:
-                st.write(f"Unable to display file contents: {e}")
+        try:
+            upload = spooled(uploaded_file, "chat_upload")
+            st.write("File uploaded successfully!")
+            # Optional: display the head of the file if it's text
+            if (
+                uploaded_file.type.startswith("text")
+                or uploaded_file.type in ["application/json"]
+            ) and upload.is_text():
+                render_preview(upload)
+        except UploadTooLarge as e:
+            st.error(str(e))
+        except Exception as e:
+            st.write(f"Unable to display file contents: {e}")
 
     # ---------- input ----------
     if prompt := st.chat_input("Ask me anything…"):
@@ -70,386 +218,175 @@ if page == "Chat":
             st.markdown(prompt)
 
         # ---------- run agent ----------
-        with st.chat_message("assistant"):
-            placeholder = st.empty()
-            full = ""
-            for chunk in agno_assist.run(
-                prompt, stream=True, debug_mode=True
+        session_id = st.session_state.session_id
+        agno_assist = assist_pool.get(session_id)
+        with st.chat_message("assistant"), profile(
+            session_id, kind="chat", enabled=profile_requested
+        ) as profile_result, scheduler.slot(session_id):
+            renderer = StreamingMarkdown()
+            for chunk in instrument_stream(
+                llm_scheduler.stream(
+                    lambda: agno_assist.run(
+                        prompt,
+                        stream=True,
+                        yield_run_response=True,
+                        session_id=session_id,
+                        debug_mode=True,
+                    ),
+                    priority="interactive",
+                    tokens=estimate_tokens(prompt),
+                ),
+                "agno_assist",
             ):  # 2️⃣ streaming straight into UI
                 if chunk.content:
-                    full += chunk.content
-                    placeholder.markdown(full + "▌")
-            placeholder.markdown(full)
+                    renderer.write(chunk.content)
+            full = renderer.finish()
+        if profile_result is not None:
+            st.caption(f"Profile saved to {profile_result.path}")
         st.session_state.messages.append({"role": "assistant", "content": full})
 
 elif page == "Swagger Docs Analyzer":
     st.header("Swagger/OpenAPI Docs Analyzer")
+    with st.expander("Discover specs on in-scope hosts"):
+        hosts_text = st.text_area("Hosts or base URLs, one per line", key="discovery_hosts")
+        if st.button("Probe hosts", key="discover_btn") and hosts_text.strip():
+            discovery = SpecDiscovery(cache=get_spec_cache(), store=get_findings_store())
+            with st.spinner("Probing common spec locations..."):
+                results = asyncio.run(discovery.run(hosts_text.splitlines()))
+            found = [r.as_dict() for r in results if r.status != "missing"]
+            if found:
+                st.dataframe(found)
+            else:
+                st.info("No published specs found")
     swagger_file = st.file_uploader(
-        "Upload a Swagger/OpenAPI JSON or YAML file", type=["json", "yaml", "yml"]
+        "Upload a Swagger/OpenAPI JSON or YAML file, or a HAR/JSONL traffic capture",
+        type=["json", "yaml", "yml", "har", "jsonl"],
+        key="swagger_upload",
     )
+    upload = None
     if swagger_file is not None:
         try:
-            file_bytes = swagger_file.read()
-            # Try to decode as UTF-8 text
-            content_str = file_bytes.decode("utf-8")
-
-            analyze_prompt = f"Analyze the following Swagger/OpenAPI specification and summarize its endpoints, authentication, and notable features:\n\n{content_str}"
-            with st.spinner("Analyzing Swagger/OpenAPI docs..."):
-                analyzer = IDORAnalyzer()
-                spec = analyzer.analyze_file_bytes(file_bytes)
-                st.success("Analysis completed")
+            upload = spooled(swagger_file, "swagger_upload")
+        except UploadTooLarge as e:
+            st.error(str(e))
+    if upload is not None and upload.name.endswith((".har", ".jsonl")):
+        try:
+            # Reruns reuse the analysis of the same capture instead of ingesting it again
+            traffic = st.session_state.get("traffic_analysis")
+            if traffic is None or traffic["digest"] != upload.digest:
+                with st.spinner("Inferring API model from captured traffic..."), profile(
+                    upload.tag, kind="traffic", enabled=profile_requested
+                ) as profile_result:
+                    ingester = TrafficIngester()
+                    with upload.text_stream() as stream:
+                        if upload.name.endswith(".har"):
+                            ingester.ingest_har(stream)
+                        else:
+                            ingester.ingest_jsonl(stream)
+                    inferred = ingester.to_openapi()
+                    spec = IDORAnalyzer(detectors=default_detectors()).analyze(inferred)
+                    get_findings_store().replace_analysis(
+                        upload.name, spec, source=f"traffic:{upload.digest[:16]}"
+                    )
+                traffic = st.session_state.traffic_analysis = {
+                    "digest": upload.digest,
+                    "requests": ingester.entries_seen,
+                    "paths": len(inferred["paths"]),
+                    "result": spec,
+                    "profile_path": profile_result.path if profile_result is not None else None,
+                }
+            st.success(f"Analysis completed ({traffic['requests']} requests, {traffic['paths']} inferred paths)")
+            st.markdown(generate_markdown(traffic["result"]))
+            if traffic["profile_path"] is not None:
+                st.caption(f"Profile saved to {traffic['profile_path']}")
+        except Exception as e:
+            st.error(f"Error reading or analyzing traffic capture: {e}")
+    elif upload is not None:
+        try:
+            with st.expander("Preview"):
+                render_preview(upload, language="yaml" if upload.name.endswith((".yaml", ".yml")) else "json")
+            job = analysis_job(upload)
+            if not job.done:
+                analysis_progress(job)
+            elif job.error is not None:
+                raise job.error
+            else:
+                spec = job.result
+                if spec.get("cancelled"):
+                    st.warning(
+                        f"Analysis cancelled after {spec['paths_analyzed']:,} of "
+                        f"{spec['paths_total']:,} paths; showing partial results"
+                    )
+                    if st.button("Restart analysis", key="restart_analysis"):
+                        del st.session_state.analysis_job
+                        st.rerun()
+                else:
+                    st.success(f"Analysis completed in {job.elapsed:.1f}s")
                 st.markdown(generate_markdown(spec))
+                if job.profile_path is not None:
+                    st.caption(f"Profile saved to {job.profile_path}")
         except Exception as e:
             st.error(f"Error reading or analyzing Swagger/OpenAPI file: {e}")
 
 elif page == "Reports":
     st.header("Bug Bounty Dashboards")
+    store = get_findings_store()
+    summary = store.summary()
 
     # cards
-    st.html("""
-        <div style="display: flex; justify-content: space-between; flex-wrap: wrap;">
-            <div class="card" style="width: 18rem; border: 1px solid #ddd; border-radius: 8px; box-shadow: 2px 2px 12px #eee; margin: 1rem;">
-                <div class="card-body" style="padding: 1rem;">
-                    <h5 class="card-title" style="font-weight: bold; font-size: 1.25rem; margin-bottom: 0.5rem;">Total Reports Submitted</h5>
-                    <p class="card-text" style="font-size: 2rem; color: white; margin: 0;">42</p>
-                </div>
-            </div>
-            <div class="card" style="width: 18rem; border: 1px solid #ddd; border-radius: 8px; box-shadow: 2px 2px 12px #eee; margin: 1rem;">
-                <div class="card-body" style="padding: 1rem;">
-                    <h5 class="card-title" style="font-weight: bold; font-size: 1.25rem; margin-bottom: 0.5rem;">Valid Bugs Found</h5>
-                    <p class="card-text" style="font-size: 2rem; color: white; margin: 0;">15</p>
-                </div>
-            </div>
-            <div class="card" style="width: 18rem; border: 1px solid #ddd; border-radius: 8px; box-shadow: 2px 2px 12px #eee; margin: 1rem;">
-                <div class="card-body" style="padding: 1rem;">
-                    <h5 class="card-title" style="font-weight: bold; font-size: 1.25rem; margin-bottom: 0.5rem;">Total Rewards Earned</h5>
-                    <p class="card-text" style="font-size: 2rem; color: white; margin: 0;">$3500</p>
-                </div>
-            </div>
-        </div>
-    """)
-
-    # Placeholder for recent report details - in a real app this would load/report data dynamically
-    recent_reports = [
-        {
-            "id": "BR-101",
-            "title": "IDOR in user profile API",
-            "status": "Acknowledged",
-            "reward": "$500",
-        },
-        {
-            "id": "BR-102",
-            "title": "XSS in comment section",
-            "status": "Under Review",
-            "reward": "$0",
-        },
-        {
-            "id": "BR-103",
-            "title": "Auth bypass in admin panel",
-            "status": "Resolved",
-            "reward": "$1500",
-        },
-    ]
+    st.html(
+        render_cards(
+            [
+                ("Total Reports Submitted", str(summary["reports_submitted"])),
+                ("Valid Bugs Found", str(summary["valid_bugs"])),
+                ("Total Rewards Earned", f"${summary['total_rewards']:,.0f}"),
+                ("Findings Recorded", f"{summary['findings']:,}"),
+            ]
+        )
+    )
 
     st.subheader("Recent Bug Reports")
+    recent_reports = store.recent_reports()
+    if not recent_reports:
+        st.info("No reports yet. Save a reconnaissance agent answer as a report to track it here.")
     for report in recent_reports:
-        with st.expander(f"{report['id']}: {report['title']}"):
-            st.write(f"Status: **{report['status']}**")
-            st.write(f"Reward: {report['reward']}")
-            st.write("Detailed description and notes go here...")
-
-    # Optionally add charts or graphs here for visualizing trends or bug categories
-    st.subheader("Bug Reports Over Time")
-    import numpy as np
-    import pandas as pd
-
-    dates = pd.date_range(end=pd.Timestamp.today(), periods=30)
-    reports_per_day = np.random.poisson(lam=1.5, size=30)
-    df = pd.DataFrame({"Date": dates, "Reports": reports_per_day})
-
-    st.bar_chart(
-        df.rename(columns={"Date": "index"}).set_index("index"), color="#ffaa00"
-    )
-
-    st.markdown("## Reports Donuts")
-    st.html("""<!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Interactive Donut Chart</title>
-        <style>
-            body {
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                min-height: 100vh;
-                margin: 0;
-                background: #f5f7fa;
-                font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            }
-
-            .chart-container {
-                position: relative;
-                width: 300px;
-                height: 300px;
-            }
-
-            .donut-chart {
-                width: 100%;
-                height: 100%;
-                border-radius: 50%;
-                background: conic-gradient(
-                    #4f46e5 0% 30%,
-                    #10b981 30% 65%,
-                    #f59e0b 65% 85%,
-                    #ef4444 85% 100%
-                );
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                cursor: pointer;
-                transition: transform 0.3s ease;
-            }
-
-            .donut-chart:hover {
-                transform: scale(1.05);
-            }
-
-            .donut-hole {
-                width: 60%;
-                height: 60%;
-                background: #f5f7fa;
-                border-radius: 50%;
-                display: flex;
-                flex-direction: column;
-                justify-content: center;
-                align-items: center;
-                box-shadow: inset 0 0 20px rgba(0, 0, 0, 0.1);
-                position: relative;
-                overflow: hidden;
-            }
-
-            .total-value {
-                font-size: 24px;
-                font-weight: bold;
-                color: #1f2937;
-                margin-bottom: 4px;
-            }
-
-            .total-label {
-                font-size: 14px;
-                color: #6b7280;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-
-            .tooltip {
-                position: absolute;
-                background: rgba(0, 0, 0, 0.8);
-                color: white;
-                padding: 8px 12px;
-                border-radius: 4px;
-                font-size: 12px;
-                pointer-events: none;
-                opacity: 0;
-                transition: opacity 0.3s ease;
-                z-index: 10;
-            }
-
-            .legend {
-                display: flex;
-                flex-direction: column;
-                gap: 12px;
-                margin-top: 24px;
-                padding: 20px;
-                background: white;
-                border-radius: 12px;
-                box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-            }
-
-            .legend-item {
-                display: flex;
-                align-items: center;
-                gap: 12px;
-                cursor: pointer;
-                transition: transform 0.2s ease;
-            }
-
-            .legend-item:hover {
-                transform: translateX(5px);
-            }
-
-            .legend-color {
-                width: 20px;
-                height: 20px;
-                border-radius: 4px;
-            }
-
-            .legend-text {
-                font-size: 14px;
-                color: #374151;
-                font-weight: 500;
-            }
-
-            .legend-value {
-                margin-left: auto;
-                font-weight: 600;
-                color: #1f2937;
-            }
-
-            .container {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                gap: 20px;
-            }
-
-            .highlight {
-                filter: brightness(1.2) contrast(1.1);
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="chart-container">
-                <div class="donut-chart" id="donutChart">
-                    <div class="donut-hole">
-                        <div class="total-value">100%</div>
-                        <div class="total-label">Total</div>
-                    </div>
-                    <div class="tooltip" id="tooltip"></div>
-                </div>
-            </div>
-
-            <div class="legend">
-                <div class="legend-item" data-sector="0">
-                    <div class="legend-color" style="background-color: #4f46e5;"></div>
-                    <div class="legend-text">Product A</div>
-                    <div class="legend-value">30%</div>
-                </div>
-                <div class="legend-item" data-sector="1">
-                    <div class="legend-color" style="background-color: #10b981;"></div>
-                    <div class="legend-text">Product B</div>
-                    <div class="legend-value">35%</div>
-                </div>
-                <div class="legend-item" data-sector="2">
-                    <div class="legend-color" style="background-color: #f59e0b;"></div>
-                    <div class="legend-text">Product C</div>
-                    <div class="legend-value">20%</div>
-                </div>
-                <div class="legend-item" data-sector="3">
-                    <div class="legend-color" style="background-color: #ef4444;"></div>
-                    <div class="legend-text">Product D</div>
-                    <div class="legend-value">15%</div>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            const donutChart = document.getElementById('donutChart');
-            const tooltip = document.getElementById('tooltip');
-            const legendItems = document.querySelectorAll('.legend-item');
-            const sectors = [
-                { start: 0, end: 30, color: '#4f46e5', label: 'Product A', value: '30%' },
-                { start: 30, end: 65, color: '#10b981', label: 'Product B', value: '35%' },
-                { start: 65, end: 85, color: '#f59e0b', label: 'Product C', value: '20%' },
-                { start: 85, end: 100, color: '#ef4444', label: 'Product D', value: '15%' }
-            ];
-
-            // Add mouse move event to chart
-            donutChart.addEventListener('mousemove', (e) => {
-                const rect = donutChart.getBoundingClientRect();
-                const centerX = rect.width / 2;
-                const centerY = rect.height / 2;
-                const mouseX = e.clientX - rect.left;
-                const mouseY = e.clientY - rect.top;
-
-                const dx = mouseX - centerX;
-                const dy = mouseY - centerY;
-                const angle = Math.atan2(dy, dx) * 180 / Math.PI;
-                const normalizedAngle = (angle + 360) % 360;
-
-                let sectorIndex = -1;
-                for (let i = 0; i < sectors.length; i++) {
-                    if (normalizedAngle >= sectors[i].start && normalizedAngle < sectors[i].end) {
-                        sectorIndex = i;
-                        break;
-                    }
-                }
-
-                if (sectorIndex !== -1) {
-                    const sector = sectors[sectorIndex];
-                    tooltip.textContent = `${sector.label}: ${sector.value}`;
-                    tooltip.style.opacity = 1;
-
-                    // Position tooltip near cursor
-                    tooltip.style.left = (e.clientX - rect.left + 15) + 'px';
-                    tooltip.style.top = (e.clientY - rect.top - 15) + 'px';
-
-                    // Highlight sector
-                    donutChart.style.background = `conic-gradient(
-                        ${sector.color} 0% ${sector.start}%,
-                        ${sector.color} ${sector.start}% ${sector.end}%,
-                        #e5e7eb ${sector.end}% 100%
-                    )`;
-                } else {
-                    tooltip.style.opacity = 0;
-                    donutChart.style.background = `conic-gradient(
-                        #4f46e5 0% 30%,
-                        #10b981 30% 65%,
-                        #f59e0b 65% 85%,
-                        #ef4444 85% 100%
-                    )`;
-                }
-            });
-
-            // Reset when mouse leaves chart
-            donutChart.addEventListener('mouseleave', () => {
-                tooltip.style.opacity = 0;
-                donutChart.style.background = `conic-gradient(
-                    #4f46e5 0% 30%,
-                    #10b981 30% 65%,
-                    #f59e0b 65% 85%,
-                    #ef4444 85% 100%
-                )`;
-            });
-
-            // Legend item interactions
-            legendItems.forEach(item => {
-                item.addEventListener('mouseenter', () => {
-                    const sectorIndex = parseInt(item.getAttribute('data-sector'));
-                    const sector = sectors[sectorIndex];
-
-                    // Highlight sector
-                    donutChart.style.background = `conic-gradient(
-                        ${sector.color} 0% ${sector.start}%,
-                        ${sector.color} ${sector.start}% ${sector.end}%,
-                        #e5e7eb ${sector.end}% 100%
-                    )`;
-
-                    // Show tooltip
-                    tooltip.textContent = `${sector.label}: ${sector.value}`;
-                    tooltip.style.opacity = 1;
-                    tooltip.style.left = (item.offsetLeft + item.offsetWidth + 20) + 'px';
-                    tooltip.style.top = (item.offsetTop + item.offsetHeight / 2 - 10) + 'px';
-                });
-
-                item.addEventListener('mouseleave', () => {
-                    donutChart.style.background = `conic-gradient(
-                        #4f46e5 0% 30%,
-                        #10b981 30% 65%,
-                        #f59e0b 65% 85%,
-                        #ef4444 85% 100%
-                    )`;
-                    tooltip.style.opacity = 0;
-                });
-            });
-        </script>
-    </body>
-    </html>
-
-""")
+        with st.expander(f"BR-{report['id']}: {report['title']}"):
+            st.write(f"Target: `{report['target']}`")
+            with st.form(key=f"report_form_{report['id']}"):
+                status = st.selectbox(
+                    "Status",
+                    REPORT_STATUSES,
+                    index=REPORT_STATUSES.index(report["status"])
+                    if report["status"] in REPORT_STATUSES
+                    else 0,
+                )
+                reward = st.number_input("Reward ($)", min_value=0.0, value=float(report["reward"]))
+                if st.form_submit_button("Save"):
+                    store.update_report(report["id"], status=status, reward=reward)
+                    st.rerun()
+            if report["body"]:
+                st.markdown(report["body"])
+
+    st.subheader("Findings Over Time")
+    per_day = store.findings_per_day(days=30)
+    if per_day:
+        import pandas as pd
+
+        df = pd.DataFrame(per_day, columns=["Date", "Findings"])
+        df["Date"] = pd.to_datetime(df["Date"])
+        st.bar_chart(df.set_index("Date"), color="#ffaa00")
+    else:
+        st.caption("No findings recorded in the last 30 days.")
+
+    st.markdown("## Findings by Technique")
+    techniques = store.finding_rollup("technique")
+    if techniques:
+        st.html(render_donut(techniques, total_label="Findings"))
+
+    st.markdown("## Findings by Target")
+    targets = store.finding_rollup("target", limit=10)
+    if targets:
+        st.bar_chart({target: count for target, count in targets}, color="#4f46e5")
 
 
 elif page == "Reconaissance agent":
@@ -465,16 +402,54 @@ elif page == "Reconaissance agent":
             st.markdown(prompt)
 
         # ---------- run agent ----------
-        async def async_run_agent(prompt):
-            full = ""
-            placeholder = st.empty()
-            async for chunk in recon_agent.arun(prompt, stream=True, debug_mode=True):
-                if chunk.content:
-                    full += chunk.content
-                    placeholder.markdown(full + "▌")
-            placeholder.markdown(full)
-            return full
+        session_id = st.session_state.session_id
+        recon_agent = recon_pool.get(session_id)
 
-        with st.chat_message("assistant"):
+        async def async_run_agent(prompt):
+            renderer = StreamingMarkdown()
+            async with mcp_connected(recon_agent):
+                async for chunk in ainstrument_stream(
+                    llm_scheduler.astream(
+                        lambda: recon_agent.arun(
+                            prompt,
+                            stream=True,
+                            yield_run_response=True,
+                            session_id=session_id,
+                            debug_mode=True,
+                        ),
+                        priority="recon",
+                        tokens=estimate_tokens(prompt),
+                    ),
+                    "recon_agent",
+                ):
+                    if chunk.content:
+                        renderer.write(chunk.content)
+            return renderer.finish()
+
+        with st.chat_message("assistant"), profile(
+            session_id, kind="recon", enabled=profile_requested
+        ) as profile_result, scheduler.slot(session_id):
             full = asyncio.run(async_run_agent(prompt))
+        if profile_result is not None:
+            st.caption(f"Profile saved to {profile_result.path}")
+        if full:
+            st.session_state.recon_answer = (prompt, full)
         st.session_state.messages.append({"role": "assistant", "content": full})
+
+    # ---------- save as report ----------
+    # Only answers the user explicitly files become reports; chat alone never touches the dashboard
+    answer = st.session_state.get("recon_answer")
+    if answer is not None:
+        with st.expander("Save last answer as a report"):
+            with st.form(key="recon_report_form", clear_on_submit=True):
+                title = st.text_input("Title", value=answer[0][:80])
+                target = st.text_input("Target", placeholder="api.example.com")
+                if st.form_submit_button("Save as report"):
+                    if not title.strip() or not target.strip():
+                        st.error("A title and a target are required.")
+                    else:
+                        report_id = get_findings_store().add_report(
+                            title=title.strip(), target=target.strip(), body=answer[1], source="recon_agent"
+                        )
+                        del st.session_state.recon_answer
+                        st.success(f"Saved as BR-{report_id} (Draft)")
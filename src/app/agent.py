@@ -1,22 +1,68 @@
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
 from agno.models.openai import OpenAIChat
+from sqlalchemy import create_engine, event
+
+
+def create_sqlite_db(db_file: str) -> SqliteDb:
+    """SqliteDb on a WAL-mode engine so concurrent sessions don't serialize on history writes."""
+    engine = create_engine(f"sqlite:///{db_file}", connect_args={"timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+    return SqliteDb(db_engine=engine)
+
 
 # Setup your database
-db = SqliteDb(db_file="agno.db")
+db = create_sqlite_db("agno.db")
+
+# One pooled HTTP client shared by every session's model
+http_client = httpx.Client(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=httpx.Timeout(120.0, connect=10.0),
+)
 
 system_message = """You are an API pentesting agent. Your goal is to identify vulnerabilities in APIs
 and report them to the developer. You should provide detailed explanations of the vulnerabilities and suggest fixes."""
 
-agno_assist = Agent(
-    name="Agno Assist",
-    model=OpenAIChat(id="gpt-4.1-nano"),
-    db=db,
-    add_history_to_context=True,
-    num_history_runs=5,
-    description="Bug Bounty Hunter Agent",
-    instructions=system_message,
-    markdown=True,
-    reasoning=False,
-    debug_level=1,
-)
+
+def build_agno_assist(
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    knowledge_retriever: Optional[Callable[..., Optional[List[Dict[str, Any]]]]] = None,
+    client: Optional[httpx.Client] = None,
+    history_db: Optional[SqliteDb] = None,
+) -> Agent:
+    """Build an Agno Assist instance; cheap because the DB and HTTP pool are shared.
+
+    Client-side retries are off: rate limits are handled by the LLM scheduler.
+    With a ``knowledge_retriever`` (see ``retrieval.FindingsRetriever``), the
+    top past findings and reports for each message are appended to it as
+    references instead of pasting whole write-ups into the prompt.
+    ``client``/``history_db`` override the shared ones (used by cassette replay).
+    """
+    return Agent(
+        name="Agno Assist",
+        model=OpenAIChat(id="gpt-4.1-nano", http_client=client or http_client, max_retries=0),
+        db=history_db or db,
+        session_id=session_id,
+        user_id=user_id,
+        add_history_to_context=True,
+        num_history_runs=5,
+        description="Bug Bounty Hunter Agent",
+        instructions=system_message,
+        markdown=True,
+        reasoning=False,
+        debug_level=1,
+        knowledge_retriever=knowledge_retriever,
+        add_knowledge_to_context=knowledge_retriever is not None,
+        search_knowledge=False,
+    )
@@ -0,0 +1,153 @@
+import contextlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+from . import telemetry
+
+# A slot is held for a whole streamed turn, so this must cover every analyst
+# chatting at once (20 is the target); upstream pacing is the LLM scheduler's job.
+DEFAULT_MAX_CONCURRENT_RUNS = int(os.environ.get("BUGPROWLER_MAX_CONCURRENT_RUNS", "32"))
+
+
+class SessionAgentPool:
+    """Hands each user session its own agent instance.
+
+    Agents are built lazily by ``factory(session_id)`` and kept in an LRU of
+    at most ``max_sessions`` entries; sessions idle for longer than
+    ``idle_ttl`` seconds are evicted. The factory is expected to share the
+    expensive pieces (HTTP pool, history DB) and only allocate per-session
+    state, so construction stays cheap.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], Any],
+        max_sessions: int = 256,
+        idle_ttl: float = 3600.0,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._agents: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            agent = self._agents.get(session_id)
+            if agent is not None:
+                self._agents.move_to_end(session_id)
+                self._last_used[session_id] = now
+                return agent
+            self._evict(now)
+        # Build outside the lock so one slow construction doesn't stall other sessions
+        agent = self.factory(session_id)
+        with self._lock:
+            existing = self._agents.get(session_id)
+            if existing is not None:
+                return existing
+            self._agents[session_id] = agent
+            self._last_used[session_id] = now
+        return agent
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._agents.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+
+    def _evict(self, now: float) -> None:
+        while self._agents:
+            oldest = next(iter(self._agents))
+            if len(self._agents) < self.max_sessions and now - self._last_used[oldest] < self.idle_ttl:
+                break
+            self._agents.popitem(last=False)
+            self._last_used.pop(oldest, None)
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+
+class FairScheduler:
+    """Round-robin admission of agent runs across sessions.
+
+    At most ``max_concurrent`` runs execute at once and each session holds
+    at most ``per_session`` of them. When a slot frees up it goes to the
+    next waiting session in rotation rather than to whoever queued first,
+    so one busy analyst cannot starve the others.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, per_session: int = 1):
+        self.max_concurrent = max_concurrent or DEFAULT_MAX_CONCURRENT_RUNS
+        self.per_session = per_session
+        self._cond = threading.Condition()
+        self._waiting: "OrderedDict[str, Deque[object]]" = OrderedDict()
+        self._granted: set = set()
+        self._running: Dict[str, int] = {}
+        self._active = 0
+
+    def _dispatch(self) -> None:
+        granted_any = False
+        while self._active < self.max_concurrent and self._waiting:
+            for _ in range(len(self._waiting)):
+                session_id, queue = next(iter(self._waiting.items()))
+                self._waiting.move_to_end(session_id)
+                if self._running.get(session_id, 0) < self.per_session:
+                    self._granted.add(queue.popleft())
+                    if not queue:
+                        del self._waiting[session_id]
+                    self._running[session_id] = self._running.get(session_id, 0) + 1
+                    self._active += 1
+                    granted_any = True
+                    break
+            else:
+                break
+        if granted_any:
+            self._cond.notify_all()
+        telemetry.registry.gauge(
+            "bugprowler_scheduler_waiting", "Agent runs waiting for a slot."
+        ).set(sum(len(q) for q in self._waiting.values()))
+
+    def acquire(self, session_id: str, timeout: Optional[float] = None) -> None:
+        """Block until ``session_id`` is granted a slot (raises TimeoutError)."""
+        start = time.monotonic()
+        ticket = object()
+        with self._cond:
+            self._waiting.setdefault(session_id, deque()).append(ticket)
+            self._dispatch()
+            while ticket not in self._granted:
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    queue = self._waiting.get(session_id)
+                    if queue is not None and ticket in queue:
+                        queue.remove(ticket)
+                        if not queue:
+                            del self._waiting[session_id]
+                    raise TimeoutError(f"No agent slot for session {session_id} within {timeout}s")
+                self._cond.wait(remaining)
+            self._granted.discard(ticket)
+        telemetry.registry.histogram(
+            "bugprowler_scheduler_wait_seconds", "Time agent runs waited for a slot."
+        ).observe(time.monotonic() - start)
+
+    def release(self, session_id: str) -> None:
+        with self._cond:
+            self._active -= 1
+            remaining = self._running.get(session_id, 1) - 1
+            if remaining:
+                self._running[session_id] = remaining
+            else:
+                self._running.pop(session_id, None)
+            self._dispatch()
+
+    @contextlib.contextmanager
+    def slot(self, session_id: str, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold a run slot for the duration of the block."""
+        self.acquire(session_id, timeout)
+        try:
+            yield
+        finally:
+            self.release(session_id)
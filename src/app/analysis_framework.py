@@ -0,0 +1,243 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .schema_walker import SchemaWalker
+
+HTTP_METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"]
+
+EVENTS = (
+    "visit_path",
+    "leave_path",
+    "visit_operation",
+    "visit_parameter",
+    "visit_schema",
+    "leave_operation",
+)
+
+
+def authorization_required(operation: Dict[str, Any], global_security: List[Any]) -> bool:
+    """Whether an operation declares (or inherits) a non-empty security requirement."""
+    security = operation.get("security", global_security)
+    return len(security) > 0 and security != [{}]
+
+
+def request_body_schemas(
+    walker: SchemaWalker, operation: Dict[str, Any]
+) -> List[Tuple[Dict[str, Any], str]]:
+    """OpenAPI 3 ``requestBody`` schemas plus Swagger 2.0 body/formData schemas."""
+    schemas = []
+    request_body = walker.resolve(operation.get("requestBody"))
+    if request_body is not None:
+        for media in (request_body.get("content") or {}).values():
+            if isinstance(media, dict) and isinstance(media.get("schema"), dict):
+                schemas.append((media["schema"], "body"))
+    for param in operation.get("parameters", []):
+        if param.get("in") in ("body", "formData") and isinstance(param.get("schema"), dict):
+            schemas.append((param["schema"], param["in"]))
+    return schemas
+
+
+class CancellationToken:
+    """Cooperative cancel flag; the traversal checks it between path items."""
+
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class Progress:
+    """Snapshot handed to progress callbacks: ``done`` of ``total`` path items in ``stage``."""
+
+    __slots__ = ("stage", "done", "total", "elapsed")
+
+    def __init__(self, stage: str, done: int = 0, total: int = 0, elapsed: float = 0.0):
+        self.stage = stage
+        self.done = done
+        self.total = total
+        self.elapsed = elapsed
+
+    @property
+    def fraction(self) -> float:
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Seconds left, extrapolated from the rate so far (None until a path is done)."""
+        if not self.done or not self.total:
+            return None
+        return self.elapsed * (self.total - self.done) / self.done
+
+
+ProgressCallback = Callable[[Progress], None]
+
+
+class AnalysisContext:
+    """Where the traversal currently is; shared by every detector in the pass."""
+
+    __slots__ = ("spec", "global_security", "walker", "path", "path_item", "method",
+                 "operation")
+
+    def __init__(self, spec: Dict[str, Any], walker: SchemaWalker):
+        self.spec = spec
+        self.global_security = spec.get("security", [])
+        self.walker = walker
+        self.path: Optional[str] = None
+        self.path_item: Dict[str, Any] = {}
+        self.method: Optional[str] = None
+        self.operation: Optional[Dict[str, Any]] = None
+
+    @property
+    def authorization_required(self) -> bool:
+        return authorization_required(self.operation or {}, self.global_security)
+
+
+class Detector:
+    """Base class for analysis plugins.
+
+    Override only the events a detector cares about; the traversal looks at
+    which methods are overridden and never dispatches the others. Findings
+    are reported through ``traversal.report``.
+    """
+
+    name = "detector"
+
+    def start(self, ctx: AnalysisContext, traversal: "SpecTraversal") -> None:
+        """Called once before the traversal begins."""
+
+    def visit_path(self, ctx: AnalysisContext) -> None:
+        """Called when a path item is entered, before its parameters."""
+
+    def leave_path(self, ctx: AnalysisContext) -> None:
+        """Called after every operation of a path item has been visited."""
+
+    def visit_operation(self, ctx: AnalysisContext) -> None:
+        """Called when an operation is entered, before its parameters."""
+
+    def visit_parameter(self, ctx: AnalysisContext, param: Dict[str, Any]) -> None:
+        """Called for each path-level (``ctx.method`` is None) and operation parameter."""
+
+    def visit_schema(self, ctx: AnalysisContext, schema: Dict[str, Any], location: str) -> None:
+        """Called for each request body schema of an operation."""
+
+    def leave_operation(self, ctx: AnalysisContext) -> None:
+        """Called after an operation's parameters and schemas have been visited."""
+
+    def finish(self, ctx: AnalysisContext) -> None:
+        """Called once after the whole spec has been traversed."""
+
+
+class SpecTraversal:
+    """Walk ``paths`` exactly once and fan each event out to the registered detectors."""
+
+    def __init__(self, detectors: List[Detector]):
+        self.detectors = detectors
+        self.handlers: Dict[str, List[Any]] = {}
+        for event in EVENTS + ("start", "finish"):
+            base = getattr(Detector, event)
+            self.handlers[event] = [
+                getattr(d, event)
+                for d in detectors
+                if getattr(type(d), event, base) is not base
+            ]
+        self.findings: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+    def report(self, path: str, method: str, attack: Dict[str, Any]) -> None:
+        """Record a finding; duplicate techniques on the same operation are dropped."""
+        attacks = self.findings.setdefault((path, method), [])
+        if all(a["technique"] != attack["technique"] for a in attacks):
+            attacks.append(attack)
+
+    def run(
+        self,
+        spec: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancellationToken] = None,
+        progress_interval: float = 0.1,
+    ) -> Dict[str, Any]:
+        """Traverse the spec once and return the merged findings.
+
+        ``progress`` is called at most every ``progress_interval`` seconds
+        while paths are visited, and once more when they are all done.
+        ``cancel`` is checked before each path item; once set, the remaining
+        paths are skipped, ``finish`` handlers still run over what was seen,
+        and the partial result carries ``cancelled``, ``paths_analyzed`` and
+        ``paths_total``.
+        """
+        ctx = AnalysisContext(spec, SchemaWalker(spec))
+        handlers = self.handlers
+        for handler in handlers["start"]:
+            handler(ctx, self)
+
+        paths = spec.get("paths", {})
+        total = len(paths)
+        started = last_report = time.monotonic()
+        if progress is not None:
+            progress(Progress("paths", 0, total))
+        done = 0
+        cancelled = False
+        for path, path_item in paths.items():
+            if cancel is not None and cancel.cancelled:
+                cancelled = True
+                break
+            if progress is not None:
+                now = time.monotonic()
+                if now - last_report >= progress_interval:
+                    last_report = now
+                    progress(Progress("paths", done, total, now - started))
+            done += 1
+            if not isinstance(path_item, dict):
+                continue
+            ctx.path, ctx.path_item, ctx.method, ctx.operation = path, path_item, None, None
+            for handler in handlers["visit_path"]:
+                handler(ctx)
+            if handlers["visit_parameter"]:
+                for param in path_item.get("parameters", []):
+                    for handler in handlers["visit_parameter"]:
+                        handler(ctx, param)
+
+            for method, operation in list(path_item.items()):
+                if method.upper() not in HTTP_METHODS or not isinstance(operation, dict):
+                    continue
+                ctx.method, ctx.operation = method, operation
+                for handler in handlers["visit_operation"]:
+                    handler(ctx)
+                # Parameters are read after visit_operation so detectors may add to them
+                if handlers["visit_parameter"]:
+                    for param in operation.get("parameters", []):
+                        for handler in handlers["visit_parameter"]:
+                            handler(ctx, param)
+                if handlers["visit_schema"]:
+                    for schema, location in request_body_schemas(ctx.walker, operation):
+                        for handler in handlers["visit_schema"]:
+                            handler(ctx, schema, location)
+                for handler in handlers["leave_operation"]:
+                    handler(ctx)
+
+            ctx.method, ctx.operation = None, None
+            for handler in handlers["leave_path"]:
+                handler(ctx)
+
+        ctx.path, ctx.path_item = None, {}
+        if progress is not None:
+            progress(Progress("finish", done, total, time.monotonic() - started))
+        for handler in handlers["finish"]:
+            handler(ctx)
+
+        result: Dict[str, Any] = {
+            "vulnerabilities": [
+                {"path": path, "method": method, "attacks": attacks}
+                for (path, method), attacks in self.findings.items()
+            ]
+        }
+        if cancelled:
+            result.update(cancelled=True, paths_analyzed=done, paths_total=total)
+        return result
@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .analysis_framework import CancellationToken, Progress
+from .findings_store import FindingsStore
+from .profiling import profile, profiling_enabled
+from .spec_model import SpecCache
+from .swagger_analysis import IDORAnalyzer
+from .warm_pool import WarmPool
+
+AnalysisTarget = Callable[[Callable[[Progress], None], CancellationToken], Dict[str, Any]]
+
+
+class AnalysisJob:
+    """One analysis running on a daemon thread, observable and cancellable from another.
+
+    ``target(progress, cancel)`` does the work and returns the result; the
+    latest ``Progress`` it reports is kept on the job so a UI can poll it
+    without touching the worker thread. The run is profiled like any other
+    analysis when ``profile_enabled`` (or ``BUGPROWLER_PROFILE``) is on.
+    """
+
+    def __init__(
+        self,
+        target: AnalysisTarget,
+        tag: str,
+        kind: str = "analysis",
+        profile_enabled: Optional[bool] = None,
+    ):
+        self.target = target
+        self.tag = tag
+        self.kind = kind
+        self.profile_enabled = profile_enabled
+        self.token = CancellationToken()
+        self.progress = Progress("queued")
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[BaseException] = None
+        self.profile_path: Optional[str] = None
+        self.started_at = 0.0
+        self.finished_at = 0.0
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "AnalysisJob":
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name=f"{self.kind}-{self.tag}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _report(self, progress: Progress) -> None:
+        self.progress = progress
+
+    def _run(self) -> None:
+        try:
+            with profile(self.tag, kind=self.kind, enabled=self.profile_enabled) as profile_result:
+                self.result = self.target(self._report, self.token)
+            if profile_result is not None:
+                self.profile_path = profile_result.path
+        except BaseException as e:  # surfaced to the polling thread via ``error``
+            self.error = e
+        finally:
+            self.finished_at = time.monotonic()
+            self._done.set()
+
+    def cancel(self) -> None:
+        self.token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.done else time.monotonic()
+        return end - self.started_at if self.started_at else 0.0
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+def spec_analysis(
+    path: str,
+    digest: str,
+    name: str,
+    cache: SpecCache,
+    store: FindingsStore,
+    analyzer: IDORAnalyzer,
+    pool: Optional[WarmPool] = None,
+    profile_enabled: Optional[bool] = None,
+) -> AnalysisTarget:
+    """Job target for an uploaded spec: load through the cache, analyze, record the findings.
+
+    Findings are stored per spec digest, replacing those of an earlier run
+    of the same spec, so restarting an analysis never double-counts them; a
+    cancelled run stores nothing. With a ``pool``, parsing and analysis run
+    in a warm worker process instead (see ``WarmPool`` for its spec caches)
+    and the job thread only relays progress and cancellation. A profiled
+    run (``profile_enabled``, as for ``AnalysisJob``) stays in-process,
+    since the sampler only sees the job thread.
+    """
+
+    def target(progress: Callable[[Progress], None], cancel: CancellationToken) -> Dict[str, Any]:
+        progress(Progress("load"))
+        if pool is not None and not profiling_enabled(profile_enabled):
+            result = pool.analyze(path, digest, progress=progress, cancel=cancel)
+        else:
+            # Re-analyses of a resident spec skip parsing entirely
+            spec = cache.load(path, digest).to_dict()
+            result = analyzer.analyze(spec, progress=progress, cancel=cancel)
+        if not result.get("cancelled"):
+            store.replace_analysis(name, result, source=f"upload:{digest[:16]}")
+        return result
+
+    return target
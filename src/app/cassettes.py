@@ -0,0 +1,519 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from . import telemetry
+
+# Headers that describe the recorded body framing and must not be replayed verbatim
+HOP_HEADERS = {"content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class Cassette:
+    """Recorded model HTTP exchanges and tool calls of agent runs, stored as JSONL.
+
+    Entries are ``turn`` (one agent run: agent name and prompt), ``http``
+    (request body, status, headers and each response chunk with its
+    arrival offset) and ``tool`` (name, arguments, result, duration), in
+    the order they happened. Replay serves them back in the same order.
+    """
+
+    def __init__(self, entries: Optional[List[Dict[str, Any]]] = None):
+        self.entries: List[Dict[str, Any]] = entries or []
+        self.lock = threading.Lock()
+        self._http_cursor = 0
+        self._tool_cursor = 0
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path) as file:
+            return cls([json.loads(line) for line in file if line.strip()])
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as file:
+            for entry in self.entries:
+                file.write(json.dumps(entry) + "\n")
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries.append(entry)
+
+    def turns(self) -> List[Dict[str, Any]]:
+        return [e for e in self.entries if e["type"] == "turn"]
+
+    def tool_definitions(self) -> List[Dict[str, Any]]:
+        """Function definitions the model was offered, taken from recorded requests."""
+        seen: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            if entry["type"] != "http":
+                continue
+            for tool in (entry.get("request") or {}).get("tools") or []:
+                function = tool.get("function", {})
+                seen.setdefault(function.get("name"), function)
+        return list(seen.values())
+
+    def rewind(self) -> None:
+        self._http_cursor = 0
+        self._tool_cursor = 0
+
+    def next_http(self) -> Dict[str, Any]:
+        with self.lock:
+            while self._http_cursor < len(self.entries):
+                entry = self.entries[self._http_cursor]
+                self._http_cursor += 1
+                if entry["type"] == "http":
+                    return entry
+        raise LookupError("Cassette has no more recorded model exchanges")
+
+    def next_tool(self, name: str) -> Dict[str, Any]:
+        with self.lock:
+            while self._tool_cursor < len(self.entries):
+                entry = self.entries[self._tool_cursor]
+                self._tool_cursor += 1
+                if entry["type"] == "tool" and entry["name"] == name:
+                    return entry
+        raise LookupError(f"Cassette has no more recorded calls to {name}")
+
+
+class ReplayClock:
+    """Accumulates time spent waiting on (recorded) upstream model and tool latency."""
+
+    def __init__(self) -> None:
+        self.model = 0.0
+        self.tools = 0.0
+        self.first_request: Optional[float] = None
+        self.requests = 0
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+# ---------------------------------------------------------------- recording
+def _decode_body(request: httpx.Request) -> Any:
+    try:
+        return json.loads(request.content or b"null")
+    except ValueError:
+        return None
+
+
+class _RecordingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self, stream: Any, entry: Dict[str, Any], cassette: Cassette, start: float):
+        self.stream = stream
+        self.entry = entry
+        self.cassette = cassette
+        self.start = start
+
+    def _chunk(self, chunk: bytes) -> None:
+        offset = time.perf_counter() - self.start
+        self.entry["chunks"].append([round(offset, 6), base64.b64encode(chunk).decode()])
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.stream:
+            self._chunk(chunk)
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            self._chunk(chunk)
+            yield chunk
+
+    def close(self) -> None:
+        self.stream.close()
+        self.cassette.append(self.entry)
+
+    async def aclose(self) -> None:
+        await self.stream.aclose()
+        self.cassette.append(self.entry)
+
+
+def _http_entry(request: httpx.Request, response: httpx.Response, start: float) -> Dict[str, Any]:
+    return {
+        "type": "http",
+        "method": request.method,
+        "url": str(request.url),
+        "request": _decode_body(request),
+        "status": response.status_code,
+        "headers": [[k, v] for k, v in response.headers.items() if k.lower() not in HOP_HEADERS],
+        "headers_at": round(time.perf_counter() - start, 6),
+        "chunks": [],
+    }
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Pass requests to ``inner`` and record every response chunk with its timing."""
+
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.BaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = self.inner.handle_request(request)
+        entry = _http_entry(request, response, start)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, entry, self.cassette, start),
+            extensions=response.extensions,
+            request=request,
+        )
+
+
+class AsyncRecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, cassette: Cassette, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        entry = _http_entry(request, response, start)
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, entry, self.cassette, start),
+            extensions=response.extensions,
+            request=request,
+        )
+
+
+def _tool_entry(function_name: str, arguments: Dict[str, Any], result: Any, start: float) -> Dict[str, Any]:
+    # MCP tools return a ToolResult; the text content is what the model sees
+    content = getattr(result, "content", result)
+    try:
+        json.dumps(content)
+    except TypeError:
+        content = str(content)
+    return {
+        "type": "tool",
+        "name": function_name,
+        "arguments": arguments,
+        "result": content,
+        "duration": round(time.perf_counter() - start, 6),
+    }
+
+
+def recording_tool_hook(cassette: Cassette) -> Callable:
+    """agno ``tool_hooks`` entry recording synchronous tool calls."""
+
+    def hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        result = function_call(**arguments)
+        cassette.append(_tool_entry(function_name, arguments, result, start))
+        return result
+
+    return hook
+
+
+def async_recording_tool_hook(cassette: Cassette) -> Callable:
+    """agno ``tool_hooks`` entry recording tool calls of async runs (e.g. MCP tools)."""
+
+    async def hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        result = await function_call(**arguments)
+        cassette.append(_tool_entry(function_name, arguments, result, start))
+        return result
+
+    return hook
+
+
+# ------------------------------------------------------------------ replay
+class _ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """Yields recorded chunks, sleeping ``speed`` x the recorded gaps (0 = no waiting)."""
+
+    def __init__(self, entry: Dict[str, Any], speed: float, clock: ReplayClock):
+        self.entry = entry
+        self.speed = speed
+        self.clock = clock
+
+    def _plan(self) -> Iterator[Any]:
+        last = self.entry.get("headers_at", 0.0)
+        for offset, data in self.entry["chunks"]:
+            yield max(0.0, offset - last) * self.speed, base64.b64decode(data)
+            last = offset
+
+    def __iter__(self) -> Iterator[bytes]:
+        for delay, chunk in self._plan():
+            if delay:
+                time.sleep(delay)
+                self.clock.model += delay
+            yield chunk
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for delay, chunk in self._plan():
+            if delay:
+                await asyncio.sleep(delay)
+                self.clock.model += delay
+            yield chunk
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Serve recorded model responses in order, at original pace or as fast as possible."""
+
+    def __init__(self, cassette: Cassette, speed: float = 1.0, clock: Optional[ReplayClock] = None):
+        self.cassette = cassette
+        self.speed = speed
+        self.clock = clock or ReplayClock()
+
+    def _response(self, request: httpx.Request) -> Any:
+        entry = self.cassette.next_http()
+        if self.clock.first_request is None:
+            self.clock.first_request = time.perf_counter()
+        self.clock.requests += 1
+        response = httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            stream=_ReplayStream(entry, self.speed, self.clock),
+            request=request,
+        )
+        return response, entry.get("headers_at", 0.0) * self.speed
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response, delay = self._response(request)
+        if delay:
+            time.sleep(delay)
+            self.clock.model += delay
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response, delay = self._response(request)
+        if delay:
+            await asyncio.sleep(delay)
+            self.clock.model += delay
+        return response
+
+
+def replay_tools(cassette: Cassette, speed: float = 1.0, clock: Optional[ReplayClock] = None) -> List[Any]:
+    """agno Functions standing in for the recorded (e.g. MCP) tools, returning recorded results."""
+    from agno.tools.function import Function
+
+    clock = clock or ReplayClock()
+
+    def make_entrypoint(name: str) -> Callable:
+        async def entrypoint(**arguments: Any) -> Any:
+            entry = cassette.next_tool(name)
+            delay = entry["duration"] * speed
+            if delay:
+                await asyncio.sleep(delay)
+                clock.tools += delay
+            return entry["result"]
+
+        return entrypoint
+
+    return [
+        Function(
+            name=definition["name"],
+            description=definition.get("description"),
+            parameters=definition.get("parameters") or {"type": "object", "properties": {}},
+            entrypoint=make_entrypoint(definition["name"]),
+            skip_entrypoint_processing=True,
+        )
+        for definition in cassette.tool_definitions()
+    ]
+
+
+# --------------------------------------------------------------- benchmark
+class NullContainer:
+    """Stand-in for a Streamlit container so rendering cost can be timed headless."""
+
+    def empty(self) -> "NullContainer":
+        return self
+
+    def container(self) -> "NullContainer":
+        return self
+
+    def markdown(self, body: str) -> None:
+        pass
+
+
+class TimedCalls:
+    """Wrap methods of ``obj`` in place, logging ``(start, end)`` of each call (e.g. history DB I/O)."""
+
+    def __init__(self, obj: Any, names: List[str]):
+        self.calls: List[Any] = []
+        for name in names:
+            original = getattr(obj, name, None)
+            if original is not None:
+                setattr(obj, name, self._wrap(original))
+
+    def _wrap(self, func: Callable) -> Callable:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.calls.append((start, time.perf_counter()))
+
+        return wrapper
+
+    def total(self, before: float = float("inf")) -> float:
+        return sum(end - start for start, end in self.calls if end <= before)
+
+
+HISTORY_METHODS = ["get_session", "upsert_session", "get_sessions"]
+
+
+def build_agent(agent: str, cassette: Cassette, mode: str, speed: float, clock: ReplayClock, db_file: str) -> Any:
+    """An agent wired to record into or replay from ``cassette``."""
+    from .agent import build_agno_assist, create_sqlite_db
+
+    history_db = create_sqlite_db(db_file)
+    if mode == "record":
+        sync_transport: Any = RecordingTransport(cassette)
+        async_transport: Any = AsyncRecordingTransport(cassette)
+    else:
+        sync_transport = async_transport = ReplayTransport(cassette, speed, clock)
+        # The SDK insists on a key even though nothing leaves the process
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+    if agent == "assist":
+        return build_agno_assist(
+            session_id="cassette", client=httpx.Client(transport=sync_transport), history_db=history_db
+        )
+    # Only the recon agent needs the MCP client stack
+    from .reconaissance_agent import build_recon_agent
+
+    if mode == "record":
+        return build_recon_agent(
+            session_id="cassette",
+            client=httpx.AsyncClient(transport=async_transport),
+            history_db=history_db,
+            tool_hooks=[async_recording_tool_hook(cassette)],
+        )
+    return build_recon_agent(
+        session_id="cassette",
+        client=httpx.AsyncClient(transport=async_transport),
+        history_db=history_db,
+        tools=replay_tools(cassette, speed, clock),
+    )
+
+
+def run_turn(agent: Any, prompt: str, is_async: bool, render: Callable[[str], None]) -> None:
+    if is_async:
+        from .reconaissance_agent import mcp_connected
+
+        async def consume() -> None:
+            # Recording talks to the live MCP server; replayed tools are plain functions and pass through
+            async with mcp_connected(agent):
+                async for chunk in agent.arun(prompt, stream=True):
+                    if getattr(chunk, "content", None):
+                        render(chunk.content)
+
+        asyncio.run(consume())
+    else:
+        for chunk in agent.run(prompt, stream=True):
+            if getattr(chunk, "content", None):
+                render(chunk.content)
+
+
+def benchmark(cassette: Cassette, agent: str, runs: int = 10, speed: float = 0.0) -> Dict[str, Any]:
+    """Replay every turn ``runs`` times and split wall time into upstream vs our own phases.
+
+    ``upstream`` is recorded model/tool latency (0 at ``speed=0``);
+    ``prompt_assembly`` is run start to first model request, excluding
+    history I/O; ``rendering`` is time inside ``StreamingMarkdown``;
+    ``dispatch`` is everything else we do (SDK parsing, agno run loop,
+    tool dispatch).
+    """
+    from .streaming import StreamingMarkdown
+
+    phases: Dict[str, List[float]] = {
+        k: [] for k in ("total", "upstream", "history", "prompt_assembly", "rendering", "dispatch")
+    }
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            cassette.rewind()
+            clock = ReplayClock()
+            instance = build_agent(agent, cassette, "replay", speed, clock, os.path.join(tmp, "history.db"))
+            history = TimedCalls(instance.db, HISTORY_METHODS)
+            for turn in cassette.turns():
+                clock.reset()
+                history.calls.clear()
+                renderer = StreamingMarkdown(container=NullContainer())
+                rendering = 0.0
+
+                def render(text: str) -> None:
+                    nonlocal rendering
+                    start = time.perf_counter()
+                    renderer.write(text)
+                    rendering += time.perf_counter() - start
+
+                start = time.perf_counter()
+                run_turn(instance, turn["prompt"], agent == "recon", render)
+                finish = time.perf_counter()
+                renderer.finish()
+                rendering += time.perf_counter() - finish
+                total = time.perf_counter() - start
+                upstream = clock.model + clock.tools
+                first_request = clock.first_request or finish
+                history_total = history.total()
+                # History reads before the first request are part of building the prompt; split them out
+                assembly = max(0.0, first_request - start - history.total(before=first_request))
+                phases["total"].append(total)
+                phases["upstream"].append(upstream)
+                phases["history"].append(history_total)
+                phases["prompt_assembly"].append(assembly)
+                phases["rendering"].append(rendering)
+                phases["dispatch"].append(max(0.0, total - upstream - history_total - rendering - assembly))
+
+    def summary(values: List[float]) -> Dict[str, float]:
+        ordered = sorted(values)
+        return {
+            "p50_ms": round(statistics.median(ordered) * 1000, 3),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 3),
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        }
+
+    return {"agent": agent, "runs": runs, "speed": speed, "phases": {k: summary(v) for k, v in phases.items() if v}}
+
+
+def main() -> None:
+    """Record, replay or benchmark agent runs: ``python -m src.app.cassettes {record,replay,bench} ...``."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="run prompts against the live model/MCP server and save a cassette")
+    record.add_argument("cassette")
+    record.add_argument("prompts", nargs="+")
+    replay = sub.add_parser("replay", help="replay a cassette and print the answers")
+    bench = sub.add_parser("bench", help="replay a cassette repeatedly and report our overhead")
+    bench.add_argument("--runs", type=int, default=10)
+    for cmd, speed in ((replay, 1.0), (bench, 0.0)):
+        cmd.add_argument("cassette")
+        cmd.add_argument("--speed", type=float, default=speed, help="1 = original timing, 0 = as fast as possible")
+    for cmd in (record, replay, bench):
+        cmd.add_argument("--agent", choices=["assist", "recon"], default="assist")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "history.db")
+        if args.command == "record":
+            cassette = Cassette()
+            instance = build_agent(args.agent, cassette, "record", 1.0, ReplayClock(), db_file)
+            for prompt in args.prompts:
+                cassette.append({"type": "turn", "agent": args.agent, "prompt": prompt})
+                run_turn(instance, prompt, args.agent == "recon", lambda text: None)
+            cassette.save(args.cassette)
+            print(f"Recorded {len(args.prompts)} turn(s) to {args.cassette}")
+            return
+        cassette = Cassette.load(args.cassette)
+        if args.command == "replay":
+            instance = build_agent(args.agent, cassette, "replay", args.speed, ReplayClock(), db_file)
+            for turn in cassette.turns():
+                print(f"> {turn['prompt']}")
+                run_turn(instance, turn["prompt"], args.agent == "recon", lambda text: print(text, end="", flush=True))
+                print()
+            return
+    result = benchmark(cassette, args.agent, args.runs, args.speed)
+    telemetry.log_event({"span": "cassette_bench", **result})
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import html
+import json
+from typing import List, Tuple
+
+DONUT_COLORS = ["#4f46e5", "#10b981", "#f59e0b", "#ef4444", "#06b6d4", "#a855f7", "#84cc16", "#64748b"]
+
+CARD_TEMPLATE = """
+            <div class="card" style="width: 18rem; border: 1px solid #ddd; border-radius: 8px; box-shadow: 2px 2px 12px #eee; margin: 1rem;">
+                <div class="card-body" style="padding: 1rem;">
+                    <h5 class="card-title" style="font-weight: bold; font-size: 1.25rem; margin-bottom: 0.5rem;">{title}</h5>
+                    <p class="card-text" style="font-size: 2rem; color: white; margin: 0;">{value}</p>
+                </div>
+            </div>"""
+
+DONUT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body { display: flex; justify-content: center; margin: 0; background: #f5f7fa;
+               font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+        .container { display: flex; flex-direction: column; align-items: center; gap: 20px; }
+        .chart-container { position: relative; width: 300px; height: 300px; }
+        .donut-chart { width: 100%; height: 100%; border-radius: 50%; background: __GRADIENT__;
+                       display: flex; justify-content: center; align-items: center; cursor: pointer;
+                       transition: transform 0.3s ease; }
+        .donut-chart:hover { transform: scale(1.05); }
+        .donut-hole { width: 60%; height: 60%; background: #f5f7fa; border-radius: 50%; display: flex;
+                      flex-direction: column; justify-content: center; align-items: center;
+                      box-shadow: inset 0 0 20px rgba(0, 0, 0, 0.1); }
+        .total-value { font-size: 24px; font-weight: bold; color: #1f2937; margin-bottom: 4px; }
+        .total-label { font-size: 14px; color: #6b7280; text-transform: uppercase; letter-spacing: 1px; }
+        .tooltip { position: absolute; background: rgba(0, 0, 0, 0.8); color: white; padding: 8px 12px;
+                   border-radius: 4px; font-size: 12px; pointer-events: none; opacity: 0;
+                   transition: opacity 0.3s ease; z-index: 10; }
+        .legend { display: flex; flex-direction: column; gap: 12px; padding: 20px; background: white;
+                  border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); }
+        .legend-item { display: flex; align-items: center; gap: 12px; cursor: pointer;
+                       transition: transform 0.2s ease; }
+        .legend-item:hover { transform: translateX(5px); }
+        .legend-color { width: 20px; height: 20px; border-radius: 4px; }
+        .legend-text { font-size: 14px; color: #374151; font-weight: 500; }
+        .legend-value { margin-left: auto; padding-left: 16px; font-weight: 600; color: #1f2937; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="chart-container">
+            <div class="donut-chart" id="donutChart">
+                <div class="donut-hole">
+                    <div class="total-value">__TOTAL__</div>
+                    <div class="total-label">__TOTAL_LABEL__</div>
+                </div>
+                <div class="tooltip" id="tooltip"></div>
+            </div>
+        </div>
+        <div class="legend">__LEGEND__</div>
+    </div>
+    <script>
+        const donutChart = document.getElementById('donutChart');
+        const tooltip = document.getElementById('tooltip');
+        const sectors = __SECTORS__;
+        const fullGradient = `__GRADIENT__`;
+        const highlight = (sector) => {
+            donutChart.style.background = `conic-gradient(
+                ${sector.color} 0% ${sector.start}%,
+                ${sector.color} ${sector.start}% ${sector.end}%,
+                #e5e7eb ${sector.end}% 100%
+            )`;
+            tooltip.textContent = `${sector.label}: ${sector.value}`;
+            tooltip.style.opacity = 1;
+        };
+        const reset = () => {
+            tooltip.style.opacity = 0;
+            donutChart.style.background = fullGradient;
+        };
+        donutChart.addEventListener('mousemove', (e) => {
+            const rect = donutChart.getBoundingClientRect();
+            const angle = Math.atan2(e.clientY - rect.top - rect.height / 2, e.clientX - rect.left - rect.width / 2);
+            // conic-gradient starts at 12 o'clock and runs clockwise
+            const percent = (((angle * 180 / Math.PI) + 90 + 360) % 360) / 3.6;
+            const sector = sectors.find(s => percent >= s.start && percent < s.end);
+            if (!sector) { reset(); return; }
+            highlight(sector);
+            tooltip.style.left = (e.clientX - rect.left + 15) + 'px';
+            tooltip.style.top = (e.clientY - rect.top - 15) + 'px';
+        });
+        donutChart.addEventListener('mouseleave', reset);
+        document.querySelectorAll('.legend-item').forEach(item => {
+            const sector = sectors[parseInt(item.getAttribute('data-sector'))];
+            item.addEventListener('mouseenter', () => highlight(sector));
+            item.addEventListener('mouseleave', reset);
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+def render_cards(cards: List[Tuple[str, str]]) -> str:
+    """Headline metric cards as an HTML row."""
+    body = "".join(
+        CARD_TEMPLATE.format(title=html.escape(title), value=html.escape(value)) for title, value in cards
+    )
+    return f'<div style="display: flex; justify-content: space-between; flex-wrap: wrap;">{body}\n</div>'
+
+
+def render_donut(segments: List[Tuple[str, int]], total_label: str = "Total", max_segments: int = 7) -> str:
+    """Interactive donut chart for ``(label, count)`` segments; the tail is folded into 'Other'."""
+    segments = sorted(segments, key=lambda s: -s[1])
+    if len(segments) > max_segments:
+        other = sum(count for _, count in segments[max_segments - 1:])
+        segments = segments[: max_segments - 1] + [("Other", other)]
+    total = sum(count for _, count in segments) or 1
+
+    sectors = []
+    start = 0.0
+    for i, (label, count) in enumerate(segments):
+        end = start + 100.0 * count / total
+        sectors.append(
+            {
+                "start": round(start, 2),
+                "end": round(end, 2),
+                "color": DONUT_COLORS[i % len(DONUT_COLORS)],
+                "label": label,
+                "value": f"{count} ({100.0 * count / total:.0f}%)",
+            }
+        )
+        start = end
+    gradient = "conic-gradient(" + ", ".join(
+        f"{s['color']} {s['start']}% {s['end']}%" for s in sectors
+    ) + ")" if sectors else "#e5e7eb"
+    legend = "".join(
+        f'<div class="legend-item" data-sector="{i}">'
+        f'<div class="legend-color" style="background-color: {s["color"]};"></div>'
+        f'<div class="legend-text">{html.escape(s["label"])}</div>'
+        f'<div class="legend-value">{html.escape(s["value"])}</div></div>'
+        for i, s in enumerate(sectors)
+    )
+    return (
+        DONUT_TEMPLATE.replace("__GRADIENT__", gradient)
+        .replace("__TOTAL__", str(sum(count for _, count in segments)))
+        .replace("__TOTAL_LABEL__", html.escape(total_label))
+        .replace("__LEGEND__", legend)
+        .replace("__SECTORS__", json.dumps(sectors).replace("</", "<\\/"))
+    )
@@ -0,0 +1,223 @@
+import re
+from typing import Any, Dict, List, Pattern, Set
+
+from .analysis_framework import AnalysisContext, Detector, SpecTraversal
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def word_pattern(words: str) -> Pattern[str]:
+    """Match any of ``words`` (or its plural) as a whole path segment, ``-``/``_`` part or camelCase word.
+
+    ``/authors`` or ``/shipping`` must not count as ``auth`` or ``pin``, while
+    ``/auth/token``, ``user_id`` and ``userId`` still do.
+    """
+    return re.compile(rf"(?:(?<![A-Za-z])|(?<=[a-z])(?=[A-Z]))(?i:(?:{words})(?:e?s)?)(?![a-z])")
+
+
+def security_scopes(operation: Dict[str, Any], global_security: List[Any]) -> Set[str]:
+    """All scheme names and scopes an operation's security requirements mention."""
+    scopes = set()
+    for requirement in operation.get("security", global_security) or []:
+        if isinstance(requirement, dict):
+            for scheme, scheme_scopes in requirement.items():
+                scopes.add(scheme)
+                scopes.update(f"{scheme}:{s}" for s in scheme_scopes or [])
+    return scopes
+
+
+class BFLADetector(Detector):
+    """Broken function level authorization: privileged verbs without stricter auth."""
+
+    name = "bfla"
+
+    def __init__(self):
+        self.privileged_pattern = word_pattern(
+            r"admin|administrator|internal|manage|management|role|permission|"
+            r"config|setting|impersonate|sudo"
+        )
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+
+    def leave_path(self, ctx: AnalysisContext) -> None:
+        operations = {
+            m.upper(): op
+            for m, op in ctx.path_item.items()
+            if m.upper() in WRITE_METHODS | {"GET"} and isinstance(op, dict)
+        }
+        admin_path = bool(self.privileged_pattern.search(ctx.path))
+        read_op = operations.get("GET")
+        read_scopes = (
+            security_scopes(read_op, ctx.global_security) if read_op is not None else None
+        )
+        # Reads already carrying scopes means the API splits privileges by scope
+        scope_split = bool(read_scopes) and any(":" in s for s in read_scopes)
+        for method, operation in operations.items():
+            privileged = admin_path or any(
+                self.privileged_pattern.search(str(tag)) for tag in operation.get("tags") or []
+            )
+            if method == "GET" and not privileged:
+                continue
+            if method != "DELETE" and not privileged:
+                continue
+            scopes = security_scopes(operation, ctx.global_security)
+            requirements = operation.get("security", ctx.global_security)
+            if not requirements or requirements == [{}]:
+                self.traversal.report(
+                    ctx.path,
+                    method.lower(),
+                    {
+                        "technique": "Unauthenticated privileged function",
+                        "description": "Privileged operation declares no security requirement; call it without credentials or as a regular user.",
+                    },
+                )
+            elif ((privileged and not any(":" in s for s in scopes)) or scope_split) and (
+                read_scopes is None or scopes <= read_scopes
+            ):
+                self.traversal.report(
+                    ctx.path,
+                    method.lower(),
+                    {
+                        "technique": "Broken function level authorization",
+                        "description": "Privileged operation requires no scope or role beyond what ordinary reads need; replay it with a low-privilege user's token.",
+                    },
+                )
+
+
+class MassAssignmentDetector(Detector):
+    """Writable request-body fields that should only be set by the server."""
+
+    name = "mass-assignment"
+
+    def __init__(self):
+        self.sensitive_fields = {
+            "role",
+            "roles",
+            "isadmin",
+            "is_admin",
+            "admin",
+            "permissions",
+            "scopes",
+            "owner",
+            "ownerid",
+            "owner_id",
+            "tenantid",
+            "tenant_id",
+            "balance",
+            "credit",
+            "credits",
+            "price",
+            "discount",
+            "verified",
+            "isverified",
+            "is_verified",
+            "emailverified",
+            "approved",
+            "status",
+            "createdby",
+            "created_by",
+            "plan",
+            "subscription",
+        }
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+
+    def visit_schema(self, ctx: AnalysisContext, schema: Dict[str, Any], location: str) -> None:
+        if ctx.method.upper() not in WRITE_METHODS:
+            return
+        exposed = []
+        for name, leaf, _, _ in ctx.walker.fields(schema):
+            leaf_name = name.rsplit(".", 1)[-1].replace("[]", "").lower()
+            if leaf_name in self.sensitive_fields and not leaf.get("readOnly"):
+                exposed.append(name)
+        if exposed:
+            fields = ", ".join(f"`{f}`" for f in exposed[:5])
+            self.traversal.report(
+                ctx.path,
+                ctx.method,
+                {
+                    "technique": "Mass assignment",
+                    "description": f"Request body accepts server-controlled fields ({fields}); submit elevated values and check whether they persist.",
+                },
+            )
+
+
+class UnauthenticatedSensitiveDetector(Detector):
+    """Endpoints that handle sensitive resources but declare no security requirement."""
+
+    name = "unauthenticated-sensitive"
+
+    def __init__(self):
+        self.sensitive_pattern = word_pattern(
+            r"user|account|admin|profile|payment|invoice|order|billing|card|token|"
+            r"password|secret|credential|key|email|phone|address|ssn|document|file"
+        )
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+
+    def leave_operation(self, ctx: AnalysisContext) -> None:
+        if ctx.authorization_required:
+            return
+        names = [ctx.path] + [
+            p.get("name", "")
+            for p in ctx.path_item.get("parameters", []) + ctx.operation.get("parameters", [])
+        ]
+        if any(self.sensitive_pattern.search(n) for n in names):
+            self.traversal.report(
+                ctx.path,
+                ctx.method,
+                {
+                    "technique": "Unauthenticated sensitive endpoint",
+                    "description": "Operation touches sensitive data but declares no security requirement; request it without credentials.",
+                },
+            )
+
+
+class RateLimitDetector(Detector):
+    """Credential and verification endpoints with no sign of rate limiting."""
+
+    name = "rate-limit"
+
+    def __init__(self):
+        self.throttle_pattern = word_pattern(
+            r"login|signin|sign-in|logon|auth|authenticate|authentication|oauth|token|otp|mfa|2fa|"
+            r"password|reset|verify|verification|register|signup|sign-up|code|pin"
+        )
+        self.rate_limit_headers = ("x-ratelimit", "ratelimit", "x-rate-limit", "retry-after")
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+
+    def leave_operation(self, ctx: AnalysisContext) -> None:
+        if ctx.method.upper() not in WRITE_METHODS | {"GET"}:
+            return
+        if not self.throttle_pattern.search(ctx.path):
+            return
+        responses = ctx.operation.get("responses") or {}
+        if "429" in responses or 429 in responses:
+            return
+        for response in responses.values():
+            headers = response.get("headers") if isinstance(response, dict) else None
+            if any(str(h).lower().startswith(self.rate_limit_headers) for h in headers or {}):
+                return
+        self.traversal.report(
+            ctx.path,
+            ctx.method,
+            {
+                "technique": "Missing rate limiting",
+                "description": "Credential or verification endpoint documents no 429 response or rate-limit headers; test brute force and OTP enumeration.",
+            },
+        )
+
+
+def default_detectors() -> List[Detector]:
+    """The non-IDOR vulnerability classes shipped with BugProwler."""
+    return [
+        BFLADetector(),
+        MassAssignmentDetector(),
+        UnauthenticatedSensitiveDetector(),
+        RateLimitDetector(),
+    ]
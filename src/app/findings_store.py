@@ -0,0 +1,300 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_DB_PATH = os.environ.get("BUGPROWLER_FINDINGS_DB", "findings.db")
+# Like the queue: keep WAL on local disk, use DELETE when the file is on shared storage
+DEFAULT_JOURNAL_MODE = os.environ.get("BUGPROWLER_FINDINGS_JOURNAL", "WAL")
+
+REPORT_STATUSES = ["Draft", "Submitted", "Under Review", "Triaged", "Acknowledged", "Resolved", "Duplicate", "Informative", "N/A"]
+# Statuses that count as a valid bug on the dashboard
+VALID_STATUSES = {"Triaged", "Acknowledged", "Resolved"}
+
+# Rollups are maintained by triggers so every insert/update/delete keeps them
+# exact and the dashboard never has to scan the raw tables.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'Draft',
+    reward REAL NOT NULL DEFAULT 0,
+    body TEXT,
+    source TEXT,
+    created_at REAL NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_by_created ON reports (created_at DESC);
+
+CREATE TABLE IF NOT EXISTS findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER REFERENCES reports (id),
+    target TEXT NOT NULL,
+    path TEXT NOT NULL,
+    method TEXT NOT NULL,
+    technique TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL DEFAULT 'New',
+    source TEXT,
+    created_at REAL NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_by_created ON findings (created_at DESC);
+CREATE INDEX IF NOT EXISTS findings_by_target ON findings (target, created_at DESC);
+CREATE INDEX IF NOT EXISTS findings_by_source ON findings (source);
+
+-- Deleted finding ids in deletion order, so incremental consumers can drop them
+CREATE TABLE IF NOT EXISTS finding_deletions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    finding_id INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS finding_rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    findings INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS report_rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    reports INTEGER NOT NULL,
+    reward REAL NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS findings_rollup_insert AFTER INSERT ON findings BEGIN
+    INSERT INTO finding_rollups (dimension, key, findings) VALUES
+        ('all', '*', 1), ('day', NEW.day, 1), ('technique', NEW.technique, 1),
+        ('target', NEW.target, 1), ('status', NEW.status, 1)
+    ON CONFLICT (dimension, key) DO UPDATE SET findings = findings + excluded.findings;
+END;
+
+CREATE TRIGGER IF NOT EXISTS findings_rollup_delete AFTER DELETE ON findings BEGIN
+    UPDATE finding_rollups SET findings = findings - 1
+    WHERE (dimension, key) IN (VALUES ('all', '*'), ('day', OLD.day),
+        ('technique', OLD.technique), ('target', OLD.target), ('status', OLD.status));
+    INSERT INTO finding_deletions (finding_id) VALUES (OLD.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS findings_rollup_status AFTER UPDATE OF status ON findings
+WHEN OLD.status <> NEW.status BEGIN
+    UPDATE finding_rollups SET findings = findings - 1
+    WHERE dimension = 'status' AND key = OLD.status;
+    INSERT INTO finding_rollups (dimension, key, findings) VALUES ('status', NEW.status, 1)
+    ON CONFLICT (dimension, key) DO UPDATE SET findings = findings + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS reports_rollup_insert AFTER INSERT ON reports BEGIN
+    INSERT INTO report_rollups (dimension, key, reports, reward) VALUES
+        ('all', '*', 1, NEW.reward), ('status', NEW.status, 1, NEW.reward),
+        ('day', NEW.day, 1, NEW.reward)
+    ON CONFLICT (dimension, key) DO UPDATE SET
+        reports = reports + 1, reward = reward + excluded.reward;
+END;
+
+CREATE TRIGGER IF NOT EXISTS reports_rollup_delete AFTER DELETE ON reports BEGIN
+    UPDATE report_rollups SET reports = reports - 1, reward = reward - OLD.reward
+    WHERE (dimension, key) IN (VALUES ('all', '*'), ('status', OLD.status), ('day', OLD.day));
+END;
+
+CREATE TRIGGER IF NOT EXISTS reports_rollup_update AFTER UPDATE OF status, reward ON reports BEGIN
+    UPDATE report_rollups SET reports = reports - 1, reward = reward - OLD.reward
+    WHERE (dimension, key) IN (VALUES ('all', '*'), ('status', OLD.status), ('day', OLD.day));
+    INSERT INTO report_rollups (dimension, key, reports, reward) VALUES
+        ('all', '*', 1, NEW.reward), ('status', NEW.status, 1, NEW.reward),
+        ('day', NEW.day, 1, NEW.reward)
+    ON CONFLICT (dimension, key) DO UPDATE SET
+        reports = reports + 1, reward = reward + excluded.reward;
+END;
+"""
+
+
+def day_of(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+class FindingsStore:
+    """SQLite-backed store of analyzer findings and bug reports with live rollups."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, journal_mode: str = DEFAULT_JOURNAL_MODE):
+        self.db_path = db_path
+        self.journal_mode = journal_mode
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread; Streamlit serves each session from its own thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------------------------------------------------------------- writes
+    def add_findings(
+        self,
+        target: str,
+        findings: Iterable[Tuple[str, str, str, str]],
+        source: str = "analyzer",
+        report_id: Optional[int] = None,
+        created_at: Optional[float] = None,
+    ) -> int:
+        """Insert ``(path, method, technique, description)`` rows in one transaction."""
+        created_at = created_at if created_at is not None else time.time()
+        day = day_of(created_at)
+        rows = [
+            (report_id, target, path, method.upper(), technique, description, source, created_at, day)
+            for path, method, technique, description in findings
+        ]
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO findings (report_id, target, path, method, technique, description,"
+                " source, created_at, day) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def record_analysis(self, target: str, result: Dict[str, Any], source: str = "analyzer") -> int:
+        """Store every technique flagged by an analyzer run as a finding."""
+        return self.add_findings(
+            target,
+            (
+                (v["path"], v["method"], attack["technique"], attack.get("description", ""))
+                for v in result.get("vulnerabilities", [])
+                for attack in v.get("attacks", [])
+            ),
+            source=source,
+        )
+
+    def replace_analysis(self, target: str, result: Dict[str, Any], source: str) -> int:
+        """Idempotent ``record_analysis``: findings previously stored under ``source`` are replaced.
+
+        Used with a per-job or per-upload ``source``, so a job that is
+        re-run after a crash or restarted never double-counts its findings.
+        """
+        created_at = time.time()
+        day = day_of(created_at)
+        rows = [
+            (target, v["path"], v["method"].upper(), attack["technique"], attack.get("description", ""), source, created_at, day)
+            for v in result.get("vulnerabilities", [])
+            for attack in v.get("attacks", [])
+        ]
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM findings WHERE source = ?", (source,))
+            conn.executemany(
+                "INSERT INTO findings (target, path, method, technique, description, source, created_at, day)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def add_report(
+        self,
+        title: str,
+        target: str,
+        body: str = "",
+        status: str = "Draft",
+        reward: float = 0.0,
+        source: str = "analyst",
+        created_at: Optional[float] = None,
+    ) -> int:
+        created_at = created_at if created_at is not None else time.time()
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO reports (title, target, status, reward, body, source, created_at, day)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (title, target, status, reward, body, source, created_at, day_of(created_at)),
+            )
+        return cursor.lastrowid
+
+    def update_report(self, report_id: int, status: Optional[str] = None, reward: Optional[float] = None) -> None:
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "UPDATE reports SET status = COALESCE(?, status), reward = COALESCE(?, reward)"
+                " WHERE id = ?",
+                (status, reward, report_id),
+            )
+
+    # ----------------------------------------------------------------- reads
+    def finding_rollup(self, dimension: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """``(key, count)`` pairs for one rollup dimension, largest first."""
+        sql = (
+            "SELECT key, findings FROM finding_rollups WHERE dimension = ? AND findings > 0"
+            " ORDER BY findings DESC, key"
+        )
+        params: Tuple[Any, ...] = (dimension,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [(row["key"], row["findings"]) for row in self.connection().execute(sql, params)]
+
+    def findings_per_day(self, days: int = 30) -> List[Tuple[str, int]]:
+        since = day_of(time.time() - (days - 1) * 86400)
+        rows = self.connection().execute(
+            "SELECT key, findings FROM finding_rollups WHERE dimension = 'day' AND key >= ?"
+            " ORDER BY key",
+            (since,),
+        )
+        return [(row["key"], row["findings"]) for row in rows]
+
+    def summary(self) -> Dict[str, Any]:
+        """Dashboard headline numbers, read from rollups only."""
+        conn = self.connection()
+        by_status = {
+            row["key"]: (row["reports"], row["reward"])
+            for row in conn.execute(
+                "SELECT key, reports, reward FROM report_rollups WHERE dimension = 'status'"
+            )
+        }
+        total = conn.execute(
+            "SELECT findings FROM finding_rollups WHERE dimension = 'all' AND key = '*'"
+        ).fetchone()
+        return {
+            "reports_submitted": sum(n for s, (n, _) in by_status.items() if s != "Draft"),
+            "valid_bugs": sum(n for s, (n, _) in by_status.items() if s in VALID_STATUSES),
+            "total_rewards": sum(r for _, r in by_status.values()),
+            "findings": total["findings"] if total else 0,
+        }
+
+    def recent_reports(self, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self.connection().execute(
+            "SELECT id, title, target, status, reward, body, source, created_at FROM reports"
+            " ORDER BY created_at DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(row) for row in rows]
+
+    def findings_after(self, after_id: int, limit: int = 5000) -> List[Dict[str, Any]]:
+        """Findings with ``id > after_id`` in id order, for incremental consumers."""
+        rows = self.connection().execute(
+            "SELECT id, target, path, method, technique, description FROM findings"
+            " WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def finding_deletions_after(self, after_seq: int, limit: int = 5000) -> List[Tuple[int, int]]:
+        """``(seq, finding_id)`` for findings deleted after ``after_seq``, in deletion order."""
+        rows = self.connection().execute(
+            "SELECT seq, finding_id FROM finding_deletions WHERE seq > ? ORDER BY seq LIMIT ?",
+            (after_seq, limit),
+        )
+        return [(row["seq"], row["finding_id"]) for row in rows]
+
+    def reports_after(self, after_id: int, limit: int = 5000) -> List[Dict[str, Any]]:
+        rows = self.connection().execute(
+            "SELECT id, title, target, body FROM reports WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        )
+        return [dict(row) for row in rows]
@@ -0,0 +1,10 @@
+"""Preloaded by ``WarmPool``'s fork server: importing it runs ``preload`` there.
+
+Streamlit starts threads before the app script runs, so the pool forks its
+workers from a fork server instead of the app. Warming that server up and
+freezing its heap gives those workers the same copy-on-write start as ones
+forked from a preloaded single-threaded parent.
+"""
+from .warm_pool import preload
+
+preload()
@@ -0,0 +1,297 @@
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import telemetry
+
+# Lower value wins: an interactive chat turn always goes ahead of recon, and
+# both go ahead of bulk enrichment.
+PRIORITIES = {"interactive": 0, "recon": 1, "batch": 2}
+
+# Statuses worth retrying before anything has reached the caller
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str, reserve: Optional[int] = None) -> int:
+    """Rough prompt size (~4 chars/token) plus a reserve for history and the completion."""
+    if reserve is None:
+        reserve = int(os.environ.get("BUGPROWLER_LLM_RESERVE_TOKENS", "1024"))
+    return len(text) // 4 + reserve
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of a provider error (agno's ModelProviderError or the raw openai error)."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on the error or the openai error it wraps."""
+    for err in (exc, exc.__cause__):
+        headers = getattr(getattr(err, "response", None), "headers", None)
+        if not headers:
+            continue
+        value = headers.get("retry-after-ms")
+        if value:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return None
+
+
+class TokenBucket:
+    """Per-minute budget refilled continuously; ``capacity`` is the burst size."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is available now)."""
+        self._refill(now)
+        # A single request larger than the whole burst only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Settle an estimate: positive ``delta`` charges more, negative refunds."""
+        self.level = min(self.capacity, self.level - delta)
+
+
+class Grant:
+    """Budget reserved for one run; ``settle`` reconciles it with actual usage."""
+
+    __slots__ = ("scheduler", "tokens", "settled")
+
+    def __init__(self, scheduler: "LLMScheduler", tokens: int):
+        self.scheduler = scheduler
+        self.tokens = tokens
+        self.settled = False
+
+    def settle(self, actual_tokens: int) -> None:
+        if self.settled:
+            return
+        self.settled = True
+        self.scheduler._adjust_tokens(actual_tokens - self.tokens)
+
+
+class LLMScheduler:
+    """Central admission control for every model call.
+
+    Waiters are served strictly by priority class (FIFO within a class), and
+    a request is admitted only when both the requests-per-minute and the
+    tokens-per-minute buckets can cover it. Rate-limit responses push a
+    shared pause so every queued caller backs off together instead of
+    retrying into a 429 storm; the pause shrinks again as calls succeed.
+
+    Limits come from ``BUGPROWLER_LLM_RPM`` / ``BUGPROWLER_LLM_TPM``. To run
+    against a local mock model server, point ``OPENAI_BASE_URL`` at it.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_attempts: int = 4,
+        base_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.requests = TokenBucket(rpm or int(os.environ.get("BUGPROWLER_LLM_RPM", "500")))
+        self.tokens = TokenBucket(tpm or int(os.environ.get("BUGPROWLER_LLM_TPM", "200000")))
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.backoff = 0.0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, object]] = []
+        self._seq = itertools.count()
+
+    # ------------------------------------------------------------ admission
+    def _publish_depth(self) -> None:
+        depth: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        names = {rank: name for name, rank in PRIORITIES.items()}
+        for rank, _, _ in self._queue:
+            depth[names[rank]] += 1
+        gauge = telemetry.registry.gauge(
+            "bugprowler_llm_queue_depth", "Model calls waiting for rate budget, by priority."
+        )
+        for name, value in depth.items():
+            gauge.set(value, telemetry.label_key({"priority": name}))
+
+    def acquire(self, priority: str = "interactive", tokens: int = 1024) -> Grant:
+        """Block until the call may be sent; returns the reserved budget."""
+        rank = PRIORITIES[priority]
+        start = time.monotonic()
+        entry = (rank, next(self._seq), object())
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._publish_depth()
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._queue[0] is entry:
+                        wait = max(
+                            self.paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now),
+                        )
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._publish_depth()
+                # The next head has to re-check the buckets for itself
+                self._cond.notify_all()
+        telemetry.registry.histogram(
+            "bugprowler_llm_queue_wait_seconds", "Time model calls waited for rate budget."
+        ).observe(time.monotonic() - start, telemetry.label_key({"priority": priority}))
+        return Grant(self, tokens)
+
+    def _adjust_tokens(self, delta: int) -> None:
+        with self._cond:
+            self.tokens.adjust(delta)
+            self._cond.notify_all()
+
+    # -------------------------------------------------------------- backoff
+    def record_success(self) -> None:
+        with self._cond:
+            self.backoff /= 2
+            if self.backoff < self.base_backoff:
+                self.backoff = 0.0
+
+    def record_rate_limit(self, hint: Optional[float] = None) -> float:
+        """Widen the shared pause after a 429; returns the delay applied."""
+        with self._cond:
+            self.backoff = min(self.max_backoff, max(self.base_backoff, self.backoff * 2))
+            delay = max(self.backoff, hint or 0.0)
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+            self._cond.notify_all()
+        telemetry.registry.counter(
+            "bugprowler_llm_rate_limited_total", "Rate-limit responses from the model provider."
+        ).inc()
+        return delay
+
+    def _should_retry(self, exc: BaseException, attempt: int, delivered: bool) -> Optional[float]:
+        """Delay before retrying ``exc``, or None to re-raise it."""
+        status = error_status(exc)
+        if delivered or status not in RETRYABLE_STATUSES or attempt + 1 >= self.max_attempts:
+            return None
+        if status == 429:
+            # The pause is enforced by acquire(); nothing extra to sleep here
+            self.record_rate_limit(retry_after(exc))
+            return 0.0
+        return min(self.max_backoff, self.base_backoff * 2**attempt)
+
+    # ------------------------------------------------------------- wrappers
+    def stream(
+        self,
+        start: Callable[[], Iterator[Any]],
+        priority: str = "interactive",
+        tokens: int = 1024,
+    ) -> Iterator[Any]:
+        """Run ``start()`` (e.g. ``lambda: agent.run(..., stream=True)``) under the scheduler.
+
+        Failed attempts are retried only until the first chunk has been
+        yielded: past that point the run may have called tools or streamed
+        output, and replaying it would repeat both. Token usage reported by
+        the trailing RunOutput settles the reservation.
+        """
+        for attempt in range(self.max_attempts):
+            grant = self.acquire(priority, tokens)
+            delivered = False
+            try:
+                for chunk in start():
+                    delivered = True
+                    usage = _usage(chunk)
+                    if usage is not None:
+                        grant.settle(usage)
+                    yield chunk
+                self.record_success()
+                return
+            except Exception as exc:
+                # A failed call consumed no tokens we know of; hand the reservation back
+                grant.settle(0)
+                delay = self._should_retry(exc, attempt, delivered)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    async def astream(
+        self,
+        start: Callable[[], AsyncIterator[Any]],
+        priority: str = "interactive",
+        tokens: int = 1024,
+    ) -> AsyncIterator[Any]:
+        """Async counterpart of ``stream`` for ``agent.arun``."""
+        for attempt in range(self.max_attempts):
+            # Waiting for budget must not block the event loop
+            grant = await asyncio.to_thread(self.acquire, priority, tokens)
+            delivered = False
+            try:
+                async for chunk in start():
+                    delivered = True
+                    usage = _usage(chunk)
+                    if usage is not None:
+                        grant.settle(usage)
+                    yield chunk
+                self.record_success()
+                return
+            except Exception as exc:
+                # A failed call consumed no tokens we know of; hand the reservation back
+                grant.settle(0)
+                delay = self._should_retry(exc, attempt, delivered)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+
+def _usage(chunk: Any) -> Optional[int]:
+    """Total tokens from the trailing RunOutput, which has metrics but no ``event``."""
+    if hasattr(chunk, "event") or not hasattr(chunk, "metrics"):
+        return None
+    return getattr(chunk.metrics, "total_tokens", None)
+
+
+_default: Optional[LLMScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Process-wide scheduler shared by every agent and session."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = LLMScheduler()
+        return _default
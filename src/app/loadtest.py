@@ -0,0 +1,545 @@
+import abc
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from . import telemetry
+from .agent_pool import FairScheduler, SessionAgentPool
+from .analysis_jobs import AnalysisJob, spec_analysis
+from .cassettes import NullContainer
+from .detectors import default_detectors
+from .findings_store import FindingsStore
+from .llm_scheduler import LLMScheduler, estimate_tokens
+from .spec_model import SpecCache
+from .streaming import StreamingMarkdown
+from .swagger_analysis import IDORAnalyzer
+from .uploads import spool_upload
+from .warm_pool import DEFAULT_WORKERS, WarmPool
+
+FLOWS = ("analysis", "chat", "recon")
+
+DEFAULT_PROMPTS = (
+    "Which endpoints of the uploaded API are most likely to have IDOR issues?",
+    "Explain how to test object level authorization on a REST API.",
+    "Summarize the findings for the orders service and suggest next steps.",
+)
+
+ANSWER = (
+    "Based on the spec, the **/users/{userId}/orders/{orderId}** endpoints take sequential "
+    "identifiers and inherit a single bearer scheme.\n\n"
+    "1. Replay `GET /users/{userId}/orders/{orderId}` with another user's token.\n"
+    "2. Try `PUT` with the `ownerId` field set to a victim account.\n\n"
+    "```http\nGET /users/1002/orders/77 HTTP/1.1\nAuthorization: Bearer <attacker>\n```\n"
+)
+
+
+# ------------------------------------------------------------ mock model
+class MockModelHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible ``/v1/chat/completions`` that streams a canned answer.
+
+    When the request offers tools and no tool result has come back yet, the
+    first tool is called once, so recon turns exercise the tool loop.
+    """
+
+    protocol_version = "HTTP/1.1"
+    ttft = 0.3
+    token_delay = 0.02
+    tokens = 60
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+        messages = body.get("messages") or []
+        tools = body.get("tools") or []
+        call_tool = tools and not any(m.get("role") == "tool" for m in messages)
+        words = (ANSWER.split(" ") * (self.tokens // 40 + 1))[: self.tokens]
+
+        if not body.get("stream"):
+            time.sleep(self.ttft + self.token_delay * len(words))
+            payload = json.dumps(
+                {
+                    "id": "mock", "object": "chat.completion", "created": 0, "model": body.get("model", "mock"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": " ".join(words)}}],
+                    "usage": {"prompt_tokens": 100, "completion_tokens": len(words), "total_tokens": 100 + len(words)},
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.send_header("transfer-encoding", "chunked")
+        self.end_headers()
+
+        def send(obj: Any) -> None:
+            data = b"data: [DONE]\n\n" if obj is None else f"data: {json.dumps(obj)}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> Dict[str, Any]:
+            return {"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": body.get("model", "mock"),
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+        time.sleep(self.ttft)
+        if call_tool:
+            function = tools[0].get("function", {})
+            required = (function.get("parameters") or {}).get("required") or []
+            arguments = json.dumps({name: "example.com" for name in required})
+            send(chunk({"role": "assistant", "tool_calls": [
+                {"index": 0, "id": "call_mock", "type": "function",
+                 "function": {"name": function.get("name"), "arguments": arguments}}]}))
+            send(chunk({}, "tool_calls"))
+        else:
+            for word in words:
+                time.sleep(self.token_delay)
+                send(chunk({"role": "assistant", "content": word + " "}))
+            send(chunk({}, "stop"))
+        send({"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": body.get("model", "mock"),
+              "choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": len(words),
+                                       "total_tokens": 100 + len(words)}})
+        send(None)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def serve_mock_model(port: int, ttft: float, token_delay: float, tokens: int) -> None:
+    handler = type("Handler", (MockModelHandler,), {"ttft": ttft, "token_delay": token_delay, "tokens": tokens})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+
+# -------------------------------------------------------------- stub MCP
+def serve_stub_mcp(port: int, tool_delay: float) -> None:
+    """Streamable-HTTP MCP server with canned recon tools (``/mcp``)."""
+    from mcp.server.fastmcp import FastMCP
+
+    server = FastMCP("bugprowler-stub-recon", host="127.0.0.1", port=port, log_level="WARNING", stateless_http=True)
+
+    @server.tool()
+    async def enumerate_subdomains(domain: str) -> List[str]:
+        """List known subdomains of a domain."""
+        await asyncio.sleep(tool_delay)
+        return [f"{name}.{domain}" for name in ("api", "admin", "staging", "auth", "cdn")]
+
+    @server.tool()
+    async def scan_ports(host: str) -> Dict[str, Any]:
+        """Report open TCP ports and service banners for a host."""
+        await asyncio.sleep(tool_delay)
+        return {"host": host, "open": {"22": "OpenSSH 8.9", "443": "nginx", "8080": "Jetty 9.4"}}
+
+    server.run(transport="streamable-http")
+
+
+def start_server(target: Callable[..., None], *args: Any) -> multiprocessing.Process:
+    # Servers run in their own process so they do not compete with the load for the GIL
+    process = multiprocessing.Process(target=target, args=args, daemon=True)
+    process.start()
+    return process
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"nothing listening on port {port} after {timeout}s")
+
+
+# ---------------------------------------------------------------- memory
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # ru_maxrss is a high-water mark (KiB on Linux, bytes on macOS); the best we have elsewhere
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemorySampler:
+    """Samples process RSS on a daemon thread; ``peak`` is the high-water mark since ``reset``."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak = self.start = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def reset(self) -> None:
+        self.peak = self.start = rss_bytes()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# ----------------------------------------------------------------- flows
+def synthetic_spec(paths: int, seed: int = 0) -> Dict[str, Any]:
+    """An OpenAPI document shaped like a typical CRUD service, ``paths`` path items long."""
+    rng = random.Random(seed)
+    resources = ["user", "account", "order", "invoice", "file", "group", "token", "report"]
+    spec: Dict[str, Any] = {
+        "openapi": "3.0.0",
+        "info": {"title": f"Load test API {seed}", "version": "1"},
+        "security": [{"bearer": []}],
+        "paths": {},
+        "components": {"schemas": {
+            name.title(): {"type": "object", "required": ["id"], "properties": {
+                "id": {"type": "integer", "description": f"{name} identifier"},
+                "ownerId": {"type": "string", "format": "uuid"},
+                "role": {"type": "string", "enum": ["user", "admin"]},
+                "email": {"type": "string", "format": "email"},
+            }} for name in resources
+        }},
+    }
+    for i in range(paths):
+        parent, child = rng.choice(resources), rng.choice(resources)
+        ref = {"$ref": f"#/components/schemas/{child.title()}"}
+        id_param = {"name": f"{child}Id", "in": "path", "required": True, "schema": {"type": "integer"}}
+        spec["paths"][f"/{parent}s/{{{parent}Id}}/{child}s/{{{child}Id}}/v{i}"] = {
+            "parameters": [{"name": f"{parent}Id", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "get": {"parameters": [id_param], "responses": {"200": {"description": "OK"}}},
+            "put": {"parameters": [id_param], "requestBody": {"content": {"application/json": {"schema": ref}}},
+                    "responses": {"204": {"description": "Updated"}}},
+            "delete": {"parameters": [id_param], "security": [], "responses": {"204": {"description": "Deleted"}}},
+        }
+    return spec
+
+
+class Flow(abc.ABC):
+    """One user-facing flow; ``run`` is a single iteration for virtual user ``user``."""
+
+    name = "flow"
+
+    @abc.abstractmethod
+    def run(self, user: int, iteration: int) -> None:
+        """Drive the flow once; exceptions count as errors for the stage."""
+
+
+class AnalysisFlow(Flow):
+    """Upload -> spool -> background analysis job -> findings, as the Swagger page does it."""
+
+    name = "analysis"
+
+    def __init__(self, store: FindingsStore, spec: bytes, unique: bool = True, pool: Optional[WarmPool] = None):
+        self.store = store
+        self.cache = SpecCache()
+        self.spec = spec
+        self.unique = unique
+        self.pool = pool
+
+    def run(self, user: int, iteration: int) -> None:
+        data = self.spec
+        if self.unique:
+            # A distinct digest per upload, so every run parses instead of hitting the spec cache.
+            # Trailing blank lines of different lengths leave any JSON or YAML document unchanged.
+            data = data + b"\n" + b" " * (user + 1) + b"\n" + b" " * (iteration + 1) + b"\n"
+        upload = spool_upload(io.BytesIO(data), name=f"loadtest-{user}.json")
+        try:
+            target = spec_analysis(
+                upload.path, upload.digest, upload.name, self.cache, self.store,
+                IDORAnalyzer(detectors=default_detectors()), pool=self.pool,
+            )
+            job = AnalysisJob(target, upload.tag).start()
+            job.wait()
+            if job.error is not None:
+                raise job.error
+        finally:
+            upload.delete()
+
+
+class ChatFlow(Flow):
+    """Agno Assist turns through the session pool, fair scheduler and LLM scheduler."""
+
+    name = "chat"
+
+    def __init__(self, store: FindingsStore, scheduler: FairScheduler, llm: LLMScheduler,
+                 history_db: Any, retrieval_dir: str, prompts: List[str], debug_mode: bool = False):
+        from .agent import build_agno_assist
+        from .retrieval import FindingsRetriever
+
+        retriever = FindingsRetriever(store, directory=retrieval_dir).start()
+        self.pool = SessionAgentPool(
+            lambda sid: build_agno_assist(
+                session_id=sid, knowledge_retriever=retriever.knowledge_retriever, history_db=history_db
+            )
+        )
+        self.scheduler = scheduler
+        self.llm = llm
+        self.prompts = prompts
+        self.debug_mode = debug_mode
+
+    def run(self, user: int, iteration: int) -> None:
+        session_id = f"loadtest-chat-{user}"
+        agent = self.pool.get(session_id)
+        prompt = self.prompts[iteration % len(self.prompts)]
+        with self.scheduler.slot(session_id):
+            renderer = StreamingMarkdown(container=NullContainer())
+            for chunk in telemetry.instrument_stream(
+                self.llm.stream(
+                    lambda: agent.run(prompt, stream=True, yield_run_response=True,
+                                      session_id=session_id, debug_mode=self.debug_mode),
+                    priority="interactive",
+                    tokens=estimate_tokens(prompt),
+                ),
+                "agno_assist",
+            ):
+                if getattr(chunk, "content", None):
+                    renderer.write(chunk.content)
+            renderer.finish()
+
+
+class ReconFlow(Flow):
+    """Recon turns as the recon page runs them: pooled agents, a fresh event loop and MCP connection per turn."""
+
+    name = "recon"
+
+    def __init__(self, scheduler: FairScheduler, llm: LLMScheduler,
+                 history_db: Any, mcp_url: str, prompts: List[str], debug_mode: bool = False):
+        from agno.tools.mcp import MCPTools
+
+        from .reconaissance_agent import build_recon_agent
+
+        self.pool = SessionAgentPool(
+            lambda sid: build_recon_agent(
+                session_id=sid, history_db=history_db, tools=[MCPTools(url=mcp_url, transport="streamable-http")]
+            )
+        )
+        self.scheduler = scheduler
+        self.llm = llm
+        self.prompts = prompts
+        self.debug_mode = debug_mode
+
+    def run(self, user: int, iteration: int) -> None:
+        from .reconaissance_agent import mcp_connected
+
+        session_id = f"loadtest-recon-{user}"
+        agent = self.pool.get(session_id)
+        prompt = self.prompts[iteration % len(self.prompts)]
+
+        async def turn() -> str:
+            async with mcp_connected(agent):
+                renderer = StreamingMarkdown(container=NullContainer())
+                async for chunk in telemetry.ainstrument_stream(
+                    self.llm.astream(
+                        lambda: agent.arun(prompt, stream=True, yield_run_response=True,
+                                           session_id=session_id, debug_mode=self.debug_mode),
+                        priority="recon",
+                        tokens=estimate_tokens(prompt),
+                    ),
+                    "recon_agent",
+                ):
+                    if getattr(chunk, "content", None):
+                        renderer.write(chunk.content)
+                return renderer.finish()
+
+        with self.scheduler.slot(session_id):
+            asyncio.run(turn())
+
+
+# ---------------------------------------------------------------- runner
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_stage(
+    flow: Flow,
+    users: int,
+    ramp: float,
+    duration: float,
+    iterations: Optional[int],
+    memory: MemorySampler,
+) -> Dict[str, Any]:
+    """Start ``users`` virtual users evenly over ``ramp`` seconds and loop ``flow`` until done.
+
+    A user stops after ``iterations`` runs, or at ``ramp + duration`` seconds
+    when no iteration count is given.
+    """
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    memory.reset()
+    started = time.perf_counter()
+    deadline = started + ramp + duration
+
+    def user_loop(user: int) -> None:
+        time.sleep(ramp * user / max(1, users))
+        iteration = 0
+        while (iterations is None and time.perf_counter() < deadline) or (
+            iterations is not None and iteration < iterations
+        ):
+            begin = time.perf_counter()
+            try:
+                flow.run(user, iteration)
+            except Exception as e:
+                key = f"{type(e).__name__}: {str(e)[:120]}"
+                with lock:
+                    errors[key] = errors.get(key, 0) + 1
+            else:
+                with lock:
+                    latencies.append(time.perf_counter() - begin)
+            iteration += 1
+
+    threads = [threading.Thread(target=user_loop, args=(i,), name=f"vu-{flow.name}-{i}") for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    end_rss = rss_bytes()
+
+    ordered = sorted(latencies)
+    return {
+        "flow": flow.name,
+        "users": users,
+        "completed": len(ordered),
+        "errors": sum(errors.values()),
+        "error_kinds": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(ordered) / elapsed, 3) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 0.50) * 1000, 1),
+            "p95": round(percentile(ordered, 0.95) * 1000, 1),
+            "p99": round(percentile(ordered, 0.99) * 1000, 1),
+            "mean": round(statistics.fmean(ordered) * 1000, 1) if ordered else 0.0,
+            "max": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+        },
+        "memory_mb": {
+            "start_rss": round(memory.start / 2**20, 1),
+            "peak_rss": round(max(memory.peak, end_rss) / 2**20, 1),
+            "end_rss": round(end_rss / 2**20, 1),
+        },
+    }
+
+
+def main() -> None:
+    """Drive the app's flows headlessly under concurrent users: ``python -m src.app.loadtest``."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--flows", default=",".join(FLOWS), help="comma-separated stages, run in order")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users per stage")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which users are started")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of steady load after the ramp")
+    parser.add_argument("--iterations", type=int, default=None, help="runs per user instead of a duration")
+    parser.add_argument("--spec", default=None, help="spec to upload (default: a synthetic one)")
+    parser.add_argument("--spec-paths", type=int, default=500, help="size of the synthetic spec")
+    parser.add_argument("--cached-specs", action="store_true", help="re-upload identical bytes (spec cache hits)")
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="analysis worker processes, as in the app (BUGPROWLER_ANALYSIS_WORKERS; 0 = in-process)",
+    )
+    parser.add_argument("--model-url", default=None, help="use this OpenAI-compatible base URL instead of the mock")
+    parser.add_argument("--mcp-url", default=None, help="use this MCP server instead of the stub")
+    parser.add_argument("--ttft", type=float, default=0.3, help="mock model time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="mock model delay between tokens")
+    parser.add_argument("--tokens", type=int, default=60, help="mock model tokens per answer")
+    parser.add_argument("--tool-delay", type=float, default=0.2, help="stub MCP tool latency")
+    parser.add_argument("--rpm", type=int, default=None, help="LLM scheduler requests/min (BUGPROWLER_LLM_RPM)")
+    parser.add_argument("--tpm", type=int, default=None, help="LLM scheduler tokens/min (BUGPROWLER_LLM_TPM)")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="fair scheduler slots")
+    parser.add_argument("--debug-mode", action="store_true", help="run agents with debug_mode like app.py")
+    parser.add_argument("--prompt", action="append", default=None, help="chat/recon prompt (repeatable)")
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    flows = [f.strip() for f in args.flows.split(",") if f.strip()]
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"unknown flow(s): {', '.join(sorted(unknown))}")
+
+    servers: List[multiprocessing.Process] = []
+    if {"chat", "recon"} & set(flows) and args.model_url is None:
+        port = free_port()
+        servers.append(start_server(serve_mock_model, port, args.ttft, args.token_delay, args.tokens))
+        wait_for_port(port)
+        args.model_url = f"http://127.0.0.1:{port}/v1"
+    if "recon" in flows and args.mcp_url is None:
+        port = free_port()
+        servers.append(start_server(serve_stub_mcp, port, args.tool_delay))
+        wait_for_port(port)
+        args.mcp_url = f"http://127.0.0.1:{port}/mcp"
+    if args.model_url is not None:
+        os.environ["OPENAI_BASE_URL"] = args.model_url
+        os.environ.setdefault("OPENAI_API_KEY", "loadtest")
+
+    # Started before any thread so workers fork from this preloaded process
+    pool = WarmPool(args.workers).start() if "analysis" in flows and args.workers > 0 else None
+    prompts = args.prompt or list(DEFAULT_PROMPTS)
+    memory = MemorySampler()
+    report: Dict[str, Any] = {"config": {k: v for k, v in vars(args).items() if k != "prompt"}, "stages": []}
+    try:
+        with tempfile.TemporaryDirectory(prefix="bugprowler-loadtest-") as tmp:
+            store = FindingsStore(os.path.join(tmp, "findings.db"))
+            scheduler = FairScheduler(max_concurrent=args.max_concurrent)
+            llm = LLMScheduler(rpm=args.rpm, tpm=args.tpm)
+            history_db = None
+            if {"chat", "recon"} & set(flows):
+                from .agent import create_sqlite_db
+
+                # One history DB for every session, as in the app
+                history_db = create_sqlite_db(os.path.join(tmp, "agno.db"))
+            for name in flows:
+                if name == "analysis":
+                    if args.spec:
+                        with open(args.spec, "rb") as file:
+                            spec = file.read()
+                    else:
+                        spec = json.dumps(synthetic_spec(args.spec_paths), indent=1).encode()
+                    flow: Flow = AnalysisFlow(store, spec, unique=not args.cached_specs, pool=pool)
+                elif name == "chat":
+                    flow = ChatFlow(store, scheduler, llm, history_db, os.path.join(tmp, "retrieval"),
+                                    prompts, args.debug_mode)
+                else:
+                    flow = ReconFlow(scheduler, llm, history_db, args.mcp_url, prompts, args.debug_mode)
+                result = run_stage(flow, args.users, args.ramp, args.duration, args.iterations, memory)
+                telemetry.log_event({"span": "loadtest", **result})
+                report["stages"].append(result)
+                print(json.dumps(result), flush=True)
+    finally:
+        memory.stop()
+        if pool is not None:
+            pool.close()
+        for server in servers:
+            server.terminate()
+            server.join(5)
+
+    if args.out:
+        with open(args.out, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+from .telemetry import timed
+
+
+@timed("render")
 def generate_markdown(data):
     markdown = "# 🛡️ IDOR Heuristics Report\n\n"
 
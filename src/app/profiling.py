@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from . import telemetry
+
+PROFILE_ENV = "BUGPROWLER_PROFILE"
+PROFILE_DIR_ENV = "BUGPROWLER_PROFILE_DIR"
+
+
+def profiling_enabled(requested: Optional[bool] = None) -> bool:
+    """Per-request flag wins; otherwise fall back to ``BUGPROWLER_PROFILE``."""
+    if requested is not None:
+        return requested
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "on", "yes")
+
+
+def spec_hash(data: bytes) -> str:
+    """Short, stable tag for a spec's raw bytes."""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+class SamplingProfiler:
+    """Periodically samples one thread's Python stack into folded-stack counts.
+
+    Sampling happens on a daemon thread that reads ``sys._current_frames``,
+    so the profiled code runs unmodified (no tracing hooks) and overhead is
+    bounded by the sampling interval rather than by call volume. The output
+    is Brendan Gregg's collapsed format, readable by ``flamegraph.pl``,
+    speedscope and inferno.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005, max_depth: int = 128):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def _label(self, code: Any) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            )
+        return label
+
+    def _run(self) -> None:
+        current_frames = sys._current_frames
+        while not self._stop.wait(self.interval):
+            frame = current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="bugprowler-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def folded(self) -> str:
+        """Collapsed stacks, one ``frame;frame;frame count`` line per unique stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def write(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            file.write(self.folded())
+        return path
+
+
+class ProfileResult:
+    """Handle yielded by ``profile``; ``path`` is set once the block exits."""
+
+    def __init__(self, profiler: SamplingProfiler):
+        self.profiler = profiler
+        self.path: Optional[str] = None
+
+
+@contextlib.contextmanager
+def profile(
+    tag: str,
+    kind: str = "analysis",
+    enabled: Optional[bool] = None,
+    interval: float = 0.005,
+    output_dir: Optional[str] = None,
+) -> Iterator[Optional[ProfileResult]]:
+    """Sample the calling thread for the duration of the block when profiling is on.
+
+    Yields ``None`` when disabled, so call sites can stay unconditional.
+    Output lands in ``$BUGPROWLER_PROFILE_DIR`` (default ``profiles/``) as
+    ``<kind>-<tag>-<timestamp>.folded``.
+    """
+    if not profiling_enabled(enabled):
+        yield None
+        return
+    profiler = SamplingProfiler(interval=interval).start()
+    result = ProfileResult(profiler)
+    try:
+        yield result
+    finally:
+        profiler.stop()
+        directory = output_dir or os.environ.get(PROFILE_DIR_ENV, "profiles")
+        safe_tag = re.sub(r"[^A-Za-z0-9_.-]", "_", tag)[:64]
+        filename = f"{kind}-{safe_tag}-{time.strftime('%Y%m%dT%H%M%S')}.folded"
+        result.path = profiler.write(os.path.join(directory, filename))
+        telemetry.log_event(
+            {
+                "span": "profile",
+                "kind": kind,
+                "tag": tag,
+                "samples": profiler.samples,
+                "duration_ms": round(profiler.elapsed * 1000, 3),
+                "path": result.path,
+            }
+        )
+
+
+def main() -> None:
+    """Profile a headless analysis run: ``python -m src.app.profiling spec.json``."""
+    from .detectors import default_detectors
+    from .markdown_idor import generate_markdown
+    from .swagger_analysis import IDORAnalyzer
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("spec", help="OpenAPI/Swagger JSON or YAML file")
+    parser.add_argument("--interval", type=float, default=0.001, help="sampling interval in seconds")
+    parser.add_argument("--output-dir", default=None)
+    args = parser.parse_args()
+
+    with open(args.spec, "rb") as file:
+        data = file.read()
+    with profile(spec_hash(data), enabled=True, interval=args.interval, output_dir=args.output_dir) as result:
+        analyzer = IDORAnalyzer(detectors=default_detectors())
+        generate_markdown(analyzer.analyze_file_bytes(data))
+    print(f"{result.profiler.samples} samples in {result.profiler.elapsed:.2f}s -> {result.path}")
+
+
+if __name__ == "__main__":
+    main()
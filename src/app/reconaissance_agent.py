@@ -1,30 +1,74 @@
+import contextlib
+import os
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+import httpx
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
 from agno.models.openai import OpenAIChat
 from agno.tools.mcp import MCPTools
 
+from .agent import create_sqlite_db
+from .telemetry import async_tool_call_hook
+
 # Setup your database
-db = SqliteDb(db_file="tmp/agno.db")
+db = create_sqlite_db("tmp/agno.db")
+
+MCP_URL = os.environ.get("BUGPROWLER_MCP_URL", "http://0.0.0.0:8080/mcp")
 
 system_message = """You are a reconnaissance agent. Your goal is to gather information about a target system.
 You should provide detailed explanations of each found assets and provide possible attack vectors."""
 
-# Configure the MCP tool connection
-mcp_tools = MCPTools(
-    url="http://0.0.0.0:8080/mcp",
-    refresh_connection=True,  # Enable automatic reconnection
-)
-
-recon_agent = Agent(
-    name="reconProwler",
-    model=OpenAIChat(id="gpt-4.1-nano"),
-    db=db,
-    add_history_to_context=True,
-    num_history_runs=5,
-    description="Bug Bounty Recon Agent",
-    instructions=system_message,
-    markdown=True,
-    reasoning=False,
-    debug_level=1,
-    tools=[mcp_tools],
-)
+
+def build_recon_agent(
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    history_db: Optional[SqliteDb] = None,
+    tools: Optional[List[Any]] = None,
+    tool_hooks: Optional[List[Callable]] = None,
+) -> Agent:
+    """Build a recon agent with its own MCP connection and the shared history DB.
+
+    ``tools`` replaces the MCP connection and ``tool_hooks`` run after the
+    telemetry hook; together with ``client`` they let cassettes record or
+    replay a run without the network.
+    """
+    if tools is None:
+        # Unconnected until a turn enters ``mcp_connected``
+        tools = [MCPTools(url=MCP_URL, transport="streamable-http")]
+    # Async runs get a fresh event loop per turn, so the async HTTP client is not shared
+    return Agent(
+        name="reconProwler",
+        model=OpenAIChat(id="gpt-4.1-nano", http_client=client, max_retries=0),
+        db=history_db or db,
+        session_id=session_id,
+        user_id=user_id,
+        add_history_to_context=True,
+        num_history_runs=5,
+        description="Bug Bounty Recon Agent",
+        instructions=system_message,
+        markdown=True,
+        reasoning=False,
+        debug_level=1,
+        tools=tools,
+        tool_hooks=[async_tool_call_hook] + list(tool_hooks or []),
+    )
+
+
+@contextlib.asynccontextmanager
+async def mcp_connected(agent: Agent) -> AsyncIterator[Agent]:
+    """Connect the agent's MCP tools for one turn and close them when it ends.
+
+    Each turn runs on a fresh event loop and MCP sessions are bound to the
+    loop that opened them, so connections never outlive a turn; an agent
+    evicted from its pool holds nothing open.
+    """
+    async with contextlib.AsyncExitStack() as stack:
+        tools = list(agent.tools or [])
+        for tool in tools:
+            if isinstance(tool, MCPTools):
+                await stack.enter_async_context(tool)
+        # The agent caches tool entrypoints, which are bound to the previous turn's session
+        agent.set_tools(tools)
+        yield agent
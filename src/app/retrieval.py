@@ -0,0 +1,436 @@
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import telemetry
+
+DEFAULT_INDEX_DIR = os.environ.get("BUGPROWLER_RETRIEVAL_DIR", "retrieval_index")
+DEFAULT_SYNC_INTERVAL = float(os.environ.get("BUGPROWLER_RETRIEVAL_SYNC_SECONDS", "5"))
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+
+
+# ------------------------------------------------------------------ embedders
+class HashingEmbedder:
+    """Dependency-free embedder: signed feature hashing of unigrams and bigrams.
+
+    Vectors are L2-normalised, so a dot product is cosine similarity. crc32 is
+    used instead of ``hash()`` so vectors are stable across processes and can
+    be persisted.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def tokens(self, text: str) -> List[str]:
+        words = TOKEN_RE.findall(CAMEL_RE.sub(r"\1 \2", text).lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token, count in Counter(self.tokens(text)).items():
+                h = zlib.crc32(token.encode())
+                out[row, h % self.dim] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+class SentenceTransformerEmbedder:
+    """Local embedding model via ``sentence-transformers`` (optional dependency)."""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.name = f"st:{model_name}"
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(
+            self.model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True),
+            dtype=np.float32,
+        )
+
+
+def default_embedder() -> Any:
+    """``BUGPROWLER_EMBEDDER=st:<model>`` selects a local model; hashing is the fallback."""
+    choice = os.environ.get("BUGPROWLER_EMBEDDER", "hashing")
+    if choice.startswith("st:"):
+        try:
+            return SentenceTransformerEmbedder(choice[3:])
+        except ImportError:
+            telemetry.log_event({"event": "embedder_fallback", "requested": choice})
+    return HashingEmbedder()
+
+
+# ---------------------------------------------------------------- the index
+class InvertedList:
+    """Contiguous, growable block of vectors and their ids (capacity doubles)."""
+
+    __slots__ = ("vectors", "ids", "size")
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def extend(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            capacity = max(needed, 2 * len(self.ids))
+            grown = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            grown[: self.size] = self.vectors[: self.size]
+            self.vectors = grown
+            self.ids = np.resize(self.ids, capacity)
+        self.vectors[self.size : needed] = vectors
+        self.ids[self.size : needed] = ids
+        self.size = needed
+
+
+class VectorIndex:
+    """In-process cosine-similarity index over NumPy arrays.
+
+    Small indexes are searched exhaustively. Past ``train_threshold``
+    vectors the index is partitioned with spherical k-means into inverted
+    lists (IVF); a query scores the centroids and scans only the
+    ``nprobe`` closest lists, which keeps top-k well under 20 ms at a
+    million chunks on one core. Partitions are retrained whenever the index
+    has grown 4x since the last training; adds in between are routed to
+    their nearest centroid.
+    """
+
+    def __init__(self, dim: int, nprobe: int = 8, train_threshold: int = 20000, list_size: int = 4000):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.list_size = list_size
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[InvertedList] = [InvertedList(dim)]
+        self.size = 0
+        self.trained_at = 0
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Append normalised vectors; returns their ids (insertion order)."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        ids = np.arange(self.size, self.size + len(vectors), dtype=np.int64)
+        self._route(vectors, ids)
+        self.size += len(vectors)
+        if self.size >= self.train_threshold and self.size >= 4 * max(self.trained_at, 1):
+            self.train()
+        return ids
+
+    def remove(self, ids: Sequence[int]) -> int:
+        """Drop vectors by id (ids are never handed out again); returns how many were present."""
+        ids = np.asarray(ids, dtype=np.int64)
+        removed = 0
+        for lst in self.lists:
+            if not lst.size:
+                continue
+            keep = ~np.isin(lst.ids[: lst.size], ids)
+            kept = int(keep.sum())
+            if kept == lst.size:
+                continue
+            lst.vectors[:kept] = lst.vectors[: lst.size][keep]
+            lst.ids[:kept] = lst.ids[: lst.size][keep]
+            removed += lst.size - kept
+            lst.size = kept
+        return removed
+
+    def _route(self, vectors: np.ndarray, ids: np.ndarray, assignment: Optional[np.ndarray] = None) -> None:
+        if self.centroids is None:
+            self.lists[0].extend(vectors, ids)
+            return
+        if assignment is None:
+            assignment = self._assign(vectors)
+        order = np.argsort(assignment, kind="stable")
+        clusters, starts = np.unique(assignment[order], return_index=True)
+        for cluster, lo, hi in zip(clusters, starts, list(starts[1:]) + [len(order)]):
+            rows = order[lo:hi]
+            self.lists[cluster].extend(vectors[rows], ids[rows])
+
+    def _assign(self, vectors: np.ndarray, batch: int = 65536) -> np.ndarray:
+        return np.concatenate(
+            [np.argmax(vectors[i : i + batch] @ self.centroids.T, axis=1) for i in range(0, len(vectors), batch)]
+        ) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def _all(self) -> Tuple[np.ndarray, np.ndarray]:
+        vectors = np.concatenate([lst.vectors[: lst.size] for lst in self.lists])
+        ids = np.concatenate([lst.ids[: lst.size] for lst in self.lists])
+        return vectors, ids
+
+    def train(self, iterations: int = 8, seed: int = 0) -> None:
+        """(Re)partition every vector with spherical k-means on a sample."""
+        with telemetry.span("retrieval_train", vectors=self.size):
+            vectors, ids = self._all()
+            nlist = int(min(4096, max(16, self.size // self.list_size)))
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(len(vectors), min(len(vectors), 64 * nlist), replace=False)]
+            centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, sample)
+                norms = np.linalg.norm(sums, axis=1)
+                empty = norms == 0
+                # Re-seed empty clusters from random sample points
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+                norms[empty] = np.linalg.norm(sums[empty], axis=1)
+                centroids = sums / np.maximum(norms, 1e-12)[:, None]
+            self.centroids = centroids.astype(np.float32)
+            assignment = self._assign(vectors)
+            counts = np.bincount(assignment, minlength=nlist)
+            # Size each list for its share plus headroom for the adds until the next retrain
+            self.lists = [InvertedList(self.dim, capacity=max(64, int(count * 1.25))) for count in counts]
+            self._route(vectors, ids, assignment)
+            self.trained_at = self.size
+
+    def search(self, query: np.ndarray, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-``k`` ``(id, score)`` pairs by cosine similarity, best first."""
+        if self.size == 0:
+            return []
+        query = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        if self.centroids is None:
+            probe = [0]
+        else:
+            nprobe = min(self.nprobe, len(self.lists))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        scores, ids = [], []
+        for cluster in probe:
+            lst = self.lists[cluster]
+            if not lst.size:
+                continue
+            s = lst.vectors[: lst.size] @ query
+            if len(s) > k:
+                top = np.argpartition(-s, k - 1)[:k]
+                s, lst_ids = s[top], lst.ids[: lst.size][top]
+            else:
+                lst_ids = lst.ids[: lst.size]
+            scores.append(s)
+            ids.append(lst_ids)
+        if not scores:
+            return []
+        scores_arr, ids_arr = np.concatenate(scores), np.concatenate(ids)
+        order = np.argsort(-scores_arr)[:k]
+        return [(int(ids_arr[i]), float(scores_arr[i])) for i in order]
+
+    @classmethod
+    def from_arrays(cls, vectors: np.ndarray, centroids: Optional[np.ndarray] = None, **kwargs: Any) -> "VectorIndex":
+        """Rebuild an index from persisted vectors (ids are row numbers)."""
+        index = cls(vectors.shape[1], **kwargs)
+        if centroids is not None:
+            index.centroids = centroids
+            index.lists = [InvertedList(index.dim) for _ in range(len(centroids))]
+        index._route(vectors, np.arange(len(vectors), dtype=np.int64))
+        index.size = index.trained_at = len(vectors)
+        return index
+
+
+# ------------------------------------------------------ findings/report corpus
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split on paragraph boundaries into chunks of at most ``max_chars``."""
+    chunks: List[str] = []
+    current = ""
+    for para in re.split(r"\n\s*\n", text or ""):
+        para = para.strip()
+        while len(para) > max_chars:
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+        if current and len(current) + len(para) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{para}" if current else para
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class FindingsRetriever:
+    """Retrieval over the findings store, kept in sync incrementally.
+
+    Each finding is one chunk; reports are split into paragraph chunks.
+    On disk the index is append-only: raw float32 rows in ``vectors.f32``
+    and one JSON payload per row in ``payloads.jsonl``. Sync watermarks
+    (the last finding/report id indexed) are recovered from the payloads,
+    so an interrupted write at worst re-indexes a tail. Deleted findings
+    (e.g. replaced by ``replace_analysis``) are dropped from the in-memory
+    index by replaying the store's deletion log after each load.
+
+    ``start`` keeps the index fresh from a background thread, so queries
+    never wait for a sync.
+    """
+
+    def __init__(self, store: Any, directory: str = DEFAULT_INDEX_DIR, embedder: Any = None):
+        self.store = store
+        self.directory = directory
+        self.embedder = embedder or default_embedder()
+        self.payloads: List[Dict[str, Any]] = []
+        self.watermarks = {"finding": 0, "report": 0, "deletion": 0}
+        # Finding id -> index row, for dropping deleted findings
+        self.finding_rows: Dict[int, int] = {}
+        self.lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.index = self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> VectorIndex:
+        try:
+            with open(self._path("meta.json")) as file:
+                meta = json.load(file)
+        except FileNotFoundError:
+            meta = {}
+        if meta.get("embedder") != self.embedder.name or meta.get("dim") != self.embedder.dim:
+            # Vectors from another embedder are not comparable; start over
+            for name in ("meta.json", "vectors.f32", "payloads.jsonl", "centroids.npy"):
+                if os.path.exists(self._path(name)):
+                    os.unlink(self._path(name))
+            return VectorIndex(self.embedder.dim)
+
+        with open(self._path("payloads.jsonl")) as file:
+            self.payloads = [json.loads(line) for line in file if line.endswith("\n")]
+        vectors = np.fromfile(self._path("vectors.f32"), dtype=np.float32)
+        rows = min(len(vectors) // self.embedder.dim, len(self.payloads))
+        vectors = vectors[: rows * self.embedder.dim].reshape(rows, self.embedder.dim)
+        self.payloads = self.payloads[:rows]
+        for row, payload in enumerate(self.payloads):
+            self.watermarks[payload["kind"]] = max(self.watermarks[payload["kind"]], payload["ref"])
+            if payload["kind"] == "finding":
+                self.finding_rows[payload["ref"]] = row
+        centroids = np.load(self._path("centroids.npy")) if os.path.exists(self._path("centroids.npy")) else None
+        return VectorIndex.from_arrays(vectors, centroids)
+
+    def _add(self, chunks: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if not chunks:
+            return
+        # Embedding is the slow part and happens outside the lock searches take
+        vectors = self.embedder.encode([text for text, _ in chunks])
+        with self.lock:
+            trained_at = self.index.trained_at
+            ids = self.index.add(vectors)
+            self.payloads.extend(payload for _, payload in chunks)
+            for row, (_, payload) in zip(ids, chunks):
+                if payload["kind"] == "finding":
+                    self.finding_rows[payload["ref"]] = int(row)
+
+        os.makedirs(self.directory, exist_ok=True)
+        if not os.path.exists(self._path("meta.json")):
+            with open(self._path("meta.json"), "w") as file:
+                json.dump({"embedder": self.embedder.name, "dim": self.embedder.dim}, file)
+            open(self._path("vectors.f32"), "wb").close()
+            open(self._path("payloads.jsonl"), "w").close()
+        with open(self._path("vectors.f32"), "ab") as file:
+            vectors.tofile(file)
+        with open(self._path("payloads.jsonl"), "a") as file:
+            file.writelines(json.dumps(payload) + "\n" for _, payload in chunks)
+        if self.index.trained_at != trained_at:
+            np.save(self._path("centroids.npy"), self.index.centroids)
+
+    def _drop_deleted(self, batch: int) -> int:
+        dropped = 0
+        while True:
+            deletions = self.store.finding_deletions_after(self.watermarks["deletion"], batch)
+            if not deletions:
+                return dropped
+            rows = [self.finding_rows.pop(fid) for _, fid in deletions if fid in self.finding_rows]
+            if rows:
+                with self.lock:
+                    dropped += self.index.remove(rows)
+            self.watermarks["deletion"] = deletions[-1][0]
+
+    def sync(self, batch: int = 5000) -> int:
+        """Drop deleted findings and index those and reports added since the last sync.
+
+        Returns the number of chunks added.
+        """
+        added = 0
+        with self._sync_lock:
+            self._drop_deleted(batch)
+            while True:
+                rows = self.store.findings_after(self.watermarks["finding"], batch)
+                if not rows:
+                    break
+                self._add(
+                    [
+                        (
+                            f"{r['technique']} on {r['method']} {r['path']} ({r['target']}): {r['description']}",
+                            {
+                                "kind": "finding",
+                                "ref": r["id"],
+                                "text": f"[{r['technique']}] {r['method']} {r['path']} on {r['target']}: {r['description']}",
+                            },
+                        )
+                        for r in rows
+                    ]
+                )
+                added += len(rows)
+                self.watermarks["finding"] = rows[-1]["id"]
+            while True:
+                rows = self.store.reports_after(self.watermarks["report"], batch)
+                if not rows:
+                    break
+                chunks = [
+                    (
+                        f"{r['title']}\n{chunk}",
+                        {"kind": "report", "ref": r["id"], "text": f"Report BR-{r['id']} ({r['title']}): {chunk}"},
+                    )
+                    for r in rows
+                    for chunk in chunk_text(r["body"]) or [""]
+                ]
+                self._add(chunks)
+                added += len(chunks)
+                self.watermarks["report"] = rows[-1]["id"]
+        return added
+
+    def _run(self, interval: float) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception as e:  # keep serving the last good index
+                telemetry.log_event({"event": "retrieval_sync_failed", "error": f"{type(e).__name__}: {e}"})
+            if self._stop.wait(interval):
+                return
+
+    def start(self, interval: float = DEFAULT_SYNC_INTERVAL) -> "FindingsRetriever":
+        """Sync now and then every ``interval`` seconds on a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="bugprowler-retrieval-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.15) -> List[Dict[str, Any]]:
+        query_vector = self.embedder.encode([query])[0]
+        with telemetry.span("retrieve") as span, self.lock:
+            hits = self.index.search(query_vector, k)
+            results = [{**self.payloads[i], "score": round(score, 4)} for i, score in hits if score >= min_score]
+            span.set(hits=len(results), indexed=self.index.size)
+        return results
+
+    def knowledge_retriever(
+        self, agent: Any = None, query: str = "", num_documents: Optional[int] = None, **kwargs: Any
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Agno ``knowledge_retriever`` hook: relevant past snippets for the user's message.
+
+        Searches what is indexed now; ``start`` keeps that current.
+        """
+        hits = self.search(query, k=num_documents or 5)
+        return [{"content": hit["text"], "source": f"{hit['kind']}:{hit['ref']}", "score": hit["score"]} for hit in hits] or None
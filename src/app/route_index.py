@@ -0,0 +1,211 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .analysis_framework import HTTP_METHODS
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+PARAM_SEGMENT = "{}"
+
+
+class RouteEntry:
+    """One operation on a templated path, reduced to what cross-route checks need."""
+
+    __slots__ = ("path", "method", "resource", "addresses_item", "parent_identifiers",
+                 "authorization_required", "identifiers_used")
+
+    def __init__(
+        self,
+        path: str,
+        method: str,
+        resource: Optional[str],
+        addresses_item: bool,
+        parent_identifiers: int,
+        authorization_required: bool,
+        identifiers_used: str,
+    ):
+        self.path = path
+        self.method = method
+        self.resource = resource
+        self.addresses_item = addresses_item
+        self.parent_identifiers = parent_identifiers
+        self.authorization_required = authorization_required
+        self.identifiers_used = identifiers_used
+
+    @property
+    def action(self) -> str:
+        return "read" if self.method.upper() in READ_METHODS else "write"
+
+
+class RouteTrieNode:
+    """Trie node keyed by normalized path segments (``{}`` for any template)."""
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "RouteTrieNode"] = {}
+        self.entries: List[RouteEntry] = []
+
+
+class RouteIndex:
+    """Index over a spec's templated paths for sibling and alias lookups.
+
+    Built once per spec in a single pass. Paths are inserted into a trie of
+    normalized segments (nested routes share ancestors) and bucketed by the
+    resource they expose, so cross-route comparisons only ever look inside a
+    bucket instead of comparing every pair of paths.
+    """
+
+    def __init__(self):
+        self.root = RouteTrieNode()
+        self.by_resource: Dict[Tuple[str, str], List[RouteEntry]] = {}
+        self.version_pattern = re.compile(r"v\d+(\.\d+)*$", re.IGNORECASE)
+        self.ignored_prefixes = {"api", "rest", "public", "internal"}
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any]) -> "RouteIndex":
+        """Build the index from a (preferably annotated) OpenAPI spec."""
+        index = cls()
+        global_security = spec.get("security", [])
+        for path, path_item in spec.get("paths", {}).items():
+            for method, operation in path_item.items():
+                if method.upper() in HTTP_METHODS and isinstance(operation, dict):
+                    index.add(path, method, operation, global_security)
+        return index
+
+    def normalize(self, path: str) -> List[str]:
+        """Split a path into segments, collapsing templates and dropping version prefixes."""
+        segments = []
+        for segment in path.split("/"):
+            if not segment:
+                continue
+            if segment.startswith("{") and segment.endswith("}"):
+                segments.append(PARAM_SEGMENT)
+            elif self.version_pattern.match(segment):
+                continue
+            elif not segments and segment.lower() in self.ignored_prefixes:
+                continue
+            else:
+                segments.append(segment.lower())
+        return segments
+
+    def resource_of(self, segments: List[str]) -> Tuple[Optional[str], bool, int]:
+        """Return ``(resource, addresses_item, parent_identifiers)`` for normalized segments."""
+        for i in range(len(segments) - 1, -1, -1):
+            if segments[i] != PARAM_SEGMENT:
+                addresses_item = i + 1 < len(segments)
+                parent_identifiers = segments[:i].count(PARAM_SEGMENT)
+                return self.singular(segments[i]), addresses_item, parent_identifiers
+        return None, bool(segments), 0
+
+    def singular(self, word: str) -> str:
+        if word.endswith("ies") and len(word) > 3:
+            return word[:-3] + "y"
+        if word.endswith("ses") or word.endswith("xes"):
+            return word[:-2]
+        if word.endswith("s") and not word.endswith("ss") and len(word) > 1:
+            return word[:-1]
+        return word
+
+    def add(
+        self,
+        path: str,
+        method: str,
+        operation: Dict[str, Any],
+        global_security: List[Any],
+    ) -> RouteEntry:
+        """Insert an operation into the trie and its resource bucket."""
+        if "x_endor_authorization_required" in operation:
+            authorization_required = operation["x_endor_authorization_required"]
+        else:
+            security = operation.get("security", global_security)
+            authorization_required = len(security) > 0 and security != [{}]
+        segments = self.normalize(path)
+        resource, addresses_item, parent_identifiers = self.resource_of(segments)
+        entry = RouteEntry(
+            path,
+            method,
+            resource,
+            addresses_item,
+            parent_identifiers,
+            authorization_required,
+            operation.get("x_endor_identifiers_used", "zero"),
+        )
+        node = self.root
+        for segment in segments:
+            node = node.children.setdefault(segment, RouteTrieNode())
+        node.entries.append(entry)
+        if resource is not None:
+            self.by_resource.setdefault((resource, entry.action), []).append(entry)
+        return entry
+
+    def iter_nested(self) -> Iterator[Tuple[RouteEntry, RouteEntry]]:
+        """Yield ``(child, ancestor)`` pairs where a nested route sits below a protected one."""
+        stack: List[Tuple[RouteTrieNode, Optional[RouteEntry]]] = [(self.root, None)]
+        while stack:
+            node, guard = stack.pop()
+            if guard is not None:
+                for entry in node.entries:
+                    if not entry.authorization_required:
+                        yield entry, guard
+            protected = next((e for e in node.entries if e.authorization_required), None)
+            for child in node.children.values():
+                stack.append((child, protected or guard))
+
+    def find_inconsistencies(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """Flag routes that lack protections other routes to the same resource enforce."""
+        findings: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+        def flag(entry: RouteEntry, attack: Dict[str, Any]) -> None:
+            attacks = findings.setdefault((entry.path, entry.method), [])
+            if attack["technique"] not in (a["technique"] for a in attacks):
+                attacks.append(attack)
+
+        for (resource, action), entries in self.by_resource.items():
+            if len(entries) < 2:
+                continue
+            protected = next((e for e in entries if e.authorization_required), None)
+            scoped = next((e for e in entries if e.parent_identifiers > 0), None)
+            for entry in entries:
+                if protected is not None and not entry.authorization_required:
+                    flag(
+                        entry,
+                        {
+                            "technique": "Alternate route authorization bypass",
+                            "description": (
+                                f"The `{resource}` resource is also reachable through "
+                                f"`{protected.method.upper()} {protected.path}`, which requires "
+                                "authorization, but this route does not."
+                            ),
+                        },
+                    )
+                if (
+                    scoped is not None
+                    and entry.parent_identifiers == 0
+                    and entry.addresses_item
+                    and entry.path != scoped.path
+                ):
+                    flag(
+                        entry,
+                        {
+                            "technique": "Direct reference bypassing parent scope",
+                            "description": (
+                                f"`{scoped.path}` scopes `{resource}` objects under a parent "
+                                "identifier, while this route addresses them directly; swap "
+                                "in identifiers belonging to another parent."
+                            ),
+                        },
+                    )
+
+        for entry, guard in self.iter_nested():
+            flag(
+                entry,
+                {
+                    "technique": "Unprotected nested route",
+                    "description": (
+                        f"Parent route `{guard.method.upper()} {guard.path}` requires "
+                        "authorization but this nested route does not."
+                    ),
+                },
+            )
+        return findings
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+PRIMITIVE_TYPES = {"string", "integer", "number", "boolean"}
+COMPOSITION_KEYS = ("allOf", "oneOf", "anyOf")
+
+# A flattened field: (dotted name, leaf schema, depth below the walked root, required)
+Field = Tuple[str, Dict[str, Any], int, bool]
+
+
+class SchemaWalker:
+    """Flatten request schemas into dotted leaf fields without recursion.
+
+    The walk uses an explicit stack, stops at ``max_depth`` levels and at
+    ``max_fields`` leaves, and never re-enters a schema that is already on
+    the current branch, so recursive ``$ref`` graphs terminate. Results are
+    memoized per resolved schema object: every operation that references
+    the same component reuses one walk, and nested references to an
+    already-walked component are spliced in instead of being walked again.
+    """
+
+    def __init__(self, spec: Dict[str, Any], max_depth: int = 10, max_fields: int = 500):
+        self.spec = spec
+        self.max_depth = max_depth
+        self.max_fields = max_fields
+        # id(schema) -> (schema, fields); the schema is held so its id stays unique
+        self._memo: Dict[int, Tuple[Dict[str, Any], List[Field]]] = {}
+
+    def resolve(self, schema: Any) -> Optional[Dict[str, Any]]:
+        """Follow local ``$ref`` pointers until a concrete schema object is reached."""
+        seen = set()
+        while isinstance(schema, dict) and "$ref" in schema:
+            ref = schema["$ref"]
+            if not isinstance(ref, str) or not ref.startswith("#/") or ref in seen:
+                return None
+            seen.add(ref)
+            target: Any = self.spec
+            for part in ref[2:].split("/"):
+                part = part.replace("~1", "/").replace("~0", "~")
+                if not isinstance(target, dict) or part not in target:
+                    return None
+                target = target[part]
+            schema = target
+        return schema if isinstance(schema, dict) else None
+
+    def fields(self, schema: Any) -> List[Field]:
+        """Return the leaf fields of a schema, walking it at most once."""
+        root = self.resolve(schema)
+        if root is None:
+            return []
+        cached = self._memo.get(id(root))
+        if cached is not None:
+            return cached[1]
+
+        result: List[Field] = []
+        # (schema, dotted prefix, depth, required, ids of schemas on this branch)
+        stack: List[Tuple[Any, str, int, bool, frozenset]] = [(root, "", 0, False, frozenset())]
+        while stack and len(result) < self.max_fields:
+            raw, prefix, depth, required, branch = stack.pop()
+            node = self.resolve(raw)
+            if node is None or id(node) in branch:
+                continue
+
+            if node is not root:
+                cached = self._memo.get(id(node))
+                if cached is not None:
+                    budget = self.max_depth - depth
+                    for name, leaf, leaf_depth, leaf_required in cached[1]:
+                        if leaf_depth <= budget:
+                            dotted = f"{prefix}.{name}" if prefix and name else prefix or name
+                            result.append((dotted, leaf, depth + leaf_depth, leaf_required))
+                    continue
+
+            branch = branch | {id(node)}
+            for key in COMPOSITION_KEYS:
+                for alternative in node.get(key) or []:
+                    stack.append((alternative, prefix, depth, required, branch))
+
+            node_type = node.get("type")
+            properties = node.get("properties")
+            if isinstance(properties, dict) and depth < self.max_depth:
+                required_names = set(node.get("required") or [])
+                for name, child in reversed(list(properties.items())):
+                    dotted = f"{prefix}.{name}" if prefix else name
+                    stack.append((child, dotted, depth + 1, name in required_names, branch))
+            elif node_type == "array":
+                items = self.resolve(node.get("items"))
+                if items is not None and (
+                    items.get("properties") or any(k in items for k in COMPOSITION_KEYS)
+                ):
+                    if depth < self.max_depth:
+                        stack.append((items, f"{prefix}[]", depth + 1, required, branch))
+                elif prefix:
+                    result.append((prefix, node, depth, required))
+            elif prefix and (node_type in PRIMITIVE_TYPES or "format" in node or "enum" in node):
+                result.append((prefix, node, depth, required))
+
+        self._memo[id(root)] = (root, result)
+        return result
+
+    def body_parameters(self, schema: Any, location: str = "body") -> List[Dict[str, Any]]:
+        """Expose schema leaves as synthetic OpenAPI parameter objects."""
+        params = []
+        for name, leaf, _, required in self.fields(schema):
+            param = {
+                "name": name,
+                "in": location,
+                "required": required,
+                "schema": {k: leaf[k] for k in ("type", "format", "items", "enum") if k in leaf},
+                "x_endor_body_field": True,
+            }
+            if isinstance(leaf.get("description"), str):
+                param["description"] = leaf["description"]
+            params.append(param)
+        return params
@@ -0,0 +1,363 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+import yaml
+
+from . import telemetry
+from .detectors import default_detectors
+from .findings_store import FindingsStore
+from .spec_model import SpecCache
+from .swagger_analysis import IDORAnalyzer
+from .uploads import DEFAULT_MAX_UPLOAD_MB
+
+DEFAULT_STATE_DB = os.environ.get("BUGPROWLER_DISCOVERY_DB", "discovery.db")
+DEFAULT_SPEC_DIR = os.environ.get("BUGPROWLER_DISCOVERY_DIR", "discovered_specs")
+
+# Where frameworks and gateways usually publish their spec, most common first
+COMMON_SPEC_PATHS = (
+    "/openapi.json",
+    "/swagger.json",
+    "/v3/api-docs",
+    "/v2/api-docs",
+    "/openapi.yaml",
+    "/swagger.yaml",
+    "/api-docs",
+    "/swagger/v1/swagger.json",
+    "/api/openapi.json",
+    "/api/swagger.json",
+    "/api/v1/openapi.json",
+    "/docs/openapi.json",
+)
+
+SCHEMA = """
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS spec_sources (
+    url TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    digest TEXT,
+    spec_path TEXT,
+    status TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    changed_at REAL
+);
+"""
+
+fetches_total = telemetry.registry.counter(
+    "bugprowler_discovery_fetches_total", "Spec discovery probes by outcome."
+)
+
+
+class DiscoveryResult:
+    """Outcome of probing one URL: ``new``, ``changed``, ``unchanged``, ``missing`` or ``error``."""
+
+    __slots__ = ("url", "host", "status", "digest", "spec_path", "findings", "error")
+
+    def __init__(
+        self,
+        url: str,
+        host: str,
+        status: str,
+        digest: Optional[str] = None,
+        spec_path: Optional[str] = None,
+        findings: int = 0,
+        error: Optional[str] = None,
+    ):
+        self.url = url
+        self.host = host
+        self.status = status
+        self.digest = digest
+        self.spec_path = spec_path
+        self.findings = findings
+        self.error = error
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def normalize_base(host: str) -> str:
+    """``example.com`` -> ``https://example.com``; an explicit scheme and base path are kept."""
+    host = host.strip()
+    if "://" not in host:
+        host = f"https://{host}"
+    return host.rstrip("/")
+
+
+def parse_spec_bytes(data: bytes) -> Optional[Dict[str, Any]]:
+    """The parsed spec, or None when the body is not an OpenAPI/Swagger document.
+
+    Catch-all routes commonly answer every probe with an HTML page and a 200,
+    so anything without ``openapi``/``swagger`` and ``paths`` is rejected.
+    """
+    text = data.decode("utf-8-sig", errors="replace")
+    start = text.lstrip()[:1]
+    try:
+        spec = json.loads(text) if start in ("{", "[") else yaml.safe_load(text)
+    except (ValueError, yaml.YAMLError):
+        return None
+    if not isinstance(spec, dict) or not ("openapi" in spec or "swagger" in spec):
+        return None
+    return spec if isinstance(spec.get("paths"), dict) else None
+
+
+class SpecDiscovery:
+    """Probe in-scope hosts for published specs and feed new ones to the analyzer.
+
+    Every host's candidate paths are fetched concurrently over one pooled
+    ``httpx.AsyncClient``, at most ``per_host`` at a time per host and
+    ``max_concurrency`` overall. Validators from the previous fetch are sent
+    back as ``If-None-Match``/``If-Modified-Since``, so an unchanged spec costs
+    a single 304. Bodies are stored by content hash under ``spec_dir``; new
+    or changed specs are put in the ``SpecCache``, analyzed, and their
+    findings replace those from the previous version of the same URL.
+    Redirects are followed only within the probed host. Analysis runs when
+    a ``store`` or ``analyzer`` is given; otherwise specs are only fetched
+    and cached.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        state_db: str = DEFAULT_STATE_DB,
+        spec_dir: str = DEFAULT_SPEC_DIR,
+        cache: Optional[SpecCache] = None,
+        store: Optional[FindingsStore] = None,
+        analyzer: Optional[IDORAnalyzer] = None,
+        paths: Tuple[str, ...] = COMMON_SPEC_PATHS,
+        per_host: int = 4,
+        max_concurrency: int = 32,
+        max_bytes: Optional[int] = None,
+        max_redirects: int = 3,
+    ):
+        self.client = client
+        self.spec_dir = spec_dir
+        self.cache = cache if cache is not None else SpecCache()
+        self.store = store
+        self.analyzer = analyzer
+        self.paths = paths
+        self.per_host = per_host
+        self.max_concurrency = max_concurrency
+        self.max_bytes = max_bytes if max_bytes is not None else DEFAULT_MAX_UPLOAD_MB * 1024 * 1024
+        self.max_redirects = max_redirects
+        self.db = sqlite3.connect(state_db, timeout=30, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        os.makedirs(spec_dir, exist_ok=True)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._overall = asyncio.Semaphore(max_concurrency)
+
+    # ------------------------------------------------------------------ state
+    def _previous(self, url: str) -> Optional[sqlite3.Row]:
+        return self.db.execute("SELECT * FROM spec_sources WHERE url = ?", (url,)).fetchone()
+
+    def _save(self, result: DiscoveryResult, response: Optional[httpx.Response]) -> None:
+        now = time.time()
+        etag = response.headers.get("etag") if response is not None else None
+        last_modified = response.headers.get("last-modified") if response is not None else None
+        with self.db:
+            self.db.execute(
+                "INSERT INTO spec_sources (url, host, etag, last_modified, digest, spec_path, status,"
+                " checked_at, changed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (url) DO UPDATE SET"
+                " etag = COALESCE(excluded.etag, etag),"
+                " last_modified = COALESCE(excluded.last_modified, last_modified),"
+                " digest = COALESCE(excluded.digest, digest),"
+                " spec_path = COALESCE(excluded.spec_path, spec_path),"
+                " status = excluded.status, checked_at = excluded.checked_at,"
+                " changed_at = COALESCE(excluded.changed_at, changed_at)",
+                (
+                    result.url,
+                    result.host,
+                    etag,
+                    last_modified,
+                    result.digest,
+                    result.spec_path,
+                    result.status,
+                    now,
+                    now if result.status in ("new", "changed") else None,
+                ),
+            )
+
+    def known_specs(self) -> List[Dict[str, Any]]:
+        rows = self.db.execute(
+            "SELECT url, host, digest, spec_path, status, checked_at, changed_at FROM spec_sources"
+            " WHERE digest IS NOT NULL ORDER BY host, url"
+        )
+        return [dict(row) for row in rows]
+
+    # ----------------------------------------------------------------- fetch
+    def _limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def _get(
+        self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]
+    ) -> Tuple[httpx.Response, bytes]:
+        """GET with in-host redirects and a streamed body size cap."""
+        host = urlsplit(url).netloc
+        for _ in range(self.max_redirects + 1):
+            request = client.build_request("GET", url, headers=headers)
+            response = await client.send(request, stream=True, follow_redirects=False)
+            try:
+                if response.has_redirect_location:
+                    url = urljoin(url, response.headers.get("location", ""))
+                    if urlsplit(url).netloc != host:
+                        raise ValueError(f"redirected out of scope to {url}")
+                    continue
+                body = bytearray()
+                if response.status_code == 200:
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) > self.max_bytes:
+                            raise ValueError(f"spec exceeds {self.max_bytes / 2**20:.0f} MB")
+                return response, bytes(body)
+            finally:
+                await response.aclose()
+        raise ValueError("too many redirects")
+
+    async def fetch(self, client: httpx.AsyncClient, url: str) -> DiscoveryResult:
+        """Conditionally fetch one candidate URL and ingest it if it changed."""
+        host = urlsplit(url).netloc
+        previous = self._previous(url)
+        headers = {"Accept": "application/json, application/yaml;q=0.9, */*;q=0.5"}
+        if previous is not None and previous["digest"] is not None:
+            if previous["etag"]:
+                headers["If-None-Match"] = previous["etag"]
+            if previous["last_modified"]:
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        response: Optional[httpx.Response] = None
+        with telemetry.span("discover", host=host) as span:
+            try:
+                # Host limit first: waiting on a busy host must not hold a global slot
+                async with self._limit(host), self._overall:
+                    response, body = await self._get(client, url, headers)
+                result = await self._handle(url, host, previous, response, body)
+            except (httpx.HTTPError, ValueError, OSError) as e:
+                result = DiscoveryResult(url, host, "error", error=str(e) or type(e).__name__)
+            span.set(status=result.status)
+        fetches_total.inc(labels=telemetry.label_key({"status": result.status}))
+        # Hosts that publish nothing leave no rows behind
+        if previous is not None or result.digest is not None:
+            self._save(result, response if result.status != "error" else None)
+        return result
+
+    async def _handle(
+        self,
+        url: str,
+        host: str,
+        previous: Optional[sqlite3.Row],
+        response: httpx.Response,
+        body: bytes,
+    ) -> DiscoveryResult:
+        if response.status_code == 304 and previous is not None:
+            return DiscoveryResult(url, host, "unchanged", previous["digest"], previous["spec_path"])
+        if response.status_code != 200:
+            return DiscoveryResult(url, host, "missing")
+        digest = hashlib.sha256(body).hexdigest()
+        if previous is not None and previous["digest"] == digest:
+            # Servers without validators still only cost a download, not a re-analysis
+            return DiscoveryResult(url, host, "unchanged", digest, previous["spec_path"])
+        spec = parse_spec_bytes(body)
+        if spec is None:
+            return DiscoveryResult(url, host, "missing")
+        spec_path = os.path.join(self.spec_dir, digest + (".json" if body.lstrip()[:1] in (b"{", b"[") else ".yaml"))
+        if not os.path.exists(spec_path):
+            with open(spec_path, "wb") as file:
+                file.write(body)
+        status = "new" if previous is None or previous["digest"] is None else "changed"
+        try:
+            findings = await asyncio.to_thread(self._ingest, url, host, digest, spec)
+        except Exception as e:
+            # A malformed spec fails its own URL only; without a digest it is retried next run
+            return DiscoveryResult(url, host, "error", error=f"analysis failed: {type(e).__name__}: {e}")
+        return DiscoveryResult(url, host, status, digest, spec_path, findings)
+
+    def _ingest(self, url: str, host: str, digest: str, spec: Dict[str, Any]) -> int:
+        compact = self.cache.put(digest, spec)
+        if self.analyzer is None and self.store is None:
+            return 0
+        result = (self.analyzer or IDORAnalyzer(detectors=default_detectors())).analyze(compact.to_dict())
+        if self.store is not None:
+            self.store.replace_analysis(host, result, source=f"discovery:{url}")
+        return len(result["vulnerabilities"])
+
+    # ------------------------------------------------------------------- run
+    async def run(self, hosts: List[str]) -> List[DiscoveryResult]:
+        """Probe every candidate path on every host; returns one result per URL."""
+        urls = [
+            base + path
+            for base in dict.fromkeys(normalize_base(h) for h in hosts if h.strip())
+            for path in self.paths
+        ]
+        client = self.client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+            ),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            headers={"User-Agent": "BugProwler-Discovery/1.0"},
+        )
+        # Semaphores bind to the running loop, so each run gets fresh ones
+        self._host_limits = {}
+        self._overall = asyncio.Semaphore(self.max_concurrency)
+        try:
+            return list(await asyncio.gather(*(self.fetch(client, url) for url in urls)))
+        finally:
+            if self.client is None:
+                await client.aclose()
+
+
+def main() -> None:
+    """Discover and analyze published specs: ``python -m src.app.spec_discovery HOST... [--hosts-file FILE]``."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("hosts", nargs="*", help="in-scope hosts or base URLs")
+    parser.add_argument("--hosts-file", default=None, help="one host or base URL per line")
+    parser.add_argument("--db", default=DEFAULT_STATE_DB, help="validator state (BUGPROWLER_DISCOVERY_DB)")
+    parser.add_argument("--spec-dir", default=DEFAULT_SPEC_DIR, help="where fetched specs are kept")
+    parser.add_argument("--per-host", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--no-analyze", action="store_true", help="only fetch and store specs")
+    args = parser.parse_args()
+
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        with open(args.hosts_file) as file:
+            hosts += [line.strip() for line in file if line.strip() and not line.startswith("#")]
+    if not hosts:
+        parser.error("no hosts given")
+
+    discovery = SpecDiscovery(
+        state_db=args.db,
+        spec_dir=args.spec_dir,
+        store=None if args.no_analyze else FindingsStore(),
+        per_host=args.per_host,
+        max_concurrency=args.concurrency,
+    )
+    results = asyncio.run(discovery.run(hosts))
+    for result in results:
+        if result.status == "error":
+            print(f"error     {result.url} {result.error}")
+        elif result.status in ("new", "changed"):
+            print(f"{result.status:9} {result.url} {result.findings} finding(s)")
+        elif result.status == "unchanged":
+            print(f"unchanged {result.url}")
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    print(json.dumps(counts))
+
+
+if __name__ == "__main__":
+    main()
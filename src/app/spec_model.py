@@ -0,0 +1,218 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .analysis_framework import HTTP_METHODS
+from .swagger_analysis import parse_spec_file
+from .work_queue import file_digest
+
+DEFAULT_CACHE_SIZE = int(os.environ.get("BUGPROWLER_SPEC_CACHE_SIZE", "256"))
+
+# Documentation-only keys no analyzer or detector reads
+DOC_KEYS = frozenset({"example", "examples", "x-example", "x-examples", "externalDocs", "summary"})
+# Objects whose ``description`` is prose for humans; parameter and schema
+# descriptions are kept because the identifier heuristics search them
+PROSE_ROLES = frozenset({"path", "operation", "response", "doc"})
+# Maps keyed by user-chosen names, whose keys must never be dropped
+NAME_MAPS = frozenset({
+    "properties", "patternProperties", "definitions", "schemas", "parameters", "headers",
+    "content", "securitySchemes", "securityDefinitions", "requestBodies", "callbacks",
+    "links", "encoding", "variables", "mapping", "scopes",
+})
+NAME_ROLES = frozenset({"paths", "responses", "names"})
+
+
+class Node:
+    """An immutable, hash-consed JSON object (``shape`` is its key tuple) or array (``shape`` is None).
+
+    Children are canonical nodes or interned scalars, so structurally equal
+    subtrees are one object no matter how many specs contain them.
+    """
+
+    __slots__ = ("shape", "values", "_hash")
+
+    def __init__(self, shape: Optional[Tuple[Any, ...]], values: Tuple[Any, ...]):
+        self.shape = shape
+        self.values = values
+        self._hash = hash((shape, values))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        # 1, 1.0 and True compare equal but must not be merged
+        return (
+            type(other) is Node
+            and self._hash == other._hash
+            and self.shape is other.shape
+            and self.values == other.values
+            and all(a.__class__ is b.__class__ for a, b in zip(self.values, other.values))
+        )
+
+    def to_python(self) -> Any:
+        """A fresh, mutable dict/list tree, as ``json.load`` would have produced."""
+        values = [v.to_python() if type(v) is Node else v for v in self.values]
+        if self.shape is None:
+            return values
+        return dict(zip(self.shape, values))
+
+
+class CompactSpec:
+    """A resident spec; ``to_dict`` hands analyzers their own mutable copy."""
+
+    __slots__ = ("digest", "root", "path_count")
+
+    def __init__(self, digest: str, root: Any, path_count: int):
+        self.digest = digest
+        self.root = root
+        self.path_count = path_count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.root.to_python() if type(self.root) is Node else {}
+
+
+def _child_role(role: Optional[str], key: Any) -> Optional[str]:
+    if role == "paths":
+        return "path"
+    if role == "responses":
+        return "response"
+    if role == "names":
+        return None
+    if role == "path" and isinstance(key, str) and key.upper() in HTTP_METHODS:
+        return "operation"
+    if key == "paths":
+        return "paths"
+    if key == "responses":
+        return "responses"
+    if key in NAME_MAPS:
+        return "names"
+    if role == "root" and key in ("info", "tags"):
+        return "doc"
+    return None
+
+
+class SpecInterner:
+    """Builds canonical nodes; one interner is shared by every spec in a cache."""
+
+    def __init__(self, keep_docs: bool = False):
+        self.keep_docs = keep_docs
+        self.nodes: Dict[Node, Node] = {}
+        self.shapes: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+
+    def compact(self, value: Any, role: Optional[str] = "root") -> Any:
+        if isinstance(value, dict):
+            drop = not self.keep_docs and role not in NAME_ROLES
+            prose = drop and role in PROSE_ROLES
+            keys: List[Any] = []
+            values: List[Any] = []
+            for key, child in value.items():
+                if drop and (key in DOC_KEYS or (prose and key == "description")):
+                    continue
+                keys.append(sys.intern(key) if type(key) is str else key)
+                values.append(self.compact(child, _child_role(role, key)))
+            shape = tuple(keys)
+            shape = self.shapes.setdefault(shape, shape)
+            return self._canonical(Node(shape, tuple(values)))
+        if isinstance(value, list):
+            role = None if role in NAME_ROLES else role
+            return self._canonical(Node(None, tuple(self.compact(v, role) for v in value)))
+        if type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def _canonical(self, node: Node) -> Node:
+        return self.nodes.setdefault(node, node)
+
+    def rebuild(self, roots: List[Any]) -> None:
+        """Drop nodes no longer reachable from ``roots`` (after evictions)."""
+        nodes: Dict[Node, Node] = {}
+        shapes: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+        stack = [r for r in roots if type(r) is Node]
+        while stack:
+            node = stack.pop()
+            if node in nodes:
+                continue
+            nodes[node] = node
+            if node.shape is not None:
+                shapes[node.shape] = node.shape
+            stack.extend(v for v in node.values if type(v) is Node)
+        self.nodes, self.shapes = nodes, shapes
+
+    def approx_bytes(self) -> int:
+        """Node and container overhead of the table (interned strings are shared process-wide)."""
+        size = sum(sys.getsizeof(n) + sys.getsizeof(n.values) for n in self.nodes)
+        return size + sum(sys.getsizeof(s) for s in self.shapes)
+
+
+class SpecCache:
+    """LRU of parsed specs in compact form, keyed by content digest.
+
+    Keys and strings are interned and identical subtrees (shared schemas,
+    common parameters, security blocks) are stored once across all specs,
+    and documentation that no analyzer reads is dropped unless
+    ``keep_docs``. Entries are materialized with ``CompactSpec.to_dict``.
+    """
+
+    def __init__(self, max_specs: int = DEFAULT_CACHE_SIZE, keep_docs: bool = False):
+        self.max_specs = max_specs
+        self.interner = SpecInterner(keep_docs=keep_docs)
+        self._specs: "OrderedDict[str, CompactSpec]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._specs
+
+    def get(self, digest: str) -> Optional[CompactSpec]:
+        with self._lock:
+            spec = self._specs.get(digest)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(digest)
+            self.hits += 1
+            return spec
+
+    def put(self, digest: str, spec: Dict[str, Any]) -> CompactSpec:
+        paths = spec.get("paths") if isinstance(spec, dict) else None
+        with self._lock:
+            compact = CompactSpec(
+                digest, self.interner.compact(spec), len(paths) if isinstance(paths, dict) else 0
+            )
+            self._specs[digest] = compact
+            self._specs.move_to_end(digest)
+            while len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+                self._evicted += 1
+            # Amortized: sweep the shared table once a third of the cache has turned over
+            if self._evicted and self._evicted * 3 >= len(self._specs):
+                self.interner.rebuild([s.root for s in self._specs.values()])
+                self._evicted = 0
+        return compact
+
+    def load(self, file_path: str, digest: Optional[str] = None) -> CompactSpec:
+        """Cached spec for a file on disk, parsing it on a miss."""
+        digest = digest or file_digest(file_path)
+        spec = self.get(digest)
+        if spec is None:
+            spec = self.put(digest, parse_spec_file(file_path))
+        return spec
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "specs": len(self._specs),
+                "nodes": len(self.interner.nodes),
+                "approx_bytes": self.interner.approx_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
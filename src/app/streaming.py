@@ -0,0 +1,97 @@
+import time
+from typing import Any, Optional
+
+import streamlit as st
+
+FENCES = ("```", "~~~")
+
+
+def stable_prefix_length(text: str) -> int:
+    """Length of the leading run of complete Markdown blocks in ``text``.
+
+    A block is complete once it is followed by a blank line outside a code
+    fence; everything after the last such boundary may still change as more
+    tokens arrive.
+    """
+    boundary = 0
+    in_fence = False
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        stripped = line.lstrip()
+        if stripped.startswith(FENCES):
+            in_fence = not in_fence
+        pos += len(line)
+        if not in_fence and not line.strip() and pos < len(text):
+            boundary = pos
+    return boundary
+
+
+class StreamingMarkdown:
+    """Render a streamed Markdown answer without re-parsing the whole message per chunk.
+
+    Chunks are buffered and flushed at most every ``interval`` seconds (and
+    not before ``min_chars`` new characters arrive, unless ``max_latency``
+    has passed). Completed blocks are rendered once into their own element
+    and frozen; only the still-growing tail block is re-rendered. ``finish``
+    swaps the pieces for one full render of the final text.
+    """
+
+    def __init__(
+        self,
+        container: Optional[Any] = None,
+        interval: float = 0.1,
+        min_chars: int = 48,
+        max_latency: float = 0.5,
+        cursor: str = "▌",
+    ):
+        self.outer = (container or st).empty()
+        self.box = self.outer.container()
+        self.tail = self.box.empty()
+        self.interval = interval
+        self.min_chars = min_chars
+        self.max_latency = max_latency
+        self.cursor = cursor
+        self.parts = []
+        self.text = ""
+        self.frozen = 0
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, chunk: str) -> None:
+        """Buffer a streamed chunk and flush if the time/size budget allows."""
+        if not chunk:
+            return
+        self.parts.append(chunk)
+        self.pending += len(chunk)
+        elapsed = time.monotonic() - self.last_flush
+        if elapsed >= self.max_latency or (
+            elapsed >= self.interval and self.pending >= self.min_chars
+        ):
+            self.flush()
+
+    def _join(self) -> str:
+        if self.parts:
+            self.text += "".join(self.parts)
+            self.parts = []
+        return self.text
+
+    def flush(self) -> None:
+        """Render pending text: freeze finished blocks, redraw only the tail."""
+        text = self._join()
+        tail = text[self.frozen:]
+        stable = stable_prefix_length(tail)
+        if stable:
+            # Final render of the completed blocks; later flushes never touch them again
+            self.tail.markdown(tail[:stable])
+            self.tail = self.box.empty()
+            self.frozen += stable
+            tail = tail[stable:]
+        self.tail.markdown(tail + self.cursor)
+        self.pending = 0
+        self.last_flush = time.monotonic()
+
+    def finish(self) -> str:
+        """Replace the incremental pieces with a single full render and return the text."""
+        text = self._join()
+        self.outer.markdown(text)
+        return text
@@ -4,9 +4,36 @@ from typing import Any, Dict, List, Optional
 
 import yaml
 
+from . import telemetry
+from .analysis_framework import (
+    HTTP_METHODS,
+    AnalysisContext,
+    CancellationToken,
+    Detector,
+    Progress,
+    ProgressCallback,
+    SpecTraversal,
+    request_body_schemas,
+)
+from .route_index import RouteIndex
+from .schema_walker import SchemaWalker
+
+
+def parse_spec_file(file_path: str) -> Dict[str, Any]:
+    """Parse a JSON or YAML spec on disk, sniffing the format from its first character."""
+    with telemetry.span("load"), open(file_path, "r", encoding="utf-8-sig") as file:
+        start = file.read(4096).lstrip()[:1]
+        file.seek(0)
+        try:
+            return json.load(file) if start in ("{", "[") else yaml.safe_load(file)
+        except (ValueError, yaml.YAMLError):
+            raise ValueError("Unable to parse file as JSON or YAML.")
+
 
 class IDORAnalyzer:
-    def __init__(self):
+    def __init__(self, detectors: Optional[List[Detector]] = None):
+        # Extra plugins run in the same traversal as the built-in IDOR rules
+        self.detectors = list(detectors or [])
         # Common identifier names for heuristic rules
         self.common_identifier_names = {
             "id",
@@ -34,7 +61,7 @@ class IDORAnalyzer:
 
     def load_openapi_spec(self, file_path: str) -> Dict[str, Any]:
         """Load OpenAPI specification from file (JSON or YAML)."""
-        with open(file_path, "r") as file:
+        with telemetry.span("load"), open(file_path, "r") as file:
             if file_path.endswith(".json"):
                 return json.load(file)
             elif file_path.endswith(".yml") or file_path.endswith(".yaml"):
@@ -42,13 +69,29 @@ class IDORAnalyzer:
             else:
                 raise ValueError("Unsupported file format. Use JSON or YAML.")
 
-    def analyze(self, openapi_spec: Dict[str, Any]) -> Dict[str, Any]:
-        """Main method to analyze the OpenAPI spec for IDOR/BOLA vulnerabilities."""
-        # Stage 1: Annotate the specification with IDOR/BOLA properties
-        annotated_spec = self.annotate_properties(openapi_spec)
-        # Stage 2: Analyze for attacks
-        vulnerabilities = self.analyze_attacks(annotated_spec)
-        return vulnerabilities
+    def analyze(
+        self,
+        openapi_spec: Dict[str, Any],
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """Main method to analyze the OpenAPI spec for IDOR/BOLA vulnerabilities.
+
+        See ``SpecTraversal.run`` for ``progress`` and ``cancel``; a cancelled
+        run returns the findings of the paths analyzed so far.
+        """
+        # Annotation, attack checks and every plugin share a single pass over paths
+        traversal = SpecTraversal(
+            [IDORDetector(self), CrossRouteDetector()] + self.detectors
+        )
+        with telemetry.span("analyze") as span:
+            result = traversal.run(openapi_spec, progress=progress, cancel=cancel)
+            span.set(
+                paths=len(openapi_spec.get("paths", {})),
+                findings=len(result["vulnerabilities"]),
+                cancelled=result.get("cancelled", False),
+            )
+        return result
 
     def annotate_properties(self, spec: Dict[str, Any]) -> Dict[str, Any]:
         """Annotate the OpenAPI spec with IDOR/BOLA properties."""
@@ -58,6 +101,7 @@ class IDORAnalyzer:
 
         # Check global security schemes
         global_security = spec.get("security", [])
+        walker = SchemaWalker(spec)
         paths = annotated_spec["paths"]
         for path, path_item in paths.items():
             # Annotate endpoint level properties
@@ -77,6 +121,7 @@ class IDORAnalyzer:
                     "HEAD",
                     "OPTIONS",
                 ]:
+                    self.expand_body_parameters(operation, walker)
                     self.annotate_method_level(
                         operation, method, path_item, global_security
                     )
@@ -85,6 +130,37 @@ class IDORAnalyzer:
                         self.annotate_parameter_level(param, path)
         return annotated_spec
 
+    def expand_body_parameters(
+        self, operation: Dict[str, Any], walker: SchemaWalker
+    ) -> None:
+        """Surface identifier fields nested in request bodies as parameters."""
+        if operation.get("x_endor_body_expanded"):
+            return
+        operation["x_endor_body_expanded"] = True
+
+        body_params = []
+        seen = set()
+        for schema, location in request_body_schemas(walker, operation):
+            for param in walker.body_parameters(schema, location):
+                if param["name"] not in seen and self.is_identifier_field(param):
+                    seen.add(param["name"])
+                    body_params.append(param)
+        if body_params:
+            operation["parameters"] = list(operation.get("parameters", [])) + body_params
+
+    def is_identifier_field(self, param: Dict[str, Any]) -> bool:
+        """Name/description rules for nested body fields (type alone is not enough)."""
+        leaf = param.get("name", "").rsplit(".", 1)[-1].replace("[]", "")
+        candidates = [leaf]
+        if param.get("schema", {}).get("type") == "array" and leaf.lower().endswith("s"):
+            candidates.append(leaf[:-1])
+        for name in candidates:
+            if self.id_pattern.search(name) or self.uuid_pattern.search(name):
+                return True
+            if name.lower() in self.common_identifier_names:
+                return True
+        return bool(self.desc_pattern.search(param.get("description", "")))
+
     def annotate_endpoint_level(self, path_item: Dict[str, Any], path: str) -> None:
         """Annotate endpoint level properties."""
         methods = [
@@ -149,6 +225,7 @@ class IDORAnalyzer:
             "path": "resource path in URI",
             "query": "URL parameter",
             "body": "Body",
+            "formData": "Body",
             "header": "Request Header",
         }
         param["x_endor_location"] = location_map.get(param_in, "other")
@@ -429,14 +506,80 @@ class IDORAnalyzer:
 
     def analyze_file_bytes(self, file_bytes: bytes) -> Dict[str, Any]:
         """Analyze a specification provided as raw bytes (JSON or YAML)."""
-        try:
-            # Attempt to decode as JSON
-            spec = json.loads(file_bytes.decode())
-        except Exception:
+        with telemetry.span("load"):
             try:
-                # If JSON fails, try YAML
-                spec = yaml.safe_load(file_bytes.decode())
+                # Attempt to decode as JSON
+                spec = json.loads(file_bytes.decode())
             except Exception:
-                raise ValueError("Unable to parse input bytes as JSON or YAML.")
+                try:
+                    # If JSON fails, try YAML
+                    spec = yaml.safe_load(file_bytes.decode())
+                except Exception:
+                    raise ValueError("Unable to parse input bytes as JSON or YAML.")
         # Delegate to existing analyze method
         return self.analyze(spec)
+
+    def analyze_file(
+        self,
+        file_path: str,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """Analyze a spec on disk (JSON or YAML, sniffed from content).
+
+        The file is decoded incrementally by the parser instead of being read
+        into a bytes object first, so large uploads are held in memory once.
+        Parsing cannot be interrupted; ``cancel`` takes effect at the first path.
+        """
+        if progress is not None:
+            progress(Progress("load"))
+        spec = parse_spec_file(file_path)
+        return self.analyze(spec, progress=progress, cancel=cancel)
+
+
+class IDORDetector(Detector):
+    """The IDOR/BOLA heuristics of ``IDORAnalyzer`` as a traversal plugin."""
+
+    name = "idor"
+
+    def __init__(self, analyzer: IDORAnalyzer):
+        self.analyzer = analyzer
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+
+    def visit_path(self, ctx: AnalysisContext) -> None:
+        self.analyzer.annotate_endpoint_level(ctx.path_item, ctx.path)
+        # Verb tampering compares parameter sets across sibling methods, so every
+        # operation of the path needs its body fields before any is checked
+        for method, operation in ctx.path_item.items():
+            if method.upper() in HTTP_METHODS and isinstance(operation, dict):
+                self.analyzer.expand_body_parameters(operation, ctx.walker)
+
+    def visit_parameter(self, ctx: AnalysisContext, param: Dict[str, Any]) -> None:
+        self.analyzer.annotate_parameter_level(param, ctx.path)
+
+    def leave_operation(self, ctx: AnalysisContext) -> None:
+        self.analyzer.annotate_method_level(
+            ctx.operation, ctx.method, ctx.path_item, ctx.global_security
+        )
+        for attack in self.analyzer.check_attack_patterns(ctx.operation, ctx.path_item):
+            self.traversal.report(ctx.path, ctx.method, attack)
+
+
+class CrossRouteDetector(Detector):
+    """Flag routes that lack protections their aliases enforce (see ``RouteIndex``)."""
+
+    name = "cross-route"
+
+    def start(self, ctx: AnalysisContext, traversal: SpecTraversal) -> None:
+        self.traversal = traversal
+        self.index = RouteIndex()
+
+    def leave_operation(self, ctx: AnalysisContext) -> None:
+        self.index.add(ctx.path, ctx.method, ctx.operation, ctx.global_security)
+
+    def finish(self, ctx: AnalysisContext) -> None:
+        for (path, method), attacks in self.index.find_inconsistencies().items():
+            for attack in attacks:
+                self.traversal.report(path, method, attack)
@@ -0,0 +1,405 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("bugprowler.telemetry")
+
+# Latency buckets in seconds, from sub-millisecond rule checks up to long agent runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label set (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series: Dict[LabelKey, List[float]] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelKey = ()) -> None:
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                # One slot per bucket, then +Inf, sum and count
+                series = self.series[labels] = [0.0] * (len(self.buckets) + 3)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            snapshot = {k: list(v) for k, v in self.series.items()}
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0.0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{format_labels(labels + (('le', le),))} {cumulative:g}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {series[-1]:g}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.series: Dict[LabelKey, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, value: float = 1, labels: LabelKey = ()) -> None:
+        with self.lock:
+            self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            snapshot = dict(self.series)
+        for labels, value in sorted(snapshot.items()):
+            lines.append(f"{self.name}{format_labels(labels)} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    """Point-in-time value keyed by label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, labels: LabelKey = ()) -> None:
+        with self.lock:
+            self.series[labels] = value
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels) + "}"
+
+
+def label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    """Process-wide metric registry with a cheap disabled mode."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.metrics: Dict[str, Any] = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls: Any, name: str, help_text: str, *args: Any) -> Any:
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    metric = self.metrics[name] = cls(name, help_text, *args)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets)
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry(
+    enabled=os.environ.get("BUGPROWLER_TELEMETRY", "1").lower() not in ("0", "false", "off", "")
+)
+
+
+def log_event(event: Dict[str, Any]) -> None:
+    """Emit one structured JSON log line on the ``bugprowler.telemetry`` logger."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(event, default=str))
+
+
+class Span:
+    """Times a block, records it in a histogram and emits a JSON log line."""
+
+    __slots__ = ("metric", "name", "labels", "start", "fields")
+
+    def __init__(self, metric: str, name: str, labels: Dict[str, Any]):
+        self.metric = metric
+        self.name = name
+        self.labels = labels
+        self.fields: Dict[str, Any] = {}
+
+    def set(self, **fields: Any) -> None:
+        """Attach extra fields to the span's log line."""
+        self.fields.update(fields)
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        duration = time.perf_counter() - self.start
+        status = "error" if exc_type is not None else "ok"
+        labels = dict(self.labels, status=status)
+        registry.histogram(self.metric, "Duration of instrumented operations in seconds.").observe(
+            duration, label_key(labels)
+        )
+        log_event({"span": self.name, "duration_ms": round(duration * 1000, 3), **labels, **self.fields})
+
+
+class NoopSpan:
+    """Stand-in returned while telemetry is disabled."""
+
+    __slots__ = ()
+
+    def set(self, **fields: Any) -> None:
+        pass
+
+    def __enter__(self) -> "NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        return None
+
+
+NOOP_SPAN = NoopSpan()
+
+
+def span(stage: str, **labels: Any) -> Any:
+    """Time a pipeline stage (load, analyze, render, ...)."""
+    if not registry.enabled:
+        return NOOP_SPAN
+    return Span("bugprowler_stage_duration_seconds", stage, dict(labels, stage=stage))
+
+
+def timed(stage: str) -> Callable:
+    """Decorator form of ``span``."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class AgentRunRecorder:
+    """Accumulates TTFT, duration and token usage for one streamed agent run."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self.start = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.chunks = 0
+        self.metrics: Any = None
+
+    def feed(self, chunk: Any) -> bool:
+        """Record a streamed item; returns False for the trailing RunOutput."""
+        # The final RunOutput (yield_run_response=True) carries metrics but no ``event``
+        if not hasattr(chunk, "event") and hasattr(chunk, "metrics"):
+            self.metrics = chunk.metrics
+            return False
+        if getattr(chunk, "content", None):
+            if self.first_token is None:
+                self.first_token = time.perf_counter()
+            self.chunks += 1
+        return True
+
+    def finish(self, status: str) -> None:
+        duration = time.perf_counter() - self.start
+        labels = {"agent": self.agent, "status": status}
+        registry.histogram(
+            "bugprowler_agent_run_duration_seconds", "Wall time of agent runs in seconds."
+        ).observe(duration, label_key(labels))
+        event: Dict[str, Any] = {
+            "span": "agent_run",
+            "duration_ms": round(duration * 1000, 3),
+            "chunks": self.chunks,
+            **labels,
+        }
+        if self.first_token is not None:
+            ttft = self.first_token - self.start
+            registry.histogram(
+                "bugprowler_agent_time_to_first_token_seconds",
+                "Time from run start to first streamed content in seconds.",
+            ).observe(ttft, label_key({"agent": self.agent}))
+            event["ttft_ms"] = round(ttft * 1000, 3)
+        if self.metrics is not None:
+            tokens = registry.histogram(
+                "bugprowler_agent_tokens", "Tokens consumed per agent run.", TOKEN_BUCKETS
+            )
+            for kind in ("input_tokens", "output_tokens", "total_tokens"):
+                value = getattr(self.metrics, kind, None) or 0
+                tokens.observe(value, label_key({"agent": self.agent, "kind": kind}))
+                registry.counter(
+                    "bugprowler_agent_tokens_total", "Tokens consumed by agent runs."
+                ).inc(value, label_key({"agent": self.agent, "kind": kind}))
+                event[kind] = value
+        log_event(event)
+
+
+def instrument_stream(stream: Iterator[Any], agent: str) -> Iterator[Any]:
+    """Wrap ``agent.run(..., stream=True, yield_run_response=True)``.
+
+    Content events are passed through unchanged; the trailing RunOutput is
+    consumed for its token metrics so callers can keep concatenating chunks.
+    """
+    if not registry.enabled:
+        for chunk in stream:
+            if hasattr(chunk, "event") or not hasattr(chunk, "metrics"):
+                yield chunk
+        return
+    recorder = AgentRunRecorder(agent)
+    status = "error"
+    try:
+        for chunk in stream:
+            if recorder.feed(chunk):
+                yield chunk
+        status = "ok"
+    finally:
+        recorder.finish(status)
+
+
+async def ainstrument_stream(stream: AsyncIterator[Any], agent: str) -> AsyncIterator[Any]:
+    """Async counterpart of ``instrument_stream`` for ``agent.arun``."""
+    if not registry.enabled:
+        async for chunk in stream:
+            if hasattr(chunk, "event") or not hasattr(chunk, "metrics"):
+                yield chunk
+        return
+    recorder = AgentRunRecorder(agent)
+    status = "error"
+    try:
+        async for chunk in stream:
+            if recorder.feed(chunk):
+                yield chunk
+        status = "ok"
+    finally:
+        recorder.finish(status)
+
+
+def _record_tool_call(function_name: str, start: float, status: str) -> None:
+    duration = time.perf_counter() - start
+    labels = {"tool": function_name, "status": status}
+    registry.histogram(
+        "bugprowler_tool_call_duration_seconds", "Latency of agent tool calls in seconds."
+    ).observe(duration, label_key(labels))
+    log_event({"span": "tool_call", "duration_ms": round(duration * 1000, 3), **labels})
+
+
+def tool_call_hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]) -> Any:
+    """agno ``tool_hooks`` entry timing synchronous tool calls."""
+    if not registry.enabled:
+        return function_call(**arguments)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = function_call(**arguments)
+        status = "ok"
+        return result
+    finally:
+        _record_tool_call(function_name, start, status)
+
+
+async def async_tool_call_hook(
+    function_name: str, function_call: Callable, arguments: Dict[str, Any]
+) -> Any:
+    """agno ``tool_hooks`` entry timing tool calls of async runs (e.g. MCP tools)."""
+    if not registry.enabled:
+        return await function_call(**arguments)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = await function_call(**arguments)
+        status = "ok"
+        return result
+    finally:
+        _record_tool_call(function_name, start, status)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Expose ``/metrics`` on a daemon thread; repeated calls reuse the first server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+
+def configure_json_log(path: str) -> None:
+    """Append telemetry events as JSON lines to ``path``."""
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def configure_from_env() -> None:
+    """Honor ``BUGPROWLER_METRICS_PORT`` and ``BUGPROWLER_TELEMETRY_LOG``."""
+    if not registry.enabled:
+        return
+    log_path = os.environ.get("BUGPROWLER_TELEMETRY_LOG")
+    if log_path and not logger.handlers:
+        configure_json_log(log_path)
+    port = os.environ.get("BUGPROWLER_METRICS_PORT")
+    if port:
+        try:
+            serve_metrics(int(port))
+        except OSError as e:
+            logger.warning(f"Unable to start metrics endpoint on port {port}: {e}")
@@ -0,0 +1,603 @@
+import json
+import re
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from . import telemetry
+from .analysis_framework import HTTP_METHODS
+from .swagger_analysis import IDORAnalyzer
+
+# Headers that carry credentials; their presence marks a request as authenticated
+AUTH_HEADERS = {"authorization", "cookie", "x-api-key", "x-auth-token", "api-key"}
+RATE_LIMIT_HEADERS = ("x-ratelimit", "ratelimit", "retry-after", "x-rate-limit")
+# Infrastructure headers that never carry application parameters
+NOISE_HEADERS = {"x-requested-with", "x-forwarded-for", "x-forwarded-proto", "x-forwarded-host",
+                 "x-real-ip", "x-amzn-trace-id", "x-request-id", "x-csrf-token", "x-xsrf-token"}
+
+
+def iter_har_entries(stream: IO[str], chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Yield HAR ``log.entries`` one at a time without loading the whole document."""
+    decoder = json.JSONDecoder()
+    entries_marker = re.compile(r'"entries"\s*:\s*\[')
+    buf = ""
+    eof = False
+
+    # Seek forward to the opening bracket of the entries array
+    while True:
+        match = entries_marker.search(buf)
+        if match:
+            buf = buf[match.end():]
+            break
+        if eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        # Keep a short tail in case the marker straddles two chunks
+        buf = buf[-32:] + chunk
+
+    needed = chunk_size
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if buf.startswith("]"):
+            return
+        if buf:
+            try:
+                entry, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError("Truncated or malformed HAR entries array.")
+            else:
+                yield entry
+                buf = buf[end:]
+                needed = chunk_size
+                continue
+        elif eof:
+            return
+        # Incomplete entry: grow the buffer geometrically so large bodies stay linear
+        target = len(buf) + needed
+        while len(buf) < target:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                eof = True
+                break
+            buf += chunk
+        needed *= 2
+
+
+def iter_jsonl_entries(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Yield one traffic record per non-empty JSON line, skipping unparsable lines."""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+class ValueStats:
+    """Bounded summary of the values observed for a single parameter."""
+
+    __slots__ = ("count", "kinds", "formats", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.kinds: Dict[str, int] = {}
+        self.formats: Dict[str, int] = {}
+        self.samples: List[Any] = []
+
+    def add(self, kind: str, fmt: Optional[str], value: Any, max_samples: int) -> None:
+        self.count += 1
+        self.kinds[kind] = self.kinds.get(kind, 0) + 1
+        if fmt:
+            self.formats[fmt] = self.formats.get(fmt, 0) + 1
+        if value is not None and len(self.samples) < max_samples and value not in self.samples:
+            self.samples.append(value)
+
+    def merge(self, other: "ValueStats", max_samples: int) -> None:
+        self.count += other.count
+        for kind, n in other.kinds.items():
+            self.kinds[kind] = self.kinds.get(kind, 0) + n
+        for fmt, n in other.formats.items():
+            self.formats[fmt] = self.formats.get(fmt, 0) + n
+        for value in other.samples:
+            if len(self.samples) >= max_samples:
+                break
+            if value not in self.samples:
+                self.samples.append(value)
+
+    def schema(self) -> Dict[str, Any]:
+        kinds = set(self.kinds)
+        if kinds <= {"integer"}:
+            schema: Dict[str, Any] = {"type": "integer"}
+        elif kinds <= {"integer", "number"}:
+            schema = {"type": "number"}
+        elif kinds == {"boolean"}:
+            schema = {"type": "boolean"}
+        elif kinds == {"array"}:
+            schema = {"type": "array", "items": {}}
+        elif kinds == {"object"}:
+            schema = {"type": "object"}
+        else:
+            schema = {"type": "string"}
+        # Only report a format when every observed value agreed on it
+        if schema["type"] == "string" and len(self.formats) == 1:
+            fmt, n = next(iter(self.formats.items()))
+            if n == self.count:
+                schema["format"] = fmt
+        if self.samples:
+            schema["example"] = self.samples[0]
+        return schema
+
+
+class OperationStats:
+    """Observed facts about one templated path + method pair."""
+
+    __slots__ = ("count", "authenticated", "auth_schemes", "query", "headers", "body",
+                 "body_type", "statuses", "rate_limit_headers")
+
+    def __init__(self):
+        self.count = 0
+        self.authenticated = 0
+        self.auth_schemes: Dict[str, int] = {}
+        self.query: Dict[str, ValueStats] = {}
+        self.headers: Dict[str, ValueStats] = {}
+        self.body: Dict[str, ValueStats] = {}
+        self.body_type: Optional[str] = None
+        self.statuses: Dict[str, int] = {}
+        self.rate_limit_headers: Dict[str, None] = {}
+
+    def merge(self, other: "OperationStats", max_samples: int) -> None:
+        self.count += other.count
+        self.authenticated += other.authenticated
+        for scheme, n in other.auth_schemes.items():
+            self.auth_schemes[scheme] = self.auth_schemes.get(scheme, 0) + n
+        for mine, theirs in ((self.query, other.query), (self.headers, other.headers),
+                             (self.body, other.body)):
+            for name, stats in theirs.items():
+                if name in mine:
+                    mine[name].merge(stats, max_samples)
+                else:
+                    mine[name] = stats
+        self.body_type = self.body_type or other.body_type
+        for status, n in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + n
+        self.rate_limit_headers.update(other.rate_limit_headers)
+
+
+class RouteNode:
+    """Trie node over path segments; variable segments share the ``param`` child."""
+
+    __slots__ = ("literals", "param", "param_stats", "operations", "collapsed")
+
+    def __init__(self):
+        self.collapsed = False
+        self.literals: Dict[str, "RouteNode"] = {}
+        self.param: Optional["RouteNode"] = None
+        self.param_stats = ValueStats()
+        self.operations: Dict[str, OperationStats] = {}
+
+
+class TrafficIngester:
+    """Infer an OpenAPI model from captured HAR or JSONL proxy traffic."""
+
+    def __init__(
+        self,
+        max_literal_children: int = 64,
+        max_samples: int = 5,
+        max_fields: int = 200,
+        max_body_depth: int = 6,
+        hosts: Optional[Iterable[str]] = None,
+    ):
+        # Once a segment position has seen this many distinct literals it is treated as variable
+        self.max_literal_children = max_literal_children
+        self.max_samples = max_samples
+        self.max_fields = max_fields
+        self.max_body_depth = max_body_depth
+        self.hosts = {h.lower() for h in hosts} if hosts else None
+        self.root = RouteNode()
+        self.servers: Dict[str, None] = {}
+        self.entries_seen = 0
+        self.entries_skipped = 0
+
+        self.int_pattern = re.compile(r"-?\d+")
+        self.number_pattern = re.compile(r"-?\d+\.\d+")
+        self.uuid_pattern = re.compile(
+            r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+        )
+        self.hex_pattern = re.compile(r"[0-9a-f]{16,}", re.IGNORECASE)
+        self.token_pattern = re.compile(r"(?=.*\d)[A-Za-z0-9_\-]{20,}")
+        self.email_pattern = re.compile(r"[^@/\s]+@[^@/\s]+\.[^@/\s]+")
+        self.datetime_pattern = re.compile(r"\d{4}-\d{2}-\d{2}(T[\d:.]+(Z|[+-]\d{2}:?\d{2})?)?")
+
+    # ------------------------------------------------------------------ input
+    def ingest_file(self, file_path: str) -> int:
+        """Ingest a ``.har`` or JSON-lines capture from disk; returns entries ingested."""
+        with open(file_path, "r", encoding="utf-8", errors="replace") as stream:
+            if file_path.endswith(".har"):
+                return self.ingest_har(stream)
+            return self.ingest_jsonl(stream)
+
+    def ingest_har(self, stream: IO[str]) -> int:
+        """Ingest a HAR document from a text stream."""
+        return self.ingest_entries(iter_har_entries(stream))
+
+    def ingest_jsonl(self, stream: IO[str]) -> int:
+        """Ingest JSON-lines records (HAR entries or flat proxy log records)."""
+        return self.ingest_entries(iter_jsonl_entries(stream))
+
+    def ingest_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Ingest already-decoded traffic records."""
+        ingested = 0
+        with telemetry.span("ingest") as span:
+            for entry in entries:
+                self.entries_seen += 1
+                record = self.normalize_entry(entry)
+                if record is None:
+                    self.entries_skipped += 1
+                    continue
+                self.observe(**record)
+                ingested += 1
+            span.set(entries=ingested)
+        return ingested
+
+    def normalize_entry(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map a HAR entry or a flat proxy record onto ``observe`` keyword arguments."""
+        if isinstance(entry.get("request"), dict):
+            request = entry["request"]
+            response = entry.get("response") or {}
+            post_data = request.get("postData") or {}
+            body: Any = post_data.get("text")
+            if body is None and post_data.get("params"):
+                body = {p.get("name"): p.get("value") for p in post_data["params"]}
+            return {
+                "method": request.get("method", ""),
+                "url": request.get("url", ""),
+                "headers": self._header_dict(request.get("headers")),
+                "body": body,
+                "content_type": post_data.get("mimeType"),
+                "status": response.get("status"),
+                "response_headers": self._header_dict(response.get("headers")),
+            }
+        if "url" in entry and "method" in entry:
+            headers = self._header_dict(entry.get("request_headers") or entry.get("headers"))
+            return {
+                "method": entry["method"],
+                "url": entry["url"],
+                "headers": headers,
+                "body": entry.get("request_body", entry.get("body")),
+                "content_type": entry.get("content_type") or headers.get("content-type"),
+                "status": entry.get("status", entry.get("status_code")),
+                "response_headers": self._header_dict(entry.get("response_headers")),
+            }
+        return None
+
+    def _header_dict(self, headers: Any) -> Dict[str, str]:
+        if isinstance(headers, dict):
+            return {str(k).lower(): str(v) for k, v in headers.items()}
+        if isinstance(headers, list):
+            return {
+                str(h.get("name", "")).lower(): str(h.get("value", ""))
+                for h in headers
+                if isinstance(h, dict)
+            }
+        return {}
+
+    # ------------------------------------------------------------- clustering
+    def observe(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: Any = None,
+        content_type: Optional[str] = None,
+        status: Any = None,
+        response_headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Fold a single request/response pair into the inferred model."""
+        method = (method or "").upper()
+        if method not in HTTP_METHODS:
+            return
+        parts = urlsplit(url)
+        if self.hosts is not None and (parts.hostname or "").lower() not in self.hosts:
+            return
+        if parts.scheme and parts.netloc and len(self.servers) < 16:
+            self.servers[f"{parts.scheme}://{parts.netloc}"] = None
+
+        node = self.root
+        for segment in (s for s in parts.path.split("/") if s):
+            node = self._descend(node, segment)
+
+        op = node.operations.get(method)
+        if op is None:
+            op = node.operations[method] = OperationStats()
+        op.count += 1
+
+        headers = headers or {}
+        schemes = [h for h in headers if h in AUTH_HEADERS]
+        if schemes:
+            op.authenticated += 1
+            for scheme in schemes:
+                op.auth_schemes[scheme] = op.auth_schemes.get(scheme, 0) + 1
+        for name, value in headers.items():
+            if name.startswith("x-") and name not in AUTH_HEADERS and name not in NOISE_HEADERS:
+                self._record(op.headers, name, value)
+
+        for name, value in parse_qsl(parts.query, keep_blank_values=True):
+            self._record(op.query, name, value)
+
+        self._record_body(op, body, (content_type or headers.get("content-type") or "").lower())
+
+        if status is not None and str(status).isdigit() and int(status) > 0:
+            code = str(status)
+            op.statuses[code] = op.statuses.get(code, 0) + 1
+        for name in response_headers or {}:
+            if name.startswith(RATE_LIMIT_HEADERS):
+                op.rate_limit_headers[name] = None
+
+    def _descend(self, node: RouteNode, segment: str) -> RouteNode:
+        child = node.literals.get(segment)
+        if child is not None:
+            return child
+        variable = self.is_variable_segment(segment)
+        if not variable and not node.collapsed:
+            if len(node.literals) < self.max_literal_children:
+                child = node.literals[segment] = RouteNode()
+                return child
+            # Literal cardinality overflowed: fold the literal siblings into the variable slot
+            node.collapsed = True
+            if node.param is None:
+                node.param = RouteNode()
+            for literal, subtree in node.literals.items():
+                node.param_stats.add(*self.classify(literal), self.max_samples)
+                self._merge(node.param, subtree)
+            node.literals = {}
+        if node.param is None:
+            node.param = RouteNode()
+        node.param_stats.add(*self.classify(segment), self.max_samples)
+        return node.param
+
+    def _merge(self, into: RouteNode, other: RouteNode) -> None:
+        stack = [(into, other)]
+        while stack:
+            dst, src = stack.pop()
+            for method, stats in src.operations.items():
+                if method in dst.operations:
+                    dst.operations[method].merge(stats, self.max_samples)
+                else:
+                    dst.operations[method] = stats
+            for literal, child in src.literals.items():
+                if dst.collapsed and dst.param is not None:
+                    stack.append((dst.param, child))
+                elif literal in dst.literals:
+                    stack.append((dst.literals[literal], child))
+                else:
+                    dst.literals[literal] = child
+            if src.param is not None:
+                if dst.param is None:
+                    dst.param = RouteNode()
+                dst.param_stats.merge(src.param_stats, self.max_samples)
+                stack.append((dst.param, src.param))
+
+    def is_variable_segment(self, segment: str) -> bool:
+        """Whether a concrete path segment looks like an identifier value."""
+        return bool(
+            self.int_pattern.fullmatch(segment)
+            or self.uuid_pattern.fullmatch(segment)
+            or self.hex_pattern.fullmatch(segment)
+            or self.token_pattern.fullmatch(segment)
+            or self.email_pattern.fullmatch(segment)
+        )
+
+    def classify(self, value: Any) -> Tuple[str, Optional[str], Any]:
+        """Return ``(json_type, string_format, normalized_value)`` for an observed value."""
+        if isinstance(value, bool):
+            return "boolean", None, value
+        if isinstance(value, int):
+            return "integer", None, value
+        if isinstance(value, float):
+            return "number", None, value
+        if isinstance(value, list):
+            return "array", None, None
+        if isinstance(value, dict):
+            return "object", None, None
+        if value is None:
+            return "string", None, None
+        text = str(value)
+        if self.int_pattern.fullmatch(text):
+            return "integer", None, int(text)
+        if self.number_pattern.fullmatch(text):
+            return "number", None, float(text)
+        if text in ("true", "false"):
+            return "boolean", None, text == "true"
+        if self.uuid_pattern.fullmatch(text):
+            return "string", "uuid", text
+        if self.email_pattern.fullmatch(text):
+            return "string", "email", text
+        if self.datetime_pattern.fullmatch(text):
+            return "string", "date-time", text
+        return "string", None, text[:64]
+
+    def _record(self, fields: Dict[str, ValueStats], name: str, value: Any) -> None:
+        stats = fields.get(name)
+        if stats is None:
+            if len(fields) >= self.max_fields:
+                return
+            stats = fields[name] = ValueStats()
+        stats.add(*self.classify(value), self.max_samples)
+
+    def _record_body(self, op: OperationStats, body: Any, content_type: str) -> None:
+        if body in (None, ""):
+            return
+        if isinstance(body, str):
+            if "x-www-form-urlencoded" in content_type:
+                body = dict(parse_qsl(body, keep_blank_values=True))
+                op.body_type = op.body_type or "application/x-www-form-urlencoded"
+            else:
+                try:
+                    body = json.loads(body)
+                except ValueError:
+                    return
+        if not isinstance(body, (dict, list)):
+            return
+        op.body_type = op.body_type or "application/json"
+        # Flatten nested objects to dotted names; arrays of objects use ``[]``
+        stack: List[Tuple[str, Any, int]] = [("", body, 0)]
+        while stack:
+            prefix, value, depth = stack.pop()
+            if isinstance(value, dict) and depth < self.max_body_depth:
+                for key, child in value.items():
+                    stack.append((f"{prefix}.{key}" if prefix else str(key), child, depth + 1))
+            elif isinstance(value, list) and value and isinstance(value[0], dict) and (
+                depth < self.max_body_depth
+            ):
+                if prefix:
+                    self._record(op.body, prefix, value)
+                stack.append((f"{prefix}[]" if prefix else "[]", value[0], depth + 1))
+            elif prefix:
+                self._record(op.body, prefix, value)
+
+    # ----------------------------------------------------------------- output
+    def to_openapi(self) -> Dict[str, Any]:
+        """Synthesize an OpenAPI 3 document from everything observed so far."""
+        paths: Dict[str, Any] = {}
+        security_schemes: Dict[str, Any] = {}
+        stack: List[Tuple[RouteNode, List[str], List[Dict[str, Any]], Optional[str]]] = [
+            (self.root, [], [], None)
+        ]
+        while stack:
+            node, segments, path_params, prev_literal = stack.pop()
+            if node.operations:
+                path = "/" + "/".join(segments)
+                path_item = paths.setdefault(path, {})
+                if path_params:
+                    path_item["parameters"] = [dict(p) for p in path_params]
+                for method, op in sorted(node.operations.items()):
+                    path_item[method.lower()] = self._operation(op, security_schemes)
+            for literal, child in node.literals.items():
+                stack.append((child, segments + [literal], path_params, literal))
+            if node.param is not None:
+                name = self._param_name(prev_literal, path_params)
+                param = {
+                    "name": name,
+                    "in": "path",
+                    "required": True,
+                    "schema": node.param_stats.schema(),
+                }
+                stack.append(
+                    (node.param, segments + ["{" + name + "}"], path_params + [param], None)
+                )
+
+        spec: Dict[str, Any] = {
+            "openapi": "3.0.3",
+            "info": {"title": "Inferred from captured traffic", "version": "0.0.0"},
+            "paths": dict(sorted(paths.items())),
+        }
+        if self.servers:
+            spec["servers"] = [{"url": url} for url in self.servers]
+        if security_schemes:
+            spec["components"] = {"securitySchemes": security_schemes}
+        return spec
+
+    def _param_name(self, prev_literal: Optional[str], path_params: List[Dict[str, Any]]) -> str:
+        used = {p["name"] for p in path_params}
+        if not used:
+            return "id"
+        if prev_literal:
+            base = re.sub(r"[^A-Za-z0-9]", "", prev_literal)
+            if base.endswith("s") and len(base) > 1:
+                base = base[:-1]
+            candidate = f"{base}Id"
+            if base and candidate not in used:
+                return candidate
+        n = len(used) + 1
+        while f"id{n}" in used:
+            n += 1
+        return f"id{n}"
+
+    def _operation(self, op: OperationStats, security_schemes: Dict[str, Any]) -> Dict[str, Any]:
+        parameters = [
+            {"name": name, "in": "query", "schema": stats.schema()}
+            for name, stats in sorted(op.query.items())
+        ]
+        parameters += [
+            {"name": name, "in": "header", "schema": stats.schema()}
+            for name, stats in sorted(op.headers.items())
+        ]
+        operation: Dict[str, Any] = {
+            "x_traffic_observations": op.count,
+            "parameters": parameters,
+            "responses": {
+                code: {"description": ""} for code in sorted(op.statuses)
+            } or {"default": {"description": ""}},
+        }
+        if op.rate_limit_headers:
+            first = next(iter(sorted(op.statuses)), "default")
+            operation["responses"][first]["headers"] = {
+                name: {"schema": {"type": "string"}} for name in op.rate_limit_headers
+            }
+        if op.body:
+            operation["requestBody"] = {
+                "content": {op.body_type or "application/json": {"schema": self._body_schema(op.body)}}
+            }
+        # Only claim an operation is unauthenticated if we never saw credentials on it
+        if op.authenticated:
+            requirements = []
+            for header in sorted(op.auth_schemes):
+                scheme_name, scheme = self._security_scheme(header)
+                security_schemes[scheme_name] = scheme
+                requirements.append({scheme_name: []})
+            operation["security"] = requirements
+        else:
+            operation["security"] = []
+        return operation
+
+    def _security_scheme(self, header: str) -> Tuple[str, Dict[str, Any]]:
+        if header == "authorization":
+            return "observedAuthorization", {"type": "http", "scheme": "bearer"}
+        if header == "cookie":
+            return "observedCookie", {"type": "apiKey", "in": "cookie", "name": "session"}
+        return f"observed_{header}", {"type": "apiKey", "in": "header", "name": header}
+
+    def _body_schema(self, fields: Dict[str, ValueStats]) -> Dict[str, Any]:
+        root: Dict[str, Any] = {"type": "object", "properties": {}}
+        for dotted, stats in sorted(fields.items()):
+            node = root
+            parts = dotted.split(".")
+            for part in parts[:-1]:
+                node = self._body_child(node, part)
+            leaf_name = parts[-1]
+            if leaf_name.endswith("[]"):
+                node = self._body_child(node, leaf_name)
+                continue
+            if leaf_name in node.setdefault("properties", {}):
+                continue
+            node["properties"][leaf_name] = stats.schema()
+        return root
+
+    def _body_child(self, node: Dict[str, Any], part: str) -> Dict[str, Any]:
+        if part.endswith("[]"):
+            name = part[:-2]
+            holder = node.setdefault("properties", {}).get(name) if name else node
+            if holder is None or holder.get("type") != "array":
+                holder = {"type": "array", "items": {}}
+                if name:
+                    node["properties"][name] = holder
+                else:
+                    node.clear()
+                    node.update(holder)
+            items = holder.setdefault("items", {})
+            items.setdefault("type", "object")
+            items.setdefault("properties", {})
+            return items
+        child = node.setdefault("properties", {}).get(part)
+        if child is None or child.get("type") != "object":
+            child = node["properties"][part] = {"type": "object", "properties": {}}
+        return child
+
+    def analyze(self, analyzer: Optional[IDORAnalyzer] = None) -> Dict[str, Any]:
+        """Run the IDOR analyzer against the inferred specification."""
+        return (analyzer or IDORAnalyzer()).analyze(self.to_openapi())
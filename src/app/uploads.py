@@ -0,0 +1,156 @@
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import time
+import weakref
+from typing import Any, BinaryIO, Iterator, MutableMapping, Optional
+
+DEFAULT_MAX_UPLOAD_MB = int(os.environ.get("BUGPROWLER_MAX_UPLOAD_MB", "200"))
+# Spools older than this are left over from sessions that never ended cleanly
+DEFAULT_SPOOL_TTL_HOURS = float(os.environ.get("BUGPROWLER_SPOOL_TTL_HOURS", "24"))
+DEFAULT_PREVIEW_BYTES = 16 * 1024
+CHUNK_SIZE = 1024 * 1024
+SPOOL_PREFIX = "bugprowler-"
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the configured size cap."""
+
+
+class SpooledUpload:
+    """An upload copied to a temporary file; contents are read through mmap, never held whole.
+
+    ``digest`` is the sha256 of the contents, computed while spooling, so
+    callers can tag or cache by content without re-reading the file. The
+    file is removed by ``delete`` or, failing that, when the object is
+    garbage collected (e.g. with the Streamlit session holding it).
+    """
+
+    def __init__(self, path: str, name: str, size: int, digest: str):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.digest = digest
+        self._finalizer = weakref.finalize(self, _unlink, path)
+
+    @property
+    def tag(self) -> str:
+        """Same short tag ``profiling.spec_hash`` would give the raw bytes."""
+        return self.digest[:12]
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def text_stream(self) -> io.TextIOWrapper:
+        """Incrementally decoded UTF-8 view, for streaming parsers."""
+        return io.TextIOWrapper(self.open(), encoding="utf-8", errors="replace")
+
+    @contextlib.contextmanager
+    def mapped(self) -> Iterator[Any]:
+        """Read-only memory map of the file (an empty bytes object for empty files)."""
+        if self.size == 0:
+            yield b""
+            return
+        with self.open() as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+    def head(self, limit: int = DEFAULT_PREVIEW_BYTES) -> str:
+        """First ``limit`` bytes decoded as text, cut back to the last complete line."""
+        with self.mapped() as mm:
+            chunk = mm[:limit]
+        if len(chunk) < self.size:
+            newline = chunk.rfind(b"\n")
+            if newline > 0:
+                chunk = chunk[: newline + 1]
+        return chunk.decode("utf-8", errors="replace")
+
+    def is_text(self, sniff: int = 8192) -> bool:
+        """Heuristic: no NUL bytes in the first ``sniff`` bytes."""
+        with self.mapped() as mm:
+            return b"\x00" not in mm[:sniff]
+
+    def delete(self) -> None:
+        self._finalizer()
+
+
+def _unlink(path: str) -> None:
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+def spool_upload(
+    uploaded: BinaryIO,
+    name: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    directory: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> SpooledUpload:
+    """Copy a file-like upload to disk in chunks, enforcing ``max_bytes``.
+
+    The cap defaults to ``BUGPROWLER_MAX_UPLOAD_MB``; the copy is abandoned
+    (and the partial file removed) as soon as it is exceeded.
+    """
+    if max_bytes is None:
+        max_bytes = DEFAULT_MAX_UPLOAD_MB * 1024 * 1024
+    name = name or getattr(uploaded, "name", "upload")
+    declared = getattr(uploaded, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLarge(f"{name} is {declared / 2**20:.1f} MB; the limit is {max_bytes / 2**20:.0f} MB")
+    if hasattr(uploaded, "seek"):
+        uploaded.seek(0)
+
+    suffix = os.path.splitext(name)[1]
+    fd, path = tempfile.mkstemp(prefix=SPOOL_PREFIX, suffix=suffix, dir=directory)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = uploaded.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"{name} exceeds the {max_bytes / 2**20:.0f} MB upload limit")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        _unlink(path)
+        raise
+    return SpooledUpload(path, name, size, digest.hexdigest())
+
+
+def session_spool(uploads: MutableMapping[str, SpooledUpload], uploaded: Any) -> SpooledUpload:
+    """Spool ``uploaded`` once per session; ``uploads`` is one uploader's mapping in that session.
+
+    Reruns get the existing spool back and a new upload replaces (and
+    deletes) the previous one, so each uploader holds at most one file.
+    Give every uploader its own mapping: a shared one would let an upload
+    on one page delete a file another page is still reading.
+    """
+    key = getattr(uploaded, "file_id", None) or f"{uploaded.name}:{uploaded.size}"
+    if key not in uploads:
+        for old in uploads.values():
+            old.delete()
+        uploads.clear()
+        uploads[key] = spool_upload(uploaded)
+    return uploads[key]
+
+
+def sweep_spools(max_age_hours: float = DEFAULT_SPOOL_TTL_HOURS, directory: Optional[str] = None) -> int:
+    """Delete spool files older than ``max_age_hours``; returns how many were removed."""
+    directory = directory or tempfile.gettempdir()
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.startswith(SPOOL_PREFIX) or not entry.is_file(follow_symlinks=False):
+                continue
+            with contextlib.suppress(FileNotFoundError):
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+    return removed
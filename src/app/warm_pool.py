@@ -0,0 +1,303 @@
+import gc
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .analysis_framework import CancellationToken, Progress, ProgressCallback
+
+# Each worker is a full process; keep the default small and scale it by config
+DEFAULT_WORKERS = int(os.environ.get("BUGPROWLER_ANALYSIS_WORKERS", "2"))
+
+# Everything a worker would otherwise import (or build) before its first job
+PRELOAD_MODULES = [
+    "yaml",
+    "numpy",
+    "httpx",
+    "openai",
+    "agno.agent",
+    "agno.models.openai",
+    f"{__package__}.detectors",
+    f"{__package__}.spec_model",
+    f"{__package__}.swagger_analysis",
+    __name__,
+]
+
+WARMUP_SPEC = {
+    "openapi": "3.0.0",
+    "paths": {
+        "/users/{userId}": {
+            "get": {"parameters": [{"name": "userId", "in": "path", "required": True, "schema": {"type": "integer"}}]},
+            "put": {"requestBody": {"content": {"application/json": {"schema": {
+                "type": "object", "properties": {"role": {"type": "string"}}}}}}},
+        }
+    },
+}
+
+
+def preload(modules: Optional[List[str]] = None) -> float:
+    """Import the heavy modules, exercise the analyzer once and freeze the heap; returns seconds taken.
+
+    ``gc.freeze`` moves every object allocated so far out of the collector's
+    reach, so forked workers never touch (and copy) those pages while
+    collecting.
+    """
+    start = time.perf_counter()
+    for name in PRELOAD_MODULES if modules is None else modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    from .detectors import default_detectors
+    from .swagger_analysis import IDORAnalyzer
+
+    IDORAnalyzer(detectors=default_detectors()).analyze(WARMUP_SPEC)
+    gc.collect()
+    gc.freeze()
+    return time.perf_counter() - start
+
+
+def _worker_main(conn: Any, max_specs: int) -> None:
+    """Serve analysis requests over ``conn`` until told to stop."""
+    # Objects inherited from the parent stay frozen here as well
+    gc.freeze()
+    from .detectors import default_detectors
+    from .spec_model import SpecCache
+    from .swagger_analysis import IDORAnalyzer
+
+    cache = SpecCache(max_specs=max_specs)
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if message is None:
+            return
+        if message[0] == "cancel":
+            # Arrived after the job it targets had already finished
+            continue
+        _, job_id, path, digest = message
+        token = CancellationToken()
+
+        def progress(update: Progress) -> None:
+            conn.send(("progress", job_id, update.stage, update.done, update.total, update.elapsed))
+            while conn.poll():
+                if conn.recv()[0] == "cancel":
+                    token.cancel()
+
+        try:
+            spec = cache.load(path, digest).to_dict()
+            result = IDORAnalyzer(detectors=default_detectors()).analyze(spec, progress=progress, cancel=token)
+            conn.send(("result", job_id, result))
+        except Exception as e:
+            conn.send(("error", job_id, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "resident")
+
+    def __init__(self, process: Any, conn: Any):
+        self.process = process
+        self.conn = conn
+        # Mirrors the worker's SpecCache LRU, so jobs can be routed to the worker holding their spec
+        self.resident: "OrderedDict[str, None]" = OrderedDict()
+
+
+class WorkerDied(RuntimeError):
+    """The worker running a job exited before answering (it is replaced automatically)."""
+
+
+class WarmPool:
+    """Pre-forked analysis workers sharing one warmed-up heap copy-on-write.
+
+    The heavy imports and a first analysis happen once; workers are then
+    forked from that state, so starting one (scale-out or crash recovery)
+    costs a fork rather than seconds of imports. From a single-threaded
+    parent, workers are forked from the parent itself after ``preload``;
+    from a threaded one (Streamlit) they come from a fork server that runs
+    the same ``preload`` (see ``forkserver_warmup``), since forking a
+    threaded process is unsafe.
+
+    ``analyze`` blocks until a worker is free and relays progress and
+    cancellation over the worker's pipe, so it can serve as an
+    ``AnalysisJob`` target while the CPU work happens in another process.
+    Each worker keeps its own spec cache; a job goes to the idle worker that
+    already holds its digest, so a re-analysis skips parsing unless that
+    worker is busy.
+    """
+
+    def __init__(
+        self,
+        processes: int = DEFAULT_WORKERS,
+        start_method: Optional[str] = None,
+        max_specs: int = 32,
+        poll_interval: float = 0.05,
+    ):
+        if start_method is None:
+            start_method = "fork" if threading.active_count() == 1 else "forkserver"
+        self.start_method = start_method
+        self.ctx = multiprocessing.get_context(start_method)
+        self.processes = processes
+        self.max_specs = max_specs
+        self.poll_interval = poll_interval
+        self.preload_seconds = 0.0
+        self._idle: List[_Worker] = []
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._ids = 0
+        self._closed = False
+
+    def start(self) -> "WarmPool":
+        if self.start_method == "fork":
+            self.preload_seconds = preload()
+        elif self.start_method == "forkserver":
+            self.ctx.set_forkserver_preload([f"{__package__}.forkserver_warmup"])
+        self.scale(self.processes)
+        return self
+
+    def _spawn(self) -> _Worker:
+        parent, child = self.ctx.Pipe()
+        process = self.ctx.Process(
+            target=_worker_main, args=(child, self.max_specs), name="bugprowler-analysis", daemon=True
+        )
+        process.start()
+        child.close()
+        worker = _Worker(process, parent)
+        with self._lock:
+            self._workers.append(worker)
+        self._release(worker)
+        return worker
+
+    def _acquire(self, digest: Optional[str]) -> _Worker:
+        """Take an idle worker, preferring one whose cache holds ``digest``; blocks until one is free."""
+        with self._available:
+            while not self._idle:
+                if self._closed or self.processes == 0:
+                    raise RuntimeError("pool is closed" if self._closed else "pool has no workers")
+                self._available.wait()
+            worker = next((w for w in self._idle if digest is not None and digest in w.resident), self._idle[0])
+            self._idle.remove(worker)
+            return worker
+
+    def _release(self, worker: _Worker) -> None:
+        with self._available:
+            self._idle.append(worker)
+            self._available.notify()
+
+    def _loaded(self, worker: _Worker, digest: Optional[str]) -> None:
+        if digest is None:
+            return
+        worker.resident[digest] = None
+        worker.resident.move_to_end(digest)
+        while len(worker.resident) > self.max_specs:
+            worker.resident.popitem(last=False)
+
+    def _retire(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        try:
+            worker.conn.send(None)
+        except OSError:
+            pass
+        worker.conn.close()
+
+    def scale(self, processes: int) -> None:
+        """Grow or shrink to ``processes`` workers; busy workers are retired when their job ends."""
+        with self._available:
+            self.processes = processes
+            # Callers waiting for a worker that will never come raise instead
+            self._available.notify_all()
+        while len(self._workers) < processes:
+            self._spawn()
+        while len(self._workers) > processes:
+            with self._lock:
+                if not self._idle:
+                    break
+                worker = self._idle.pop()
+            self._retire(worker)
+
+    def __len__(self) -> int:
+        return len(self._workers)
+
+    def pids(self) -> List[int]:
+        with self._lock:
+            return [w.process.pid for w in self._workers]
+
+    def analyze(
+        self,
+        path: str,
+        digest: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancellationToken] = None,
+    ) -> Dict[str, Any]:
+        """Analyze the spec at ``path`` in a worker; same result as ``IDORAnalyzer.analyze``."""
+        if self._closed:
+            raise RuntimeError("pool is closed")
+        worker = self._acquire(digest)
+        while not worker.process.is_alive():
+            # Died while idle (OOM killer, signal); nothing was lost, just swap it out
+            self._replace(worker)
+            worker = self._acquire(digest)
+        with self._lock:
+            self._ids += 1
+            job_id = self._ids
+        cancel_sent = False
+        error = None
+        try:
+            worker.conn.send(("analyze", job_id, path, digest))
+            while error is None:
+                if cancel is not None and cancel.cancelled and not cancel_sent:
+                    worker.conn.send(("cancel", job_id))
+                    cancel_sent = True
+                if not worker.conn.poll(self.poll_interval):
+                    continue
+                kind, _, *payload = worker.conn.recv()
+                if kind == "progress":
+                    if progress is not None:
+                        progress(Progress(*payload))
+                elif kind == "result":
+                    self._loaded(worker, digest)
+                    return payload[0]
+                else:
+                    error = payload[0]
+        except (EOFError, OSError) as e:
+            # The worker crashed mid-job; replace it from the warm state and fail this job only
+            self._replace(worker)
+            raise WorkerDied(f"analysis worker exited with {worker.process.exitcode}") from e
+        except BaseException:
+            # Interrupted while the worker may still be answering; its pipe can't be reused
+            self._replace(worker)
+            raise
+        finally:
+            if worker in self._workers:
+                if len(self._workers) > self.processes:
+                    self._retire(worker)
+                else:
+                    self._release(worker)
+        raise RuntimeError(error)
+
+    def _replace(self, worker: _Worker) -> None:
+        self._retire(worker)
+        worker.process.join(1)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        if not self._closed and len(self._workers) < self.processes:
+            self._spawn()
+
+    def close(self) -> None:
+        with self._available:
+            self._closed = True
+            self._available.notify_all()
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._retire(worker)
+        for worker in workers:
+            worker.process.join(5)
+            if worker.process.is_alive():
+                worker.process.terminate()
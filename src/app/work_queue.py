@@ -0,0 +1,385 @@
+import argparse
+import functools
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from . import telemetry
+from .warm_pool import preload
+
+DEFAULT_QUEUE_DB = os.environ.get("BUGPROWLER_QUEUE_DB", "jobs.db")
+
+# WAL is the fast default on one host; set BUGPROWLER_QUEUE_JOURNAL=DELETE when
+# the queue file lives on storage shared between machines (WAL needs shared memory).
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    spec_path TEXT NOT NULL,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    visible_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, visible_at);
+CREATE INDEX IF NOT EXISTS jobs_leases ON jobs (status, lease_expires);
+
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    job_id INTEGER NOT NULL,
+    worker TEXT NOT NULL,
+    result TEXT NOT NULL,
+    completed_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LeaseLost(RuntimeError):
+    """The job's lease expired and another worker may have claimed it."""
+
+
+class WorkQueue:
+    """Durable spec-analysis job queue in a single SQLite file; no broker needed.
+
+    A job is claimed under a lease (``lease_owner``/``lease_expires``) and is
+    invisible to other workers until the lease runs out. A worker that dies
+    simply stops renewing, so its job becomes claimable again once the lease
+    expires. Failures are retried with exponential backoff (``visible_at``)
+    up to ``max_attempts``, then parked as ``dead``. Completion is keyed by
+    the job key (the spec's content hash by default), so re-running a job
+    overwrites rather than duplicates its result.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_QUEUE_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; every state change below is its own explicit transaction
+            conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode = {os.environ.get('BUGPROWLER_QUEUE_JOURNAL', 'WAL')}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        # BEGIN IMMEDIATE takes the write lock up front so claim races cannot deadlock
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    # -------------------------------------------------------------- producer
+    def enqueue(
+        self,
+        spec_path: str,
+        target: Optional[str] = None,
+        key: Optional[str] = None,
+        max_attempts: int = 5,
+    ) -> Optional[int]:
+        """Queue a spec; returns the job id, or None if the same key is already queued/done."""
+        spec_path = os.path.abspath(spec_path)
+        key = key or file_digest(spec_path)
+        now = time.time()
+        cursor = self.connection().execute(
+            "INSERT OR IGNORE INTO jobs (key, spec_path, target, max_attempts, visible_at, enqueued_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, spec_path, target or os.path.basename(spec_path), max_attempts, now, now),
+        )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    # ---------------------------------------------------------------- worker
+    def claim(self, worker: str, lease_seconds: float = 300.0, limit: int = 1) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` ready jobs, including ones whose previous lease expired."""
+
+        def claim_tx(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            now = time.time()
+            # Expired leases that used up their attempts are parked, not retried
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', error = COALESCE(error, 'lease expired'), lease_owner = NULL"
+                " WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                (now,),
+            )
+            rows = conn.execute(
+                "SELECT id FROM jobs WHERE (status = 'queued' AND visible_at <= ?)"
+                " OR (status = 'leased' AND lease_expires < ?) ORDER BY id LIMIT ?",
+                (now, now, limit),
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1"
+                f" WHERE id IN ({marks})",
+                (worker, now + lease_seconds, *ids),
+            )
+            return [dict(row) for row in conn.execute(f"SELECT * FROM jobs WHERE id IN ({marks})", ids)]
+
+        return self._transaction(claim_tx)
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float = 300.0) -> None:
+        """Extend the lease; raises LeaseLost if another worker has taken the job."""
+        cursor = self.connection().execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time() + lease_seconds, job_id, worker),
+        )
+        if not cursor.rowcount:
+            raise LeaseLost(f"job {job_id} is no longer leased by {worker}")
+
+    def complete(self, job: Dict[str, Any], worker: str, result: Dict[str, Any]) -> bool:
+        """Store the result and mark the job done; False if the lease was lost meanwhile."""
+
+        def complete_tx(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, lease_owner = NULL, error = NULL"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (time.time(), job["id"], worker),
+            )
+            if not cursor.rowcount:
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, job_id, worker, result, completed_at) VALUES (?, ?, ?, ?, ?)",
+                (job["key"], job["id"], worker, json.dumps(result), time.time()),
+            )
+            return True
+
+        return self._transaction(complete_tx)
+
+    def fail(self, job: Dict[str, Any], worker: str, error: str, backoff: float = 30.0) -> None:
+        """Release the job for a retry after exponential backoff, or park it as dead."""
+        now = time.time()
+        self.connection().execute(
+            "UPDATE jobs SET"
+            " status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'queued' END,"
+            " visible_at = ? + ? * (1 << MIN(attempts - 1, 10)), lease_owner = NULL, error = ?"
+            " WHERE id = ? AND lease_owner = ?",
+            (now, backoff, error[:2000], job["id"], worker),
+        )
+
+    # ----------------------------------------------------------------- admin
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        counts = {
+            row["status"]: row["n"]
+            for row in self.connection().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        }
+        counts["expired_leases"] = self.connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'leased' AND lease_expires < ?", (now,)
+        ).fetchone()[0]
+        return counts
+
+    def requeue_dead(self) -> int:
+        cursor = self.connection().execute(
+            "UPDATE jobs SET status = 'queued', attempts = 0, visible_at = ?, error = NULL WHERE status = 'dead'",
+            (time.time(),),
+        )
+        return cursor.rowcount
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.connection().execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["result"]) if row else None
+
+
+# ------------------------------------------------------------------ worker loop
+class Heartbeat:
+    """Renews a job's lease in the background while it is being analyzed."""
+
+    def __init__(self, queue: WorkQueue, job_id: int, worker: str, lease_seconds: float):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_seconds / 3):
+            try:
+                self.queue.heartbeat(self.job_id, self.worker, self.lease_seconds)
+            except LeaseLost:
+                self.lost = True
+                return
+
+    def __enter__(self) -> "Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def analyze_job(
+    job: Dict[str, Any], findings_db: Optional[str] = None, journal_mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """Analyze one queued spec; the result goes to the queue's ``results`` table.
+
+    With ``findings_db`` the findings are also stored there idempotently
+    (keyed by job key). Point every node at the same shared file, with
+    ``journal_mode`` DELETE if WAL's shared memory is not available there.
+    """
+    from .detectors import default_detectors
+    from .findings_store import DEFAULT_JOURNAL_MODE, FindingsStore
+    from .swagger_analysis import IDORAnalyzer
+
+    result = IDORAnalyzer(detectors=default_detectors()).analyze_file(job["spec_path"])
+    if findings_db:
+        store = FindingsStore(findings_db, journal_mode=journal_mode or DEFAULT_JOURNAL_MODE)
+        store.replace_analysis(job["target"], result, source=f"queue:{job['key'][:16]}")
+    return result
+
+
+def run_worker(
+    queue: WorkQueue,
+    worker: Optional[str] = None,
+    lease_seconds: float = 300.0,
+    poll_interval: float = 2.0,
+    stop: Optional[threading.Event] = None,
+    handler: Callable[[Dict[str, Any]], Dict[str, Any]] = analyze_job,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """Claim and process jobs until ``stop`` is set (or the queue drains with ``max_jobs``).
+
+    Returns the number of jobs completed.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    stop = stop or threading.Event()
+    completed = 0
+    jobs_total = telemetry.registry.counter("bugprowler_queue_jobs_total", "Queue jobs processed by outcome.")
+    while not stop.is_set() and (max_jobs is None or completed < max_jobs):
+        jobs = queue.claim(worker, lease_seconds)
+        if not jobs:
+            if max_jobs is not None:
+                break
+            stop.wait(poll_interval)
+            continue
+        job = jobs[0]
+        outcome = "error"
+        try:
+            with telemetry.span("queue_job", worker=worker) as span, Heartbeat(queue, job["id"], worker, lease_seconds) as beat:
+                span.set(job=job["id"], attempt=job["attempts"])
+                result = handler(job)
+            if beat.lost or not queue.complete(job, worker, result):
+                # Another worker owns the job now; its (identical) result wins
+                outcome = "lease_lost"
+            else:
+                outcome = "done"
+                completed += 1
+        except Exception as e:
+            queue.fail(job, worker, f"{type(e).__name__}: {e}")
+        finally:
+            jobs_total.inc(labels=telemetry.label_key({"outcome": outcome}))
+    return completed
+
+
+def _worker_process(
+    db_path: str,
+    lease_seconds: float,
+    poll_interval: float,
+    findings_db: Optional[str] = None,
+    journal_mode: Optional[str] = None,
+) -> None:
+    stop = threading.Event()
+    # Finish the current job on SIGTERM/SIGINT; an unfinished one is recovered via its lease
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    handler = functools.partial(analyze_job, findings_db=findings_db, journal_mode=journal_mode)
+    run_worker(WorkQueue(db_path), lease_seconds=lease_seconds, poll_interval=poll_interval, stop=stop, handler=handler)
+
+
+def main() -> None:
+    """Durable spec-analysis queue: ``python -m src.app.work_queue {enqueue,worker,stats,requeue-dead}``."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--db", default=DEFAULT_QUEUE_DB, help="queue database (BUGPROWLER_QUEUE_DB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    enqueue = sub.add_parser("enqueue", help="queue spec files (paths or glob patterns)")
+    enqueue.add_argument("specs", nargs="+")
+    enqueue.add_argument("--target", default=None)
+    worker = sub.add_parser("worker", help="process jobs until interrupted")
+    worker.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    worker.add_argument("--lease", type=float, default=300.0, help="lease length in seconds")
+    worker.add_argument("--poll", type=float, default=2.0, help="idle poll interval in seconds")
+    worker.add_argument(
+        "--findings-db", default=None, help="also store findings in this database (default: queue results only)"
+    )
+    worker.add_argument("--findings-journal", default=None, help="journal mode for --findings-db (WAL or DELETE)")
+    sub.add_parser("stats", help="job counts by status")
+    sub.add_parser("requeue-dead", help="give dead jobs a fresh set of attempts")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.db)
+    if args.command == "enqueue":
+        queued = skipped = 0
+        for pattern in args.specs:
+            for path in sorted(glob.glob(pattern)) or [pattern]:
+                if queue.enqueue(path, target=args.target) is None:
+                    skipped += 1
+                else:
+                    queued += 1
+        print(f"Queued {queued} job(s), {skipped} already known")
+    elif args.command == "worker":
+        # One process per core; claims are short transactions, so nodes and processes scale independently.
+        # Workers fork from a warmed, frozen heap instead of each importing the analyzers cold.
+        if multiprocessing.get_start_method() == "fork":
+            preload()
+        procs = [
+            multiprocessing.Process(
+                target=_worker_process,
+                args=(args.db, args.lease, args.poll, args.findings_db, args.findings_journal),
+            )
+            for _ in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+
+        def shutdown(*_: Any) -> None:
+            # Children finish their current job and exit
+            for proc in procs:
+                proc.terminate()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+        for proc in procs:
+            proc.join()
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2))
+    else:
+        print(f"Requeued {queue.requeue_dead()} dead job(s)")
+
+
+if __name__ == "__main__":
+    main()
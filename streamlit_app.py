@@ -1,16 +1,29 @@
 # streamlit_app.py
 import json
+import uuid
 
 import streamlit as st
 
-from src.app.agent import agno_assist  # import your BugProwler agent
+from src.app.agent import build_agno_assist  # import your BugProwler agent
+from src.app.agent_pool import SessionAgentPool
+from src.app.llm_scheduler import estimate_tokens, get_scheduler
 from src.app.markdown_idor import generate_markdown
+from src.app.streaming import StreamingMarkdown
 from src.app.swagger_analysis import IDORAnalyzer
+from src.app.telemetry import instrument_stream
+from src.app.uploads import UploadTooLarge, session_spool
 
 st.set_page_config(page_title="BugProwler Agent", layout="wide")
 
 st.title("𖢥 BugProwler")
 
+
+@st.cache_resource
+def get_assist_pool() -> SessionAgentPool:
+    """One Agno Assist per browser session, so histories never mix."""
+    return SessionAgentPool(lambda sid: build_agno_assist(session_id=sid))
+
+
 # ---------- sidebar navigation ----------
 with st.sidebar:
     st.markdown("### Toolbox:")
@@ -28,6 +41,9 @@ with st.sidebar:
 page = st.session_state.page
 
 # ---------- session state ----------
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+
 if "messages" not in st.session_state:
     st.session_state.messages = []
 
@@ -42,20 +58,22 @@ if page == "Chat":
 
     # ---------- file uploader ----------
     uploaded_file = st.file_uploader(
-        "Upload a file...", type=["txt", "md", "csv", "json", "png", "jpg", "jpeg"]
+        "Upload a file...", type=["txt", "md", "csv", "json", "png", "jpg", "jpeg"], key="chat_upload"
     )
     if uploaded_file is not None:
-        file_bytes = uploaded_file.read()
-        st.write("File uploaded successfully!")
-        # Optional: display the file contents if it's text
-        if uploaded_file.type.startswith("text") or uploaded_file.type in [
-            "application/json"
-        ]:
-            try:
-                content_str = file_bytes.decode("utf-8")
-                st.code(content_str)
-            except Exception as e:
-                st.write(f"Unable to display file contents: {e}")
+        try:
+            # Reruns reuse this uploader's spool; it is deleted with the session
+            upload = session_spool(st.session_state.setdefault("uploads:chat_upload", {}), uploaded_file)
+            st.write("File uploaded successfully!")
+            # Optional: display the head of the file if it's text
+            if uploaded_file.type.startswith("text") or uploaded_file.type in [
+                "application/json"
+            ]:
+                st.code(upload.head())
+        except UploadTooLarge as e:
+            st.error(str(e))
+        except Exception as e:
+            st.write(f"Unable to display file contents: {e}")
 
     # ---------- input ----------
     if prompt := st.chat_input("Ask me anything…"):
@@ -64,40 +82,41 @@ if page == "Chat":
             st.markdown(prompt)
 
         # ---------- run agent ----------
+        session_id = st.session_state.session_id
+        agno_assist = get_assist_pool().get(session_id)
         with st.chat_message("assistant"):
-            placeholder = st.empty()
-            full = ""
-            for chunk in agno_assist.run(
-                prompt, stream=True, debug_mode=True
+            renderer = StreamingMarkdown()
+            # The trailing RunOutput settles the token reservation; instrument_stream keeps it out of the UI
+            for chunk in instrument_stream(
+                get_scheduler().stream(
+                    lambda: agno_assist.run(
+                        prompt,
+                        stream=True,
+                        yield_run_response=True,
+                        session_id=session_id,
+                        debug_mode=True,
+                    ),
+                    priority="interactive",
+                    tokens=estimate_tokens(prompt),
+                ),
+                "agno_assist",
             ):  # 2️⃣ streaming straight into UI
                 if chunk.content:
-                    full += chunk.content
-                    placeholder.markdown(full + "▌")
-            placeholder.markdown(full)
+                    renderer.write(chunk.content)
+            full = renderer.finish()
         st.session_state.messages.append({"role": "assistant", "content": full})
 
 elif page == "Swagger Docs Analyzer":
     st.header("Swagger/OpenAPI Docs Analyzer")
     swagger_file = st.file_uploader(
-        "Upload a Swagger/OpenAPI JSON or YAML file", type=["json", "yaml", "yml"]
+        "Upload a Swagger/OpenAPI JSON or YAML file", type=["json", "yaml", "yml"], key="swagger_upload"
     )
     if swagger_file is not None:
         try:
-            file_bytes = swagger_file.read()
-            # Try to decode as UTF-8 text
-            content_str = file_bytes.decode("utf-8")
-            # st.code(
-            #     content_str,
-            #     language="yaml"
-            #     if swagger_file.type.endswith("yaml")
-            #     or swagger_file.type.endswith("yml")
-            #     else "json",
-            # )
-            # Ask the agent to analyze the Swagger docs
-            analyze_prompt = f"Analyze the following Swagger/OpenAPI specification and summarize its endpoints, authentication, and notable features:\n\n{content_str}"
+            upload = session_spool(st.session_state.setdefault("uploads:swagger_upload", {}), swagger_file)
             with st.spinner("Analyzing Swagger/OpenAPI docs..."):
                 analyzer = IDORAnalyzer()
-                spec = analyzer.analyze_file_bytes(file_bytes)
+                spec = analyzer.analyze_file(upload.path)
                 st.success("Analysis completed")
                 st.markdown(generate_markdown(spec))
         except Exception as e:
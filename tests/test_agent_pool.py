@@ -0,0 +1,30 @@
+import threading
+import unittest
+
+from src.app.agent_pool import FairScheduler
+
+
+class FairSchedulerTest(unittest.TestCase):
+    def test_twenty_sessions_stream_at_once_with_the_defaults(self):
+        scheduler = FairScheduler()
+        # Every turn keeps streaming until all 20 are inside their slot at the same time
+        streaming = threading.Barrier(20, timeout=10)
+        errors = []
+
+        def turn(session_id):
+            try:
+                with scheduler.slot(session_id, timeout=10):
+                    streaming.wait()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=turn, args=(f"analyst-{i}",)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
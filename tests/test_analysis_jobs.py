@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from src.app.analysis_framework import CancellationToken
+from src.app.analysis_jobs import AnalysisJob, spec_analysis
+from src.app.detectors import default_detectors
+from src.app.findings_store import FindingsStore
+from src.app.spec_model import SpecCache
+from src.app.swagger_analysis import IDORAnalyzer
+
+SPEC = {"openapi": "3.0.0", "paths": {
+    f"/tenants/{i}/users/{{id}}": {"get": {"parameters": [
+        {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}]}}
+    for i in range(20)
+}}
+
+
+class CancelAfter(CancellationToken):
+    """Reports cancelled once the traversal has checked it ``checks`` times."""
+
+    __slots__ = ("checks",)
+
+    def __init__(self, checks):
+        super().__init__()
+        self.checks = checks
+
+    @property
+    def cancelled(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+class SpecAnalysisPersistenceTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = FindingsStore(os.path.join(tmp.name, "findings.db"))
+        self.path = os.path.join(tmp.name, "spec.json")
+        data = json.dumps(SPEC).encode()
+        with open(self.path, "wb") as file:
+            file.write(data)
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.cache = SpecCache()
+
+    def target(self):
+        return spec_analysis(
+            self.path, self.digest, "spec.json", self.cache, self.store, IDORAnalyzer(detectors=default_detectors())
+        )
+
+    def run_job(self):
+        job = AnalysisJob(self.target(), "test", profile_enabled=False).start()
+        job.wait(30)
+        self.assertIsNone(job.error)
+        return job.result
+
+    def test_cancelled_run_stores_nothing(self):
+        result = self.target()(lambda progress: None, CancelAfter(5))
+        self.assertTrue(result["cancelled"])
+        self.assertTrue(result["vulnerabilities"])
+        self.assertEqual(self.store.summary()["findings"], 0)
+
+    def test_restarted_analysis_replaces_its_findings(self):
+        self.run_job()
+        first = self.store.summary()["findings"]
+        self.assertGreater(first, 0)
+        self.run_job()
+        self.assertEqual(self.store.summary()["findings"], first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+
+from src.app.detectors import default_detectors
+from src.app.swagger_analysis import IDORAnalyzer
+
+BEARER = [{"bearer": []}]
+DETECTOR_TECHNIQUES = {
+    "Unauthenticated privileged function",
+    "Broken function level authorization",
+    "Mass assignment",
+    "Unauthenticated sensitive endpoint",
+    "Missing rate limiting",
+}
+
+
+def techniques(paths, security=None):
+    """``{(path, method): [technique, ...]}`` for the non-IDOR detectors."""
+    spec = {"openapi": "3.0.0", "paths": paths}
+    if security is not None:
+        spec["security"] = security
+    result = IDORAnalyzer(detectors=default_detectors()).analyze(spec)
+    findings = {}
+    for v in result["vulnerabilities"]:
+        hits = [a["technique"] for a in v["attacks"] if a["technique"] in DETECTOR_TECHNIQUES]
+        if hits:
+            findings[(v["path"], v["method"])] = hits
+    return findings
+
+
+def found(paths, path, method, technique, security=None):
+    return technique in techniques(paths, security).get((path, method), [])
+
+
+class RateLimitDetectorTest(unittest.TestCase):
+    def test_credential_endpoints_without_429_are_flagged(self):
+        for path in ("/auth/login", "/users/{id}/password-reset", "/v1/otp", "/oauth/token"):
+            with self.subTest(path=path):
+                self.assertTrue(found({path: {"post": {}}}, path, "post", "Missing rate limiting"))
+
+    def test_keywords_inside_other_words_are_not_matched(self):
+        for path in ("/authors", "/shipping/rates", "/postcodes/lookup", "/keyboards"):
+            with self.subTest(path=path):
+                self.assertFalse(found({path: {"get": {}}}, path, "get", "Missing rate limiting"))
+
+    def test_documented_throttling_suppresses_the_finding(self):
+        paths = {
+            "/login": {"post": {"responses": {"429": {"description": "slow down"}}}},
+            "/verify": {"post": {"responses": {"200": {"headers": {"X-RateLimit-Remaining": {}}}}}},
+        }
+        self.assertEqual(techniques(paths), {})
+
+
+class UnauthenticatedSensitiveDetectorTest(unittest.TestCase):
+    def test_sensitive_names_match_segments_and_camel_case_parameters(self):
+        paths = {
+            "/accounts/{id}": {"get": {}},
+            "/lookup": {"get": {"parameters": [{"name": "apiKey", "in": "query"}]}},
+        }
+        result = techniques(paths)
+        self.assertIn("Unauthenticated sensitive endpoint", result[("/accounts/{id}", "get")])
+        self.assertIn("Unauthenticated sensitive endpoint", result[("/lookup", "get")])
+
+    def test_similar_words_and_protected_routes_are_not_flagged(self):
+        paths = {"/authors": {"get": {}}, "/borders": {"get": {}}, "/users": {"get": {"security": BEARER}}}
+        self.assertEqual(techniques(paths), {})
+
+
+class BFLADetectorTest(unittest.TestCase):
+    def test_protected_delete_without_privilege_signal_is_not_flagged(self):
+        paths = {"/users/{id}": {"get": {}, "delete": {}}}
+        self.assertFalse(found(paths, "/users/{id}", "delete", "Broken function level authorization", BEARER))
+
+    def test_delete_needing_no_more_than_read_scopes_is_flagged(self):
+        oauth = [{"oauth": ["users:read"]}]
+        paths = {"/users/{id}": {"get": {"security": oauth}, "delete": {"security": oauth}}}
+        self.assertTrue(found(paths, "/users/{id}", "delete", "Broken function level authorization"))
+        paths["/users/{id}"]["delete"]["security"] = [{"oauth": ["users:read", "users:admin"]}]
+        self.assertFalse(found(paths, "/users/{id}", "delete", "Broken function level authorization"))
+
+    def test_admin_paths_and_tags_are_privileged(self):
+        paths = {
+            "/admin/users": {"post": {}},
+            "/reports": {"get": {}, "post": {"tags": ["Admin"]}},
+        }
+        result = techniques(paths, BEARER)
+        self.assertIn("Broken function level authorization", result[("/admin/users", "post")])
+        self.assertIn("Broken function level authorization", result[("/reports", "post")])
+
+    def test_unauthenticated_privileged_function(self):
+        self.assertTrue(
+            found({"/internal/config": {"put": {}}}, "/internal/config", "put", "Unauthenticated privileged function")
+        )
+
+
+class MassAssignmentDetectorTest(unittest.TestCase):
+    def test_writable_server_controlled_fields(self):
+        body = {"content": {"application/json": {"schema": {"type": "object", "properties": {
+            "name": {"type": "string"},
+            "role": {"type": "string"},
+            "ownerId": {"type": "integer", "readOnly": True},
+        }}}}}
+        paths = {"/profile": {"put": {"requestBody": body, "security": BEARER}}}
+        self.assertEqual(techniques(paths)[("/profile", "put")], ["Mass assignment"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from agno.agent import Agent
+from agno.db.sqlite import SqliteDb
+from agno.models.openai import OpenAIChat
+
+from src.app.llm_scheduler import LLMScheduler
+
+
+class StubModel(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat endpoint replaying ``script``: an HTTP status to fail with, or "ok"."""
+
+    script = []
+    requests = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        type(self).requests += 1
+        step = self.script.pop(0) if self.script else "ok"
+        if step != "ok":
+            payload = json.dumps({"error": {"message": "slow down", "type": "rate_limit"}}).encode()
+            self.send_response(step)
+            self.send_header("content-type", "application/json")
+            self.send_header("retry-after", "0")
+            self.send_header("content-length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.end_headers()
+        for delta, finish in (({"role": "assistant", "content": "hello "}, None), ({"content": "there"}, None), ({}, "stop")):
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": "stub",
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        usage = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": "stub", "choices": [],
+                 "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}}
+        self.wfile.write(f"data: {json.dumps(usage)}\n\ndata: [DONE]\n\n".encode())
+        self.close_connection = True
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class LLMSchedulerStubServerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubModel)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        StubModel.requests = 0
+        self.scheduler = LLMScheduler(rpm=6000, tpm=10**7, base_backoff=0.01)
+        self.db = SqliteDb(db_file=os.path.join(self.tmp.name, f"{self.id()}.db"))
+
+    def agent(self):
+        model = OpenAIChat(
+            id="stub", base_url=f"http://127.0.0.1:{self.server.server_port}/v1", api_key="test", max_retries=0
+        )
+        return Agent(model=model, db=self.db, session_id="s1", add_history_to_context=True)
+
+    def run_turn(self, agent):
+        chunks = list(self.scheduler.stream(
+            lambda: agent.run("hi", stream=True, yield_run_response=True, session_id="s1"),
+            tokens=100,
+        ))
+        return "".join(c.content for c in chunks if getattr(c, "event", None) and c.content)
+
+    def test_rate_limited_call_is_retried_and_stored_once(self):
+        StubModel.script = [429, 503]
+        agent = self.agent()
+        self.assertEqual(self.run_turn(agent), "hello there")
+        self.assertEqual(StubModel.requests, 3)
+        self.assertEqual(len(agent.get_session("s1").runs), 1)
+        # The usage reported by the run settled the reservation
+        self.assertGreater(self.scheduler.tokens.level, self.scheduler.tokens.capacity - 100)
+
+    def test_non_retryable_status_is_raised(self):
+        StubModel.script = [400]
+        with self.assertRaises(Exception):
+            self.run_turn(self.agent())
+        self.assertEqual(StubModel.requests, 1)
+
+    def test_async_stream_retries_before_first_chunk(self):
+        StubModel.script = [429]
+        agent = self.agent()
+
+        async def turn():
+            text = ""
+            async for chunk in self.scheduler.astream(
+                lambda: agent.arun("hi", stream=True, session_id="s1"), tokens=100
+            ):
+                text += chunk.content or ""
+            return text
+
+        self.assertEqual(asyncio.run(turn()), "hello there")
+        self.assertEqual(StubModel.requests, 2)
+
+    def test_failure_after_first_chunk_is_not_replayed(self):
+        calls = []
+
+        def start():
+            calls.append(1)
+            yield "tool call made"
+            raise ProviderError(503)
+
+        with self.assertRaises(ProviderError):
+            list(self.scheduler.stream(start))
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.app.findings_store import FindingsStore
+from src.app.retrieval import FindingsRetriever, HashingEmbedder, VectorIndex
+
+
+def analysis(path, technique, description):
+    return {"vulnerabilities": [{"path": path, "method": "get", "attacks": [
+        {"technique": technique, "description": description}]}]}
+
+
+class FindingsRetrieverTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.store = FindingsStore(os.path.join(self.dir, "findings.db"))
+        self.index_dir = os.path.join(self.dir, "index")
+
+    def retriever(self):
+        return FindingsRetriever(self.store, directory=self.index_dir, embedder=HashingEmbedder())
+
+    def refs(self, retriever, query):
+        return [(hit["kind"], hit["ref"]) for hit in retriever.search(query, k=10, min_score=0.0)]
+
+    def test_replaced_findings_are_dropped_and_replacements_indexed(self):
+        self.store.replace_analysis("shop", analysis("/orders/{id}", "Sequential ID enumeration", "order ids"), "job")
+        retriever = self.retriever()
+        retriever.sync()
+        self.assertEqual(self.refs(retriever, "order ids enumeration"), [("finding", 1)])
+
+        self.store.replace_analysis("shop", analysis("/invoices/{id}", "Mass assignment", "invoice totals"), "job")
+        retriever.sync()
+        refs = self.refs(retriever, "invoice totals mass assignment order ids")
+        self.assertEqual(refs, [("finding", 2)])
+
+        # A fresh process replays the deletion log over the persisted index
+        reloaded = self.retriever()
+        reloaded.sync()
+        self.assertEqual(self.refs(reloaded, "invoice totals order ids"), [("finding", 2)])
+
+    def test_index_from_another_embedder_is_rebuilt(self):
+        self.store.add_findings("shop", [("/users/{id}", "GET", "BOLA", "user ids")])
+        self.retriever().sync()
+        with open(os.path.join(self.index_dir, "meta.json")) as file:
+            meta = json.load(file)
+        meta["embedder"] = "other"
+        with open(os.path.join(self.index_dir, "meta.json"), "w") as file:
+            json.dump(meta, file)
+
+        retriever = self.retriever()
+        self.assertEqual(retriever.index.size, 0)
+        self.assertEqual(retriever.sync(), 1)
+        self.assertEqual(self.refs(retriever, "user ids"), [("finding", 1)])
+
+    def test_queries_do_not_sync_and_background_sync_catches_up(self):
+        retriever = self.retriever()
+        self.store.add_report("Tenant escape", "shop", body="Swapping the tenant header exposes other tenants.")
+        self.assertIsNone(retriever.knowledge_retriever(query="tenant header"))
+
+        retriever.start(interval=0.05)
+        self.addCleanup(retriever.stop)
+        deadline = time.monotonic() + 5
+        while retriever.watermarks["report"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        hits = retriever.knowledge_retriever(query="tenant header")
+        self.assertEqual(hits[0]["source"], "report:1")
+
+
+class VectorIndexTest(unittest.TestCase):
+    def test_remove_from_partitioned_index(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(400, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index = VectorIndex(16, nprobe=64, train_threshold=200, list_size=10)
+        index.add(vectors)
+        self.assertIsNotNone(index.centroids)
+        self.assertEqual(index.search(vectors[7], k=1)[0][0], 7)
+        self.assertEqual(index.remove([7, 8, 999]), 2)
+        self.assertNotIn(7, [i for i, _ in index.search(vectors[7], k=5)])
+        # Ids keep counting from where they were; removed ones are not reused
+        self.assertEqual(int(index.add(vectors[:1])[0]), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
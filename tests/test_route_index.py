@@ -0,0 +1,54 @@
+import unittest
+
+from src.app.route_index import RouteIndex
+
+AUTH = [{"bearer": []}]
+
+
+def index(paths, security=None):
+    return RouteIndex.from_spec({"paths": paths, "security": security or []})
+
+
+class RouteIndexTest(unittest.TestCase):
+    def test_alternate_route_names_the_protected_operation(self):
+        findings = index({
+            "/users/{userId}/files/{fileId}": {"get": {"security": AUTH}},
+            "/files/{fileId}": {"head": {}},
+        }).find_inconsistencies()
+        attack = next(
+            a for a in findings[("/files/{fileId}", "head")]
+            if a["technique"] == "Alternate route authorization bypass"
+        )
+        self.assertIn("`GET /users/{userId}/files/{fileId}`", attack["description"])
+
+    def test_direct_reference_bypassing_parent_scope(self):
+        findings = index({
+            "/users/{userId}/files/{fileId}": {"get": {"security": AUTH}},
+            "/files/{fileId}": {"get": {"security": AUTH}},
+        }).find_inconsistencies()
+        techniques = [a["technique"] for a in findings[("/files/{fileId}", "get")]]
+        self.assertEqual(techniques, ["Direct reference bypassing parent scope"])
+
+    def test_unprotected_nested_route(self):
+        findings = index({
+            "/projects/{id}": {"get": {"security": AUTH}},
+            "/projects/{id}/members": {"get": {"security": [{}]}},
+        }).find_inconsistencies()
+        attack = findings[("/projects/{id}/members", "get")][0]
+        self.assertEqual(attack["technique"], "Unprotected nested route")
+        self.assertIn("`GET /projects/{id}`", attack["description"])
+
+    def test_version_and_api_prefixes_are_ignored(self):
+        idx = RouteIndex()
+        self.assertEqual(idx.normalize("/api/v2/Users/{id}"), ["users", "{}"])
+        self.assertEqual(idx.resource_of(["users", "{}"]), ("user", True, 0))
+
+    def test_consistent_routes_have_no_findings(self):
+        self.assertEqual(index({
+            "/users/{id}": {"get": {}, "delete": {}},
+            "/orders/{id}": {"get": {}},
+        }, security=AUTH).find_inconsistencies(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
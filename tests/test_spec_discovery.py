@@ -0,0 +1,108 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from src.app.findings_store import FindingsStore
+from src.app.spec_discovery import SpecDiscovery
+
+
+def spec(*paths):
+    return {"openapi": "3.0.0", "paths": {
+        path: {"get": {"parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}]}}
+        for path in paths
+    }}
+
+
+class StubHosts:
+    """Serves ``/openapi.json`` per host from ``specs`` with ETags; ``redirects`` maps host -> Location."""
+
+    def __init__(self):
+        self.specs = {}
+        self.redirects = {}
+        self.requests = []
+
+    def __call__(self, request):
+        host = request.url.host
+        self.requests.append((host, request.headers.get("if-none-match")))
+        if host in self.redirects:
+            return httpx.Response(302, headers={"location": self.redirects[host]})
+        if host not in self.specs:
+            return httpx.Response(404)
+        etag, body = self.specs[host]
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, headers={"etag": etag}, content=json.dumps(body).encode())
+
+
+class SpecDiscoveryTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.hosts = StubHosts()
+        self.store = FindingsStore(os.path.join(self.dir, "findings.db"))
+
+    def run_discovery(self, *hosts):
+        async def run():
+            async with httpx.AsyncClient(transport=httpx.MockTransport(self.hosts)) as client:
+                discovery = SpecDiscovery(
+                    client=client,
+                    state_db=os.path.join(self.dir, "discovery.db"),
+                    spec_dir=os.path.join(self.dir, "specs"),
+                    store=self.store,
+                    paths=("/openapi.json",),
+                    per_host=1,
+                    max_concurrency=2,
+                )
+                return await discovery.run(list(hosts))
+
+        return {r.host: r for r in asyncio.run(run())}
+
+    def test_new_then_not_modified_then_changed(self):
+        self.hosts.specs["shop.test"] = ('"v1"', spec("/orders/{id}"))
+        first = self.run_discovery("shop.test")["shop.test"]
+        self.assertEqual(first.status, "new")
+        self.assertEqual(first.findings, 1)
+
+        second = self.run_discovery("shop.test")["shop.test"]
+        self.assertEqual((second.status, second.digest), ("unchanged", first.digest))
+        self.assertEqual(self.hosts.requests[-1], ("shop.test", '"v1"'))
+
+        self.hosts.specs["shop.test"] = ('"v2"', spec("/orders/{id}", "/invoices/{id}"))
+        third = self.run_discovery("shop.test")["shop.test"]
+        self.assertEqual(third.status, "changed")
+        self.assertNotEqual(third.digest, first.digest)
+        self.assertTrue(os.path.exists(third.spec_path))
+        # The new version's findings replace the old ones
+        self.assertEqual(self.store.finding_rollup("target"), [("shop.test", third.findings)])
+
+    def test_redirect_out_of_scope_is_not_followed(self):
+        self.hosts.redirects["shop.test"] = "https://elsewhere.test/openapi.json"
+        self.hosts.specs["elsewhere.test"] = ('"v1"', spec("/users/{id}"))
+        result = self.run_discovery("shop.test")["shop.test"]
+        self.assertEqual(result.status, "error")
+        self.assertIn("out of scope", result.error)
+        self.assertEqual([host for host, _ in self.hosts.requests], ["shop.test"])
+
+    def test_bad_spec_fails_only_its_own_url_and_is_retried(self):
+        self.hosts.specs["good.test"] = ('"v1"', spec("/orders/{id}"))
+        bad = {"openapi": "3.0.0", "paths": {"/x/{id}": {"get": {"parameters": [None]}}}}
+        self.hosts.specs["bad.test"] = ('"v1"', bad)
+        results = self.run_discovery("good.test", "bad.test")
+        self.assertEqual(results["good.test"].status, "new")
+        self.assertEqual(results["bad.test"].status, "error")
+        self.assertIn("AttributeError", results["bad.test"].error)
+
+        again = self.run_discovery("good.test", "bad.test")
+        self.assertEqual(again["good.test"].status, "unchanged")
+        # No validators were kept for the failed spec, so it is fetched and analyzed again
+        self.assertEqual(again["bad.test"].status, "error")
+        self.assertEqual([etag for host, etag in self.hosts.requests if host == "bad.test"], [None, None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import io
+import json
+import unittest
+
+from src.app.traffic_ingestion import TrafficIngester
+
+
+def jsonl(*records):
+    return io.StringIO("\n".join(json.dumps(r) for r in records))
+
+
+class TrafficIngesterTest(unittest.TestCase):
+    def test_numeric_segments_collapse_into_one_templated_path(self):
+        ingester = TrafficIngester()
+        ingester.ingest_jsonl(jsonl(*(
+            {"method": "GET", "url": f"https://api.test/users/{i}/orders",
+             "headers": {"Authorization": "Bearer t"}, "status": 200}
+            for i in range(1, 8)
+        )))
+        paths = ingester.to_openapi()["paths"]
+        self.assertEqual(list(paths), ["/users/{id}/orders"])
+        param = paths["/users/{id}/orders"]["parameters"][0]
+        self.assertEqual((param["name"], param["in"], param["schema"]["type"]), ("id", "path", "integer"))
+        self.assertTrue(paths["/users/{id}/orders"]["get"]["security"])
+
+    def test_unknown_methods_and_foreign_hosts_are_ignored(self):
+        ingester = TrafficIngester(hosts=["api.test"])
+        ingester.ingest_jsonl(jsonl(
+            {"method": "TRACE", "url": "https://api.test/debug"},
+            {"method": "GET", "url": "https://cdn.test/app.js"},
+            {"method": "GET", "url": "https://api.test/health"},
+        ))
+        self.assertEqual(list(ingester.to_openapi()["paths"]), ["/health"])
+
+    def test_har_entries_are_normalized(self):
+        har = {"log": {"entries": [{
+            "request": {"method": "POST", "url": "https://api.test/orders",
+                        "headers": [{"name": "Content-Type", "value": "application/json"}],
+                        "postData": {"mimeType": "application/json", "text": '{"ownerId": 5}'}},
+            "response": {"status": 201, "headers": []},
+        }]}}
+        ingester = TrafficIngester()
+        self.assertEqual(ingester.ingest_har(io.StringIO(json.dumps(har))), 1)
+        self.assertIn("post", ingester.to_openapi()["paths"]["/orders"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import gc
+import hashlib
+import io
+import os
+import tempfile
+import time
+import unittest
+
+from src.app.uploads import UploadTooLarge, session_spool, spool_upload, sweep_spools
+
+
+class FakeUpload(io.BytesIO):
+    def __init__(self, data, name="spec.json", file_id=None):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = file_id
+
+
+class UploadsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def spool(self, data, **kwargs):
+        return spool_upload(FakeUpload(data), directory=self.tmp.name, **kwargs)
+
+    def test_spool_records_size_digest_and_suffix(self):
+        upload = self.spool(b'{"openapi": "3.0.0"}')
+        self.assertEqual(upload.size, 20)
+        self.assertEqual(upload.digest, hashlib.sha256(b'{"openapi": "3.0.0"}').hexdigest())
+        self.assertTrue(upload.path.endswith(".json"))
+        upload.delete()
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_oversized_upload_leaves_no_file(self):
+        with self.assertRaises(UploadTooLarge):
+            spool_upload(io.BytesIO(b"x" * 100), name="big.json", max_bytes=10, directory=self.tmp.name)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_head_stops_at_last_complete_line(self):
+        upload = self.spool(b"line one\nline two\nline three\n")
+        self.assertEqual(upload.head(limit=12), "line one\n")
+
+    def test_collected_spool_deletes_its_file(self):
+        path = self.spool(b"{}").path
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_session_spool_reuses_and_replaces(self):
+        uploads = {}
+        first = FakeUpload(b"{}", file_id="a")
+        spooled = session_spool(uploads, first)
+        self.assertIs(session_spool(uploads, first), spooled)
+        replacement = session_spool(uploads, FakeUpload(b"[]", file_id="b"))
+        self.assertFalse(os.path.exists(spooled.path))
+        self.assertEqual(list(uploads.values()), [replacement])
+        replacement.delete()
+
+    def test_uploaders_with_their_own_mappings_keep_each_others_files(self):
+        state = {}
+        chat = session_spool(state.setdefault("uploads:chat_upload", {}), FakeUpload(b"notes", file_id="a"))
+        spec = session_spool(state.setdefault("uploads:swagger_upload", {}), FakeUpload(b"{}", file_id="b"))
+        self.assertTrue(os.path.exists(chat.path))
+        self.assertTrue(os.path.exists(spec.path))
+        chat.delete()
+        spec.delete()
+
+    def test_sweep_removes_only_stale_spools(self):
+        stale = self.spool(b"old")
+        fresh = self.spool(b"new")
+        other = os.path.join(self.tmp.name, "unrelated.json")
+        open(other, "w").close()
+        hours_ago = time.time() - 48 * 3600
+        for path in (stale.path, other):
+            os.utime(path, (hours_ago, hours_ago))
+        self.assertEqual(sweep_spools(24, directory=self.tmp.name), 1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted([os.path.basename(fresh.path), "unrelated.json"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
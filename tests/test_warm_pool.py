@@ -0,0 +1,107 @@
+import gc
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from src.app.analysis_jobs import spec_analysis
+from src.app.detectors import default_detectors
+from src.app.findings_store import FindingsStore
+from src.app.spec_model import SpecCache
+from src.app.swagger_analysis import IDORAnalyzer
+from src.app.warm_pool import WarmPool
+
+
+def write_spec(directory, name, paths):
+    data = json.dumps({"openapi": "3.0.0", "paths": {
+        path: {"get": {"parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}]}}
+        for path in paths
+    }}).encode()
+    path = os.path.join(directory, name)
+    with open(path, "wb") as file:
+        file.write(data)
+    return path, hashlib.sha256(data).hexdigest()
+
+
+class WarmPoolAffinityTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.pool = WarmPool(processes=2, start_method="fork", max_specs=2).start()
+        self.addCleanup(self.pool.close)
+
+    def holders(self, digest):
+        return [w for w in self.pool._workers if digest in w.resident]
+
+    def test_reanalysis_goes_to_the_worker_holding_the_spec(self):
+        path, digest = write_spec(self.dir, "a.json", ["/users/{id}"])
+        for _ in range(3):
+            result = self.pool.analyze(path, digest)
+            self.assertEqual(result["vulnerabilities"][0]["path"], "/users/{id}")
+        self.assertEqual(len(self.holders(digest)), 1)
+
+    def test_resident_digests_follow_the_worker_lru(self):
+        specs = [write_spec(self.dir, f"{i}.json", [f"/r{i}/{{id}}"]) for i in range(3)]
+        for path, digest in specs:
+            self.pool.analyze(path, digest)
+        for worker in self.pool._workers:
+            self.assertLessEqual(len(worker.resident), 2)
+
+
+def report_freeze_count(queue):
+    queue.put(gc.get_freeze_count())
+
+
+class WarmPoolLifecycleTest(unittest.TestCase):
+    def test_analyze_on_an_empty_pool_raises_instead_of_waiting(self):
+        pool = WarmPool(processes=1, start_method="fork").start()
+        self.addCleanup(pool.close)
+        pool.scale(0)
+        self.assertEqual(len(pool), 0)
+        errors = []
+
+        def analyze():
+            try:
+                pool.analyze("unused.json")
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=analyze, daemon=True)
+        thread.start()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_fork_server_is_warmed_up_and_frozen(self):
+        pool = WarmPool(processes=1, start_method="forkserver").start()
+        self.addCleanup(pool.close)
+        queue = pool.ctx.Queue()
+        probe = pool.ctx.Process(target=report_freeze_count, args=(queue,))
+        probe.start()
+        self.assertGreater(queue.get(timeout=60), 0)
+        probe.join(5)
+
+
+class ProfiledAnalysisTest(unittest.TestCase):
+    def test_profiled_run_stays_in_process(self):
+        class NoPool:
+            def analyze(self, *args, **kwargs):
+                raise AssertionError("profiled analysis must not leave the job thread")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path, digest = write_spec(tmp, "spec.json", ["/users/{id}"])
+            cache = SpecCache()
+            target = spec_analysis(
+                path, digest, "spec.json", cache, FindingsStore(os.path.join(tmp, "findings.db")),
+                IDORAnalyzer(detectors=default_detectors()), pool=NoPool(), profile_enabled=True,
+            )
+            result = target(lambda progress: None, None)
+        self.assertTrue(result["vulnerabilities"])
+        self.assertIn(digest, cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from src.app.work_queue import LeaseLost, WorkQueue, analyze_job, run_worker
+
+SPEC = {"openapi": "3.0.0", "paths": {"/users/{id}": {"get": {"parameters": [
+    {"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}}]}}}}
+
+
+class WorkQueueTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        self.queue = WorkQueue(os.path.join(self.dir, "jobs.db"))
+        self.spec = os.path.join(self.dir, "spec.json")
+        with open(self.spec, "w") as file:
+            json.dump(SPEC, file)
+
+    def test_same_spec_is_queued_once(self):
+        self.assertIsNotNone(self.queue.enqueue(self.spec))
+        self.assertIsNone(self.queue.enqueue(self.spec))
+
+    def test_expired_lease_is_reclaimed_and_the_old_owner_loses_it(self):
+        self.queue.enqueue(self.spec)
+        [job] = self.queue.claim("w1", lease_seconds=0.05)
+        self.assertEqual(self.queue.claim("w2"), [])
+        time.sleep(0.1)
+        [again] = self.queue.claim("w2")
+        self.assertEqual((again["id"], again["attempts"]), (job["id"], 2))
+        with self.assertRaises(LeaseLost):
+            self.queue.heartbeat(job["id"], "w1")
+        self.assertFalse(self.queue.complete(job, "w1", {"vulnerabilities": []}))
+        self.assertTrue(self.queue.complete(again, "w2", {"vulnerabilities": []}))
+        self.assertEqual(self.queue.stats()["done"], 1)
+
+    def test_failures_back_off_then_park_the_job_as_dead(self):
+        self.queue.enqueue(self.spec, max_attempts=2)
+        [job] = self.queue.claim("w1")
+        self.queue.fail(job, "w1", "boom", backoff=60)
+        # Backing off: not visible yet
+        self.assertEqual(self.queue.claim("w1"), [])
+        self.queue.connection().execute("UPDATE jobs SET visible_at = 0")
+        [job] = self.queue.claim("w1")
+        self.queue.fail(job, "w1", "boom again", backoff=0)
+        self.assertEqual(self.queue.stats().get("dead"), 1)
+        self.assertEqual(self.queue.requeue_dead(), 1)
+        self.assertEqual(len(self.queue.claim("w1")), 1)
+
+    def test_worker_retries_a_failed_job(self):
+        self.queue.enqueue(self.spec)
+        calls = []
+
+        def handler(job):
+            calls.append(job["attempts"])
+            if len(calls) == 1:
+                raise RuntimeError("transient")
+            return {"vulnerabilities": []}
+
+        self.assertEqual(run_worker(self.queue, "w1", handler=handler, max_jobs=1), 0)
+        self.queue.connection().execute("UPDATE jobs SET visible_at = 0")
+        self.assertEqual(run_worker(self.queue, "w1", handler=handler, max_jobs=1), 1)
+        self.assertEqual(calls, [1, 2])
+        job = self.queue.connection().execute("SELECT key FROM jobs").fetchone()
+        self.assertEqual(self.queue.result(job["key"]), {"vulnerabilities": []})
+
+
+class AnalyzeJobTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        spec = os.path.join(self.dir, "spec.json")
+        with open(spec, "w") as file:
+            json.dump(SPEC, file)
+        self.job = {"spec_path": spec, "target": "shop", "key": "k" * 64}
+
+    def test_results_stay_in_the_queue_unless_a_findings_db_is_given(self):
+        cwd = os.getcwd()
+        os.chdir(self.dir)
+        self.addCleanup(os.chdir, cwd)
+        self.assertTrue(analyze_job(self.job)["vulnerabilities"])
+        self.assertFalse(os.path.exists("findings.db"))
+
+    def test_findings_db_uses_the_requested_journal_mode(self):
+        db = os.path.join(self.dir, "shared.db")
+        analyze_job(self.job, findings_db=db, journal_mode="DELETE")
+        analyze_job(self.job, findings_db=db, journal_mode="DELETE")
+        conn = sqlite3.connect(db)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "delete")
+        self.assertFalse(os.path.exists(db + "-wal"))
+        # Re-running a job replaces its findings instead of duplicating them
+        self.assertEqual(conn.execute("SELECT COUNT(DISTINCT source) FROM findings").fetchone()[0], 1)
+        first = conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0]
+        analyze_job(self.job, findings_db=db, journal_mode="DELETE")
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM findings").fetchone()[0], first)
+
+
+if __name__ == "__main__":
+    unittest.main()